@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import itertools
+import re
+import threading
+import time
+
+# ==========================================
+# ADMISSION CONTROL
+# ==========================================
+#
+# Paces upstream calls to stay inside Groq's rate limits instead of bursting
+# into 429 storms:
+# - token buckets for requests and tokens, seeded from static limits and kept
+#   in sync with the x-ratelimit-* headers of every response
+# - a bounded wait queue ordered by priority (lower number goes first)
+# - a 429's Retry-After pauses all admissions until it has passed
+# - a caller is shed (serves its fallback) as soon as its expected queue wait
+#   would exceed the time it has left
+#
+# Limits are enforced per worker process; the headers report the account-wide
+# remaining quota, so workers converge on their share of it.
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_duration(value):
+    """Seconds in a rate-limit reset/Retry-After value: '7.66s', '2m59.56s', '120ms' or '3'."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` units, refilled continuously at `rate` units/second."""
+
+    def __init__(self, kind, capacity, rate):
+        self.kind = kind  # 'requests' or 'tokens': which cost this bucket charges
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.level = float(capacity)
+        self._updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def cost(self, tokens):
+        """Units one call takes from this bucket; never more than it can hold, or it could never go."""
+        return 1 if self.kind == "requests" else min(tokens, self.capacity)
+
+    def wait_for(self, amount):
+        """Seconds until `amount` units are available (0 if they already are)."""
+        missing = amount - self.level
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def sync(self, limit, remaining, window):
+        """Adopt the server's view: its capacity, and never more left than it reports."""
+        if limit and limit != self.capacity:
+            self.capacity = float(limit)
+            self.rate = float(limit) / window
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class AdmissionController:
+    """
+    Shared gate in front of upstream calls. acquire() (or acquire_async()) blocks until the
+    call may go, or returns False to shed it; report the outcome with settle()/throttle(),
+    or hand the admission back with release() when no call went out.
+    """
+
+    def __init__(self, name="groq", rpm=0, tpm=0, max_queue=256, request_window=86400.0, token_window=60.0):
+        self.name = name
+        self.max_queue = int(max_queue)
+        self.request_window = float(request_window)
+        self.token_window = float(token_window)
+
+        # Static limits (0 = unknown until the first rate-limit headers arrive)
+        self._buckets = {}
+        if rpm:
+            self._buckets["rpm"] = TokenBucket("requests", rpm, rpm / 60.0)
+        if tpm:
+            self._buckets["tokens"] = TokenBucket("tokens", tpm, tpm / 60.0)
+
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = []  # heap of (priority, seq, tokens)
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+        self.admitted = 0
+        self.shed = 0
+        self.rate_limited = 0
+
+    # --- Queueing ---
+
+    def _expected_wait(self, now, entry):
+        """Seconds until `entry` could be admitted, given everyone queued ahead of it."""
+        ahead = [waiter for waiter in self._waiters if waiter <= entry]
+        wait = max(self._paused_until - now, 0.0)
+        for bucket in self._buckets.values():
+            bucket.refill(now)
+            amount = sum(bucket.cost(waiter[2]) for waiter in ahead)
+            wait = max(wait, bucket.wait_for(amount))
+        return wait
+
+    def _poll(self, entry, deadline):
+        """One admission attempt under the lock: (True, 0) admitted, (False, None) shed, else (False, wait)."""
+        now = time.monotonic()
+        wait = self._expected_wait(now, entry)
+        head = self._waiters[0] == entry
+        if wait <= 0 and head:
+            for bucket in self._buckets.values():
+                bucket.level -= bucket.cost(entry[2])
+            self.admitted += 1
+            return True, 0.0
+        if deadline is not None and now + wait > deadline:
+            self.shed += 1
+            return False, None
+        # Behind the head with capacity to spare: the head's departure wakes us
+        return False, max(wait, 0.001 if head else 0.05)
+
+    def _enqueue(self, priority, tokens):
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return None
+        entry = (priority, next(self._seq), tokens)
+        heapq.heappush(self._waiters, entry)
+        return entry
+
+    def _dequeue(self, entry):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        # The head may have changed: let the new one re-check
+        self._cond.notify_all()
+
+    def _unlimited(self):
+        return not self._buckets and not self._waiters and self._paused_until <= time.monotonic()
+
+    def acquire(self, priority=0, tokens=0, timeout=None):
+        """Wait for admission. Returns False (shed) if it can't happen within `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._unlimited():
+                self.admitted += 1
+                return True
+            entry = self._enqueue(priority, tokens)
+            if entry is None:
+                return False
+            try:
+                while True:
+                    admitted, wait = self._poll(entry, deadline)
+                    if admitted or wait is None:
+                        return admitted
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(entry)
+
+    async def acquire_async(self, priority=0, tokens=0, timeout=None):
+        """acquire() for coroutines: sleeps on the event loop instead of blocking it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._unlimited():
+                self.admitted += 1
+                return True
+            entry = self._enqueue(priority, tokens)
+            if entry is None:
+                return False
+        try:
+            while True:
+                with self._cond:
+                    admitted, wait = self._poll(entry, deadline)
+                if admitted or wait is None:
+                    return admitted
+                # Re-check at least every 50ms in case the queue ahead moved
+                await asyncio.sleep(min(wait, 0.05))
+        finally:
+            with self._cond:
+                self._dequeue(entry)
+
+    # --- Feedback from responses ---
+
+    def observe(self, headers):
+        """Sync the buckets with a response's x-ratelimit-* headers."""
+        limit_requests = _int_header(headers, "x-ratelimit-limit-requests")
+        limit_tokens = _int_header(headers, "x-ratelimit-limit-tokens")
+        if limit_requests is None and limit_tokens is None:
+            return
+        now = time.monotonic()
+        with self._cond:
+            for key, limit, window in (
+                ("requests", limit_requests, self.request_window),
+                ("tokens", limit_tokens, self.token_window),
+            ):
+                if limit is None:
+                    continue
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(key, limit, limit / window)
+                bucket.refill(now)
+                bucket.sync(limit, _int_header(headers, f"x-ratelimit-remaining-{key}"), window)
+
+    def settle(self, reserved_tokens, used_tokens):
+        """Return the unused part of a token reservation once the real usage is known."""
+        if used_tokens is None or reserved_tokens <= used_tokens:
+            return
+        with self._cond:
+            bucket = self._buckets.get("tokens")
+            if bucket is not None:
+                # Only what was actually taken (see TokenBucket.cost) can be returned
+                unused = bucket.cost(reserved_tokens) - used_tokens
+                if unused > 0:
+                    bucket.level = min(bucket.capacity, bucket.level + unused)
+                self._cond.notify_all()
+
+    def release(self, reserved_tokens):
+        """Hand back an admission whose call never went out: its request and its whole token reservation."""
+        with self._cond:
+            for bucket in self._buckets.values():
+                bucket.level = min(bucket.capacity, bucket.level + bucket.cost(reserved_tokens))
+            self._cond.notify_all()
+
+    def throttle(self, retry_after):
+        """A 429 arrived: admit nothing until Retry-After (default 1s) has passed."""
+        seconds = parse_duration(retry_after)
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + (seconds if seconds is not None else 1.0))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._cond:
+            for bucket in self._buckets.values():
+                bucket.refill(now)
+            return {
+                "name": self.name,
+                "queued": len(self._waiters),
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "rate_limited": self.rate_limited,
+                "paused_for": round(max(self._paused_until - now, 0.0), 3),
+                "buckets": {
+                    key: {"level": round(bucket.level, 1), "capacity": bucket.capacity, "rate": round(bucket.rate, 3)}
+                    for key, bucket in self._buckets.items()
+                },
+            }
+
+
+def _int_header(headers, name):
+    value = headers.get(name)
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
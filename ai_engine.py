@@ -1,493 +1,963 @@
-import os
-import random
-import time
-import requests
-import json
-import hashlib
-from dotenv import load_dotenv
-
-load_dotenv()
-
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
-
-# --- Dynamic Assets ---
-
-TONES = [
-    "highly analytical and data-driven",
-    "bold, visionary, and disruptive",
-    "consultative, empathetic, and solution-oriented",
-    "concise, professional, and executive-level",
-    "persuasive, high-energy, and sales-focused"
-]
-
-def generate_seed_from_input(*args):
-    """Generate deterministic seed from input parameters for consistent decisions."""
-    input_string = '|'.join(str(arg) for arg in args)
-    return int(hashlib.md5(input_string.encode()).hexdigest()[:8], 16)
-
-def get_stable_temperature(mode='creative'):
-    """
-    Return temperature based on output mode.
-    - 'decision': Low temp (0.4) for stable scores/categories/recommendations
-    - 'creative': High temp (0.7-0.85) for varied explanations and content
-    """
-    if mode == 'decision':
-        return 0.4  # Stable for decisions
-    else:
-        return round(random.uniform(0.7, 0.85), 2)  # Creative for explanations
-
-def call_groq_api(system_prompt, user_prompt, mode='creative', seed=None):
-    """
-    Calls the Groq API with mode-specific temperature.
-    - mode: 'decision' for stable outputs, 'creative' for varied outputs
-    - seed: Optional seed for deterministic randomness in creative elements
-    """
-    if not GROQ_API_KEY:
-        return None
-
-    # Set seed for deterministic tone selection if provided
-    if seed and mode == 'creative':
-        random.seed(seed)
-        current_tone = random.choice(TONES)
-        random.seed()  # Reset seed after tone selection
-    else:
-        current_tone = random.choice(TONES)
-    
-    # Inject tone into system prompt
-    enhanced_system_prompt = f"{system_prompt}\n\nIMPORTANT: Adopt a {current_tone} tone. Ensure every response is uniquely phrased and avoids repetitive patterns."
-
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": enhanced_system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": get_stable_temperature(mode),
-        "max_tokens": 1200,
-        "top_p": 0.95
-    }
-
-    try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=12)
-        response.raise_for_status()
-        data = response.json()
-        return data['choices'][0]['message']['content']
-    except Exception as e:
-        print(f"Groq API Error: {e}")
-        return None
-
-# ==========================================
-# MARKETING CAMPAIGN GENERATOR
-# ==========================================
-
-def generate_marketing_campaign(product, description, audience, platform):
-    system_prompt = f"""You are a world-class Marketing Strategist. 
-    Generate a high-impact, data-driven marketing campaign strategy.
-    
-    CRITICAL CONSTRAINTS:
-    - The campaign MUST be designed EXCLUSIVELY for {platform}
-    - All tactics, content ideas, and ad copy MUST be platform-specific to {platform}
-    - Target audience is STRICTLY: {audience}
-    - DO NOT reference any other platform or generalize
-    - DO NOT override or ignore the specified platform
-    
-    Output Format (Markdown):
-    ### 🚀 Marketing Campaign Strategy: [Product Name]
-    
-    **Campaign Objective:**
-    [concise objective]
-    
-    **Core Marketing Message:**
-    "[compelling tagline]"
-    
-    **Strategy for {platform}:**
-    - [Specific tactic 1 for {platform}]
-    - [Specific tactic 2 for {platform}]
-    - [Specific tactic 3 for {platform}]
-    
-    **Content Ideas:**
-    - **[Idea 1]:** [Brief description]
-    - **[Idea 2]:** [Brief description]
-    - **[Idea 3]:** [Brief description]
-    - **[Idea 4]:** [Brief description]
-    - **[Idea 5]:** [Brief description]
-    
-    **Ad Copy Variations:**
-    1. "[Variation 1]"
-    2. "[Variation 2]"
-    3. "[Variation 3]"
-    
-    **Success Metrics:**
-    - [Metric 1]
-    - [Metric 2]
-    - [Metric 3]
-    """
-    
-    user_prompt = f"""
-    Product: {product}
-    Description: {description}
-    Target Audience: {audience}
-    Platform: {platform}
-    
-    REMINDER: All strategies must be tailored to {platform} ONLY.
-    """
-    
-    # AI Call
-    ai_response = call_groq_api(system_prompt, user_prompt)
-    if ai_response:
-        return ai_response
-        
-    # Fallback
-    return fallback_marketing(product, description, audience, platform)
-
-def fallback_marketing(product, description, audience, platform):
-    # Dynamic Lists for Variance
-    objectives = [
-        f"To dominate share of voice in the {audience} segment on {platform}.",
-        f"To aggressively scale brand awareness for {product} via high-impact visuals.",
-        f"To establish {product} as the undisputed category leader for {audience}.",
-        f"To drive rapid user acquisition and viral growth on {platform}.",
-        f"To build a loyal community of {audience} advocates around {product}."
-    ]
-    
-    tagline_templates = [
-        f"Redefining {description} for the modern {audience}.",
-        f"{product}: The {random.choice(['ultimate', 'premier', 'smart'])} choice for {audience}.",
-        f"Step into the future of {description} with {product}.",
-        f"Don't just survive, thrive. {product}.",
-        f"{product}: Because {audience} deserve better."
-    ]
-    
-    strategies = [
-        [
-            f"Leverage {platform} Reels for viral organic reach.",
-            f"Partner with 5-10 micro-influencers in the {audience} niche.",
-            "Implement a retargeting layer for high-intent visitors."
-        ],
-        [
-            f"Launch a user-generated content (UGC) challenge on {platform}.",
-            "Use carousel ads to breakdown complex features.",
-            f"Host a live Q&A session tailored to {audience} pain points."
-        ],
-        [
-            "Focus on 'Transformation' storytelling (Before vs After).",
-            f"Use {platform} Stories for limited-time offers.",
-            "Create a community-led ambassador program."
-        ]
-    ]
-    
-    content_ideas = [
-        "**Day in the Life:** A relatable vlog-style post featuring a typical user.",
-        "**Myth Buster:** Debunking common industry misconceptions.",
-        "**Feature Spotlight:** 30-second deep dive into a specific benefit.",
-        "**Unboxing Experience:** High-quality ASMR-style unsheathing of the product.",
-        "**Founder's Story:** Authentic video sharing the 'why' behind the brand.",
-        "**Customer Reaction:** Compilation of genuine user feedback.",
-        "**How-To Guide:** Step-by-step tutorial for maximizing value.",
-        "**Reaction Video:** Influencers reacting to the product for the first time."
-    ]
-    random.shuffle(content_ideas)
-    
-    metrics = [
-        f"CTR > {random.uniform(1.5, 3.5):.1f}%",
-        f"ROAS > {random.uniform(2.5, 5.0):.1f}x",
-        f"Engagement Rate > {random.uniform(4.0, 9.0):.1f}%",
-        f"CPA < ${random.randint(15, 45)}",
-        f"Brand Mention Lift > {random.randint(10, 30)}%"
-    ]
-    
-    return f"""### 🚀 Marketing Campaign Strategy: {product}
-
-**Campaign Objective:**
-{random.choice(objectives)}
-
-**Core Marketing Message:**
-"{random.choice(tagline_templates)}"
-
-**Strategy for {platform}:**
-- {random.choice(strategies)[0]}
-- {random.choice(strategies)[1]}
-- {random.choice(strategies)[2]}
-
-**Content Ideas:**
-- {content_ideas[0]}
-- {content_ideas[1]}
-- {content_ideas[2]}
-- {content_ideas[3]}
-- {content_ideas[4]}
-
-**Ad Copy Variations:**
-1. "{random.choice(['Stop settling.', 'Ready for an upgrade?', 'The wait is over.'])} {product} is here to change the game for {audience}."
-2. "POV: You finally found a {description} that actually works. Meet {product}. #LinkInBio"
-3. "{audience} are switching to {product} for a reason. Experience the difference today."
-
-**Success Metrics:**
-- {random.choice(metrics)}
-- {random.choice(metrics)}
-- {random.choice(metrics)}
-"""
-
-# ==========================================
-# SALES PITCH GENERATOR
-# ==========================================
-
-def generate_sales_pitch(product, persona, industry, size):
-    system_prompt = f"""You are an expert B2B Sales Consultant.
-    Write a persuasive sales pitch tailored to the specific persona and industry.
-    
-    CRITICAL CONSTRAINTS:
-    - Company size is STRICTLY: {size}
-    - Industry is STRICTLY: {industry}
-    - Persona is STRICTLY: {persona}
-    - DO NOT generalize or reference other company sizes (e.g., if {size} is 'Enterprise', do NOT mention SMB or Mid-Market)
-    - All value propositions and differentiators MUST be relevant to {size} companies in {industry}
-    - Tailor objection handling to {size} budget and decision-making processes
-    
-    Output Format (Markdown):
-    ### 💼 B2B Sales Pitch for {persona}
-    
-    **30-Second Elevator Pitch:**
-    "[Script]"
-    
-    **Value Proposition:**
-    - **[Point 1]:** [Detail]
-    - **[Point 2]:** [Detail]
-    - **[Point 3]:** [Detail]
-    
-    **Key Differentiators:**
-    - [Diff 1]
-    - [Diff 2]
-    - [Diff 3]
-    
-    **Objection Handling:**
-    - *"[Common Objection]"* -> "[Response]"
-    - *"[Common Objection]"* -> "[Response]"
-    
-    **Recommended Next Step (CTA):**
-    "[Closing question/action]"
-    """
-    
-    user_prompt = f"""
-    Product: {product}
-    Persona: {persona}
-    Industry: {industry}
-    Company Size: {size}
-    
-    REMINDER: This pitch is for a {size} company in {industry}. Do not deviate from these constraints.
-    """
-    
-    ai_response = call_groq_api(system_prompt, user_prompt)
-    if ai_response:
-        return ai_response
-        
-    # Fallback
-    return fallback_sales(product, persona, industry, size)
-
-def fallback_sales(product, persona, industry, size):
-    openers = [
-        f"Hi [Name], I noticed {size} companies in {industry} often struggle with efficiency.",
-        f"Hello [Name], are you tired of outdated tools slowing down your {industry} teams?",
-        f"Hi [Name], we've been helping {size} {industry} firms cut costs by 20%.",
-        f"Hey [Name], quick question about your current {industry} stack."
-    ]
-    
-    value_props = [
-        f"**Purpose-Built:** Unlike generic tools, {product} is designed strictly for {industry}.",
-        f"**Rapid Deployment:** Get your {size} team onboarded in days, not months.",
-        f"**Cost Efficiency:** Replace 3 fragmented tools with one {product}.",
-        f"**Compliance Ready:** Meets all standard {industry} regulatory requirements.",
-        f"**AI-Powered:** Automates the mundane tasks your team hates."
-    ]
-    random.shuffle(value_props)
-    
-    differentiators = [
-        "Superior UX/UI designed for non-technical users.",
-        "24/7 Dedicated Support for Enterprise accounts.",
-        "Proprietary algorithms that predict market shifts.",
-        "Seamless integration with your existing stack.",
-        "No-code customization engine."
-    ]
-    random.shuffle(differentiators)
-    
-    ctas = [
-        "Do you have 10 minutes this week for a quick walkthrough?",
-        "Would you be open to seeing a 5-minute personalized demo?",
-        "Can I send over a case study relevant to your sector?",
-        "Are you free Tuesday morning for a brief chat?"
-    ]
-    
-    return f"""### 💼 B2B Sales Pitch for {persona}
-
-**30-Second Elevator Pitch:**
-"{random.choice(openers)} {product} solves this by streamlining operations and automating manual workflows. We essentially give your team hours back every week, allowing you to focus on high-value strategy rather than grunt work."
-
-**Value Proposition:**
-- {value_props[0]}
-- {value_props[1]}
-- {value_props[2]}
-
-**Key Differentiators:**
-- {differentiators[0]}
-- {differentiators[1]}
-- {differentiators[2]}
-
-**Objection Handling:**
-- *"We don't have budget."* -> "Totally understand. Most of our partners realized that {product} actually **pays for itself** within 3 months by consolidating vendors."
-- *"Is it hard to switch?"* -> "Not at all. Our migration team handles the heavy lifting, ensuring zero downtime for your {size} org."
-
-**Recommended Next Step (CTA):**
-"{random.choice(ctas)}"
-"""
-
-# ==========================================
-# LEAD SCORING
-# ==========================================
-
-def generate_lead_score(product, icp, value_prop, lead_data):
-    system_prompt = f"""You are a Lead Qualification Expert.
-    Analyze the raw lead data against the ICP and Value Prop.
-    
-    CRITICAL CONSTRAINTS:
-    - Ideal Customer Profile (ICP): {icp}
-    - Value Proposition: {value_prop}
-    - Score the lead based STRICTLY on alignment with the ICP
-    - DO NOT make assumptions beyond what is provided in the lead data
-    - Ensure reasoning directly references the ICP and value proposition
-    - Provide a STABLE score (avoid wild fluctuations)
-    - Lock recommendations to score categories:
-      * 75-100 = Hot → Immediate action (call, demo)
-      * 50-74 = Warm → Priority follow-up (case study, nurture)
-      * 25-49 = Lukewarm → Passive nurture (newsletter, monitor)
-      * 0-24 = Cold → Deprioritize (break-up email)
-    
-    Output Format (Markdown):
-    ### 📊 AI Lead Qualification Analysis
-    
-    **Lead Score:** **[0-100]/100**
-    
-    **Category:** <span style="color:[Green/Orange/Red]; font-weight:bold">[Hot/Warm/Lukewarm/Cold]</span>
-    
-    **Reasoning:**
-    - [Reason 1]
-    - [Reason 2]
-    - [Reason 3]
-    
-    **Estimated Conversion Probability:**
-    **[XX]%** based on intent signals.
-    
-    **Recommended Sales Action:**
-    [Specific action matching the category]
-    """
-    
-    user_prompt = f"""
-    Product: {product}
-    ICP: {icp}
-    Value Proposition: {value_prop}
-    Raw Lead Data: {lead_data}
-    
-    REMINDER: Evaluate this lead strictly against the ICP: {icp}
-    """
-    
-    # Generate deterministic seed for stable scoring
-    seed = generate_seed_from_input(product, icp, value_prop, lead_data)
-    
-    # Use decision mode for stable scores and recommendations
-    ai_response = call_groq_api(system_prompt, user_prompt, mode='decision', seed=seed)
-    if ai_response:
-        return ai_response
-        
-    # Fallback with same seed for consistency
-    return fallback_lead_scoring(product, lead_data, seed)
-
-def fallback_lead_scoring(product, lead_data, seed=None):
-    # Generate deterministic base score from inputs
-    if seed is None:
-        seed = generate_seed_from_input(product, lead_data)
-    
-    random.seed(seed)
-    
-    # Base score with narrow variance (±3)
-    base_score = random.randint(47, 53)
-    score = base_score
-    reasons = []
-    
-    lower_data = lead_data.lower()
-    
-    # Keyword Logic with STABLE weights (deterministic)
-    if any(x in lower_data for x in ['budget', 'price', 'quote', 'cost']):
-        boost = 15  # Fixed boost for consistency
-        score += boost
-        reasons.append(f"Financial intent detected (+{boost} pts)")
-    
-    if any(x in lower_data for x in ['urgent', 'asap', 'now', 'deadline']):
-        boost = 20  # Fixed boost
-        score += boost
-        reasons.append(f"High timeline urgency (+{boost} pts)")
-        
-    if any(x in lower_data for x in ['need', 'looking for', 'problem', 'solve']):
-        boost = 10  # Fixed boost
-        score += boost
-        reasons.append(f"Clear pain point match (+{boost} pts)")
-        
-    if any(x in lower_data for x in ['vp', 'director', 'head', 'chief', 'founder']):
-        boost = 10  # Fixed boost
-        score += boost
-        reasons.append("Decision-maker job title detected")
-
-    # Small jitter for realism (±3 points)
-    score += random.randint(-3, 3)
-    
-    # Reset random seed
-    random.seed()
-    
-    if score > 99: score = 99
-    if score < 10: score = 10
-    
-    # Determine Category with LOCKED recommendations
-    if score >= 75:
-        category = "Hot 🔥"
-        color = "#22c55e"
-        # LOCKED: Always immediate action for Hot leads
-        action = "Call immediately (within 15 mins)."
-    elif score >= 50:
-        category = "Warm"
-        color = "#eab308"
-        # LOCKED: Always priority follow-up for Warm leads
-        action = "Send case study and follow up in 2 days."
-    elif score >= 25:
-        category = "Lukewarm"
-        color = "#f59e0b"
-        # LOCKED: Always nurture for Lukewarm leads
-        action = "Add to monthly newsletter and monitor engagement."
-    else:
-        category = "Cold"
-        color = "#3b82f6"
-        # LOCKED: Always deprioritize for Cold leads
-        action = "Send 'break-up' email to gauge interest."
-    
-    # Stable conversion probability (based on score with minimal variance)
-    conversion_prob = int(score * 0.85)
-        
-    return f"""### 📊 AI Lead Qualification Analysis
-
-**Lead Score:** **{score}/100**
-
-**Category:** <span style="color:{color}; font-weight:bold">{category}</span>
-
-**Reasoning:**
-- {reasons[0] if reasons else "Standard inquiry pattern."}
-- Matches core value proposition of {product}.
-- {reasons[1] if len(reasons) > 1 else "Context implies moderate commercial intent."}
-
-**Estimated Conversion Probability:**
-**{conversion_prob}%** based on current signals.
-
-**Recommended Sales Action:**
--> **{action}**
-"""
+import os
+import random
+import time
+import json
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from dotenv import load_dotenv
+
+import groq_client
+import metrics
+from admission import AdmissionController
+from cache import create_cache
+from model_router import LARGE_MODEL, ModelCatalog, ModelRouter, load_routes
+from prompt_builder import (
+    build_edit_prompts,
+    build_lead_json_prompts,
+    build_lead_prompts,
+    build_marketing_prompts,
+    build_marketing_variant_prompts,
+    build_packed_lead_prompts,
+    build_sales_prompts,
+    estimate_tokens,
+    prompt_ceilings,
+)
+from resilience import OPEN, CircuitBreaker, SingleFlight
+from similarity_index import SimilarityIndex, normalize_scope
+from fallback_engine import (
+    categorize_score,
+    fallback_lead_result,
+    fallback_lead_scoring,
+    fallback_marketing,
+    fallback_sales,
+    generate_seed_from_input,
+    input_fingerprint,
+    lead_result,
+    render_lead_result,
+)
+
+load_dotenv()
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Overridable so benchmarks can point the engine at a local stand-in (benchmarks/stub_groq.py)
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# --- Result Cache ---
+# 'memory' is per worker; 'sqlite' is one WAL-mode file shared by every worker on the host
+RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "memory")
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", ".cache/result_cache.sqlite3")
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "2048"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+# Marketing and sales are 'creative' (meant to vary per call), so caching them is opt-in
+RESULT_CACHE_CREATIVE = os.getenv("RESULT_CACHE_CREATIVE", "0") == "1"
+
+# --- Near-duplicate Reuse ---
+# Marketing and sales requests nearly identical to an earlier one (same product and
+# platform / company size; description, audience, persona and industry compared by
+# MinHash similarity, see similarity_index.py):
+# - 'reuse': at or above SIMILAR_THRESHOLD the earlier generation is served as is
+# - 'edit': additionally, at or above SIMILAR_EDIT_THRESHOLD, the earlier generation is
+#   sent to the small model to revise (route "<endpoint>:edit") instead of written anew
+# - 'off': every request is generated (the earlier generations are not indexed)
+SIMILAR_REUSE = os.getenv("SIMILAR_REUSE", "off")
+SIMILAR_THRESHOLD = float(os.getenv("SIMILAR_THRESHOLD", "0.85"))
+SIMILAR_EDIT_THRESHOLD = float(os.getenv("SIMILAR_EDIT_THRESHOLD", "0.6"))
+# Entries kept per worker (LRU); about 2 KB each
+SIMILAR_INDEX_SIZE = int(os.getenv("SIMILAR_INDEX_SIZE", "50000"))
+
+# --- Circuit Breakers & Latency Budgets ---
+# One breaker per model (see model_breaker): while a model's breaker is open its calls
+# go straight to the next model in their route, and with every model's breaker open
+# the endpoints serve their fallbacks immediately
+BREAKER_SETTINGS = dict(
+    window=float(os.getenv("BREAKER_WINDOW", "30")),
+    min_calls=int(os.getenv("BREAKER_MIN_CALLS", "10")),
+    error_rate=float(os.getenv("BREAKER_ERROR_RATE", "0.5")),
+    slow_call_seconds=float(os.getenv("BREAKER_SLOW_CALL", "8")),
+    cooldown=float(os.getenv("BREAKER_COOLDOWN", "15")),
+    probe_calls=int(os.getenv("BREAKER_PROBE_CALLS", "2")),
+)
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+# Seconds an endpoint waits for Groq before returning its fallback (0 = no deadline)
+LATENCY_BUDGETS = {
+    'marketing': float(os.getenv("LATENCY_BUDGET_MARKETING", "9")),
+    'sales': float(os.getenv("LATENCY_BUDGET_SALES", "9")),
+    'lead_scoring': float(os.getenv("LATENCY_BUDGET_LEAD_SCORING", "6")),
+    'lead_scoring_batch': float(os.getenv("LATENCY_BUDGET_LEAD_SCORING_BATCH", "20")),
+}
+# Threads that run deadline-bound calls (abandoned calls finish here in the background)
+DEADLINE_WORKERS = int(os.getenv("DEADLINE_WORKERS", "64"))
+
+# --- Admission Control ---
+# Paces calls to Groq's rate limits. GROQ_RPM / GROQ_TPM seed the buckets before
+# the first x-ratelimit-* headers arrive (0 = learn them from the headers).
+groq_admission = AdmissionController(
+    "groq",
+    rpm=float(os.getenv("GROQ_RPM", "0")),
+    tpm=float(os.getenv("GROQ_TPM", "0")),
+    max_queue=int(os.getenv("ADMISSION_QUEUE_SIZE", "256")),
+    request_window=float(os.getenv("GROQ_REQUEST_LIMIT_WINDOW", "86400")),
+    token_window=float(os.getenv("GROQ_TOKEN_LIMIT_WINDOW", "60")),
+)
+# Queue order when calls must wait (lower first): interactive lead scoring ahead of bulk work
+ADMISSION_PRIORITIES = {
+    'lead_scoring': 0,
+    'sales': 1,
+    'marketing': 2,
+    'lead_scoring_batch': 3,
+}
+
+# --- Model Routing ---
+# Model and max_tokens per endpoint/mode (see model_router.DEFAULT_ROUTES).
+# MODEL_ROUTES is JSON merged over the defaults, e.g.
+#   {"lead_scoring": {"models": ["llama-3.3-70b-versatile"], "max_tokens": 600}}
+GROQ_MODELS_URL = os.getenv("GROQ_MODELS_URL", GROQ_API_URL.rsplit("/chat/completions", 1)[0] + "/models")
+model_router = ModelRouter(
+    load_routes(os.getenv("MODEL_ROUTES", "")),
+    catalog=ModelCatalog(GROQ_MODELS_URL, GROQ_API_KEY, ttl=float(os.getenv("MODEL_CATALOG_TTL", "3600"))),
+    window=float(os.getenv("MODEL_HEALTH_WINDOW", "120")),
+    min_calls=int(os.getenv("MODEL_HEALTH_MIN_CALLS", "5")),
+    error_rate=float(os.getenv("MODEL_ERROR_RATE", "0.3")),
+)
+# Calls per request across the route's models (a single-model route retries only after a 429)
+MODEL_MAX_ATTEMPTS = max(int(os.getenv("MODEL_MAX_ATTEMPTS", "2")), 1)
+# Share of the remaining latency budget a model gets when another one is still left to try
+MODEL_FAILOVER_SHARE = float(os.getenv("MODEL_FAILOVER_SHARE", "0.6"))
+
+# --- Lead Scoring Output ---
+# 'json': the model returns a compact JSON score that is validated against the category
+# thresholds and rendered server-side; 'markdown': the model writes the markdown itself.
+# Batch scoring and format=json requests always use JSON.
+LEAD_SCORING_MODE = os.getenv("LEAD_SCORING_MODE", "json")
+# Completion budget for one JSON lead score (the object itself is ~120 tokens)
+LEAD_JSON_MAX_TOKENS = 200
+
+# --- Batch Scoring ---
+# Max concurrent Groq calls per worker process for batch lead scoring
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+# Leads packed into one Groq call for list scoring (1 = one call per lead)
+LEAD_PACK_SIZE = int(os.getenv("LEAD_PACK_SIZE", "8"))
+
+# --- Multi-platform Campaigns ---
+# Max concurrent Groq calls per worker process for generate_marketing_campaigns
+MULTI_PLATFORM_CONCURRENCY = int(os.getenv("MULTI_PLATFORM_CONCURRENCY", "16"))
+
+# --- Single-flight ---
+# Identical concurrent requests share one upstream call. Lead scoring always
+# coalesces; marketing and sales opt in, since callers there may want variety.
+SINGLE_FLIGHT_CREATIVE = os.getenv("SINGLE_FLIGHT_CREATIVE", "0") == "1"
+
+inflight = SingleFlight()
+
+result_cache = create_cache(
+    RESULT_CACHE_BACKEND,
+    path=RESULT_CACHE_PATH,
+    max_entries=RESULT_CACHE_SIZE,
+    ttl=RESULT_CACHE_TTL,
+)
+
+# Near-duplicate index: (scope, inputs) -> result_cache key of the generation
+similar_index = SimilarityIndex(max_entries=SIMILAR_INDEX_SIZE if SIMILAR_REUSE != 'off' else 0)
+
+# --- Dynamic Assets ---
+
+TONES = [
+    "highly analytical and data-driven",
+    "bold, visionary, and disruptive",
+    "consultative, empathetic, and solution-oriented",
+    "concise, professional, and executive-level",
+    "persuasive, high-energy, and sales-focused"
+]
+
+def normalize_input(value):
+    """Collapse whitespace so trivially re-pasted inputs hash the same."""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split())
+
+def cache_key(endpoint, *args):
+    """Result cache key: endpoint name + hash of the normalized inputs."""
+    return f"{endpoint}:{input_fingerprint(*(normalize_input(arg) for arg in args))}"
+
+def get_stable_temperature(mode='creative'):
+    """
+    Return temperature based on output mode.
+    - 'decision': Low temp (0.4) for stable scores/categories/recommendations
+    - 'creative': High temp (0.7-0.85) for varied explanations and content
+    - 'edit': Moderate temp (0.5) to revise an earlier draft without rewriting it
+    """
+    if mode == 'decision':
+        return 0.4  # Stable for decisions
+    elif mode == 'edit':
+        return 0.5
+    else:
+        return round(random.uniform(0.7, 0.85), 2)  # Creative for explanations
+
+def build_groq_request(system_prompt, user_prompt, mode='creative', seed=None, max_tokens=1200, response_format=None, model=LARGE_MODEL):
+    """Build (headers, payload) for a chat completion, with tone and temperature applied."""
+    # Seeded tone selection uses its own Random, never the shared global generator
+    if seed and mode == 'creative':
+        current_tone = random.Random(seed).choice(TONES)
+    else:
+        current_tone = random.choice(TONES)
+    
+    # Inject tone into system prompt (a revision keeps the draft's tone)
+    if mode == 'edit':
+        enhanced_system_prompt = system_prompt
+    else:
+        enhanced_system_prompt = f"{system_prompt}\n\nIMPORTANT: Adopt a {current_tone} tone. Ensure every response is uniquely phrased and avoids repetitive patterns."
+
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": enhanced_system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": get_stable_temperature(mode),
+        "max_tokens": max_tokens,
+        "top_p": 0.95
+    }
+    if response_format:
+        payload["response_format"] = response_format
+    return headers, payload
+
+_executor_lock = threading.Lock()
+_executors = {}
+
+def _shared_executor(name, max_workers):
+    """Process-wide named thread pool, rebuilt after fork."""
+    pid = os.getpid()
+    executor = _executors.get(name)
+    if executor is None or executor[0] != pid:
+        with _executor_lock:
+            executor = _executors.get(name)
+            if executor is None or executor[0] != pid:
+                executor = (pid, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name))
+                _executors[name] = executor
+    return executor[1]
+
+def model_breaker(model):
+    """The circuit breaker for one model, created on first use."""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(model)
+            if breaker is None:
+                breaker = _breakers[model] = CircuitBreaker(model, **BREAKER_SETTINGS)
+    return breaker
+
+class GroqUnavailable(RuntimeError):
+    """Raised when Groq can't be used right now; `fallback_reason` labels the fallback."""
+
+    def __init__(self, fallback_reason, message):
+        super().__init__(message)
+        self.fallback_reason = fallback_reason
+
+def cached_result(endpoint, key):
+    """result_cache.get, counted per endpoint for /metrics."""
+    cached = result_cache.get(key)
+    metrics.record_cache(endpoint, bool(cached))
+    return cached
+
+def similar_generation(endpoint, scope, fields):
+    """
+    ('reuse' or 'edit', earlier generation) for inputs near an indexed earlier request,
+    or None when SIMILAR_REUSE is off or nothing close enough is still cached.
+    """
+    if SIMILAR_REUSE not in ('reuse', 'edit'):
+        return None
+    floor = SIMILAR_EDIT_THRESHOLD if SIMILAR_REUSE == 'edit' else SIMILAR_THRESHOLD
+    match = similar_index.lookup(scope, fields, floor)
+    previous = result_cache.get(match.value) if match else None
+    if not previous:
+        metrics.record_similar(endpoint, "miss")
+        return None
+    outcome = "reuse" if match.similarity >= SIMILAR_THRESHOLD else "edit"
+    metrics.record_similar(endpoint, outcome, match.similarity)
+    return outcome, previous
+
+def remember_generation(key, scope, fields, text):
+    """Cache a marketing/sales generation (when enabled) and index it for near-duplicate reuse."""
+    if RESULT_CACHE_CREATIVE or SIMILAR_REUSE != 'off':
+        result_cache.set(key, text)
+    if SIMILAR_REUSE != 'off':
+        similar_index.add(scope, fields, key)
+
+def marketing_similarity(product, description, audience, platform):
+    """(scope, fields) of a marketing request for similar_index."""
+    return ('marketing',) + normalize_scope(product, platform), {'description': description, 'audience': audience}
+
+def sales_similarity(product, persona, industry, size):
+    """(scope, fields) of a sales request for similar_index."""
+    return ('sales',) + normalize_scope(product, size), {'persona': persona, 'industry': industry}
+
+def plan_generation(endpoint, prompt, scope, fields):
+    """
+    (reused text, prompt, mode) for a marketing/sales call: the text of a near-identical earlier
+    request to serve as is, or the prompt (recorded in metrics) and mode to call Groq with.
+    """
+    similar = similar_generation(endpoint, scope, fields)
+    if similar is None:
+        return None, metrics.record_prompt(endpoint, prompt), 'creative'
+    outcome, previous = similar
+    if outcome == 'reuse':
+        return previous, prompt, 'creative'
+    # 'edit': revise the earlier generation instead of writing a new one
+    return None, metrics.record_prompt(endpoint, build_edit_prompts(prompt, previous)), 'edit'
+
+def admit(endpoint, tokens, timeout=None):
+    """Wait for the admission controller; False means shed (serve the fallback)."""
+    started = time.perf_counter()
+    admitted = groq_admission.acquire(ADMISSION_PRIORITIES.get(endpoint, 1), tokens, timeout)
+    metrics.record_admission(endpoint, admitted, time.perf_counter() - started)
+    return admitted
+
+def reserved_tokens(system_prompt, user_prompt, max_tokens):
+    """Tokens to hold back for a call until its real usage is known."""
+    return estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+
+def route_call(endpoint, mode, max_tokens=None):
+    """Pick the models to try and the max_tokens for a call; the decision is counted in /metrics."""
+    route = model_router.route(endpoint, mode)
+    metrics.record_route(endpoint, route)
+    return route, max_tokens or route.max_tokens or 1200
+
+def has_failover(route, attempt):
+    """True if a different model is left to try after `attempt`."""
+    return attempt + 1 < MODEL_MAX_ATTEMPTS and route.model_for(attempt + 1) != route.model_for(attempt)
+
+def attempt_timeout(route, attempt, remaining):
+    """Seconds an attempt may take: a share of what's left while another model remains to try."""
+    return remaining * MODEL_FAILOVER_SHARE if has_failover(route, attempt) else remaining
+
+def retry_after_failure(route, attempt, reason, endpoint=None):
+    """Whether a failed attempt gets another: on the next model, or on the same one after a 429."""
+    if has_failover(route, attempt):
+        metrics.record_failover(endpoint, route.model_for(attempt), route.model_for(attempt + 1), reason)
+        return True
+    return reason == "rate_limited" and attempt + 1 < MODEL_MAX_ATTEMPTS
+
+def call_groq_api(system_prompt, user_prompt, mode='creative', seed=None, max_tokens=None, response_format=None, endpoint=None):
+    """
+    Calls the Groq API with mode-specific temperature.
+    - mode: 'decision' for stable outputs, 'creative' for varied outputs
+    - seed: Optional seed for deterministic randomness in creative elements
+    - max_tokens: Optional; defaults to the endpoint's route (model_router)
+    - response_format: Optional OpenAI-style format, e.g. {"type": "json_object"}
+    - endpoint: Key into LATENCY_BUDGETS; past the deadline None is returned and the call abandoned
+    Returns None whenever the caller should fall back; the reason is recorded in metrics.
+    """
+    if not GROQ_API_KEY:
+        metrics.record_fallback(endpoint, "no_key")
+        return None
+
+    route, max_tokens = route_call(endpoint, mode, max_tokens)
+    headers, payload = build_groq_request(system_prompt, user_prompt, mode, seed, max_tokens, response_format)
+    tokens = reserved_tokens(system_prompt, user_prompt, max_tokens)
+
+    # Queue wait counts against the latency budget; a failed call moves on to the route's next model
+    budget = LATENCY_BUDGETS.get(endpoint)
+    started = time.perf_counter()
+    for attempt in range(MODEL_MAX_ATTEMPTS):
+        model = route.model_for(attempt)
+        breaker = model_breaker(model)
+        remaining = budget - (time.perf_counter() - started) if budget else None
+        error = None
+        if breaker.state == OPEN:
+            # Straight on to the next model, without spending an admission slot
+            reason = "breaker_open"
+        elif not admit(endpoint, tokens, remaining):
+            metrics.record_fallback(endpoint, "shed")
+            return None
+        elif not breaker.allow():
+            # No call goes out, so the admission is handed back
+            groq_admission.release(tokens)
+            reason = "breaker_open"
+        else:
+            # A fresh payload per attempt: an abandoned call may still be reading its own
+            attempt_payload = dict(payload, model=model)
+            # Whoever takes this first reports the attempt: the call when it finishes, or the deadline
+            report = threading.Lock()
+            attempt_started = time.perf_counter()
+            try:
+                if not budget:
+                    return _post_completion(headers, attempt_payload, endpoint, tokens)
+                # The worker thread runs in a copy of this context, so it reports into the request's trace
+                future = _shared_executor("groq-deadline", DEADLINE_WORKERS).submit(
+                    contextvars.copy_context().run, _post_completion, headers, attempt_payload, endpoint, tokens, report
+                )
+                remaining = budget - (time.perf_counter() - started)
+                return future.result(timeout=max(attempt_timeout(route, attempt, remaining), 0))
+            except FuturesTimeout:
+                reason, error = "timeout", f"{endpoint} exceeded its {budget}s latency budget"
+                if future.cancel():
+                    # Never started: it won't reach Groq, so hand its admission back
+                    groq_admission.release(tokens)
+                # Report the timeout now, so an outage trips the breaker while it lasts
+                if report.acquire(blocking=False):
+                    record_call(endpoint, model, reason, time.perf_counter() - attempt_started)
+            except Exception as e:
+                reason, error = metrics.classify_error(e), e
+        if retry_after_failure(route, attempt, reason, endpoint):
+            continue
+        metrics.record_fallback(endpoint, reason)
+        if error:
+            metrics.report_error("Groq API", error)
+        return None
+
+def _post_completion(headers, payload, endpoint=None, tokens=0, report=None):
+    """
+    POST one chat completion and return its content. The call reports to the breaker and
+    router when it finishes unless `report` (a Lock) was already taken by its deadline.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = groq_client.post(GROQ_API_URL, headers=headers, json=payload)
+        check_rate_limits(response, tokens)
+        response.raise_for_status()
+        data = response.json()
+        content = data['choices'][0]['message']['content']
+        if not content:
+            raise ValueError("Groq returned an empty completion")
+        usage = data.get('usage') or {}
+        metrics.record_usage(endpoint, usage)
+        groq_admission.settle(tokens, usage.get('total_tokens'))
+        outcome = "ok"
+        return content
+    except Exception as e:
+        outcome = metrics.classify_error(e)
+        settle_failed_call(tokens, outcome)
+        raise
+    finally:
+        # A call abandoned at its deadline was already reported as a timeout
+        if report is None or report.acquire(blocking=False):
+            record_call(endpoint, payload['model'], outcome, time.perf_counter() - started)
+
+def record_call(endpoint, model, outcome, elapsed):
+    """Report a finished Groq call to the breaker, the model router and /metrics."""
+    # A 429 is the admission controller's business, and a cancelled stream the browser's:
+    # neither says the upstream is unhealthy
+    healthy = outcome in ("ok", "cancelled", "rate_limited")
+    model_breaker(model).record(healthy, elapsed)
+    if outcome != "cancelled":
+        model_router.record(model, not healthy, elapsed)
+    metrics.record_groq_call(endpoint, outcome, elapsed, model)
+
+def settle_failed_call(tokens, outcome):
+    """Return a failed call's token reservation: an error answer used none.
+    A timed-out call may still be generating, and a 429 settles itself in check_rate_limits."""
+    if outcome not in ("timeout", "rate_limited"):
+        groq_admission.settle(tokens, 0)
+
+def check_rate_limits(response, tokens=0):
+    """Feed a response's rate-limit headers to admission control; raise on 429."""
+    groq_admission.observe(response.headers)
+    if response.status_code == 429:
+        groq_admission.throttle(response.headers.get('retry-after'))
+        # Rejected requests don't count against the token quota
+        groq_admission.settle(tokens, 0)
+        raise GroqUnavailable("rate_limited", "Groq rate limit reached (429)")
+
+def stream_groq_api(system_prompt, user_prompt, mode='creative', seed=None, max_tokens=None, endpoint=None):
+    """
+    Streaming variant of call_groq_api (stream=true). Yields content deltas as they arrive.
+    Uses the route's first model whose breaker isn't open; there is no failover once output has started.
+    Raises on any transport or protocol error so callers can switch to a fallback.
+    """
+    if not GROQ_API_KEY:
+        raise GroqUnavailable("no_key", "GROQ_API_KEY not configured")
+    route, max_tokens = route_call(endpoint, mode, max_tokens)
+    model = next((model for model in route.models if model_breaker(model).state != OPEN), None)
+    if model is None:
+        raise GroqUnavailable("breaker_open", "Circuit breaker open for every model in the route")
+    tokens = reserved_tokens(system_prompt, user_prompt, max_tokens)
+    if not admit(endpoint, tokens, LATENCY_BUDGETS.get(endpoint) or None):
+        raise GroqUnavailable("shed", "Admission queue wait exceeds the latency budget")
+    if not model_breaker(model).allow():
+        groq_admission.release(tokens)
+        raise GroqUnavailable("breaker_open", "Circuit breaker open")
+
+    headers, payload = build_groq_request(system_prompt, user_prompt, mode, seed, max_tokens, model=model)
+    payload["stream"] = True
+
+    started = time.perf_counter()
+    outcome = "error"
+    settled = False
+    try:
+        with groq_client.post(GROQ_API_URL, headers=headers, json=payload, stream=True) as response:
+            check_rate_limits(response, tokens)
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    outcome = "ok"
+                    return
+                chunk = json.loads(data)
+                # Usage arrives on the last chunk (Groq nests it under x_groq)
+                usage = chunk.get('usage') or (chunk.get('x_groq') or {}).get('usage')
+                if usage:
+                    metrics.record_usage(endpoint, usage)
+                    groq_admission.settle(tokens, usage.get('total_tokens'))
+                    settled = True
+                choices = chunk.get('choices') or [{}]
+                delta = choices[0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
+        raise ValueError("Groq stream ended without [DONE]")
+    except GeneratorExit:
+        # The browser went away; that says nothing about upstream health
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        outcome = metrics.classify_error(e)
+        if not settled:
+            settle_failed_call(tokens, outcome)
+        raise
+    finally:
+        record_call(endpoint, payload['model'], outcome, time.perf_counter() - started)
+
+def stream_with_fallback(system_prompt, user_prompt, fallback, cache_key_value=None, endpoint=None):
+    """
+    Relay a streamed generation as (event, text) pairs:
+    - ('chunk', text): append to what has been shown so far
+    - ('replace', text): discard what was shown and show this instead (cache hit or fallback)
+    - ('done', text): final complete output
+    """
+    if cache_key_value:
+        cached = cached_result(endpoint, cache_key_value)
+        if cached:
+            yield 'replace', cached
+            yield 'done', cached
+            return
+
+    parts = []
+    try:
+        for delta in stream_groq_api(system_prompt, user_prompt, endpoint=endpoint):
+            parts.append(delta)
+            yield 'chunk', delta
+    except Exception as e:
+        metrics.record_fallback(endpoint, metrics.classify_error(e))
+        metrics.report_error("Groq Stream", e)
+        result = fallback()
+        yield 'replace', result
+        yield 'done', result
+        return
+
+    result = ''.join(parts)
+    if not result:
+        metrics.record_fallback(endpoint, "parse_error")
+        result = fallback()
+        yield 'replace', result
+    elif cache_key_value:
+        result_cache.set(cache_key_value, result)
+    yield 'done', result
+
+def engine_stats():
+    """Process-local runtime stats for the AI engine (connection pool, cache, etc.)."""
+    return {
+        "pid": os.getpid(),
+        "http_pool": groq_client.pool_stats(),
+        "result_cache": result_cache.stats(),
+        "circuit_breakers": {model: breaker.snapshot() for model, breaker in list(_breakers.items())},
+        "admission": groq_admission.snapshot(),
+        "model_router": model_router.snapshot(),
+        "single_flight": inflight.stats(),
+        "prompt_ceilings": prompt_ceilings(),
+        "similar_index": similar_index.stats(),
+    }
+
+# ==========================================
+# MARKETING CAMPAIGN GENERATOR
+# ==========================================
+
+def generate_marketing_campaign(product, description, audience, platform):
+    key = cache_key('marketing', product, description, audience, platform)
+    if RESULT_CACHE_CREATIVE:
+        cached = cached_result('marketing', key)
+        if cached:
+            return cached
+    if SINGLE_FLIGHT_CREATIVE:
+        return inflight.do(key, _generate_marketing_campaign, key, product, description, audience, platform)
+    return _generate_marketing_campaign(key, product, description, audience, platform)
+
+def _generate_marketing_campaign(key, product, description, audience, platform, prompt=None):
+    if prompt is None:
+        prompt = build_marketing_prompts(product, description, audience, platform)
+    scope, fields = marketing_similarity(product, description, audience, platform)
+    reused, (system_prompt, user_prompt), mode = plan_generation('marketing', prompt, scope, fields)
+    if reused:
+        return reused
+    
+    # AI Call
+    ai_response = call_groq_api(system_prompt, user_prompt, mode=mode, endpoint='marketing')
+    if ai_response:
+        remember_generation(key, scope, fields, ai_response)
+        return ai_response
+        
+    # Fallback
+    return fallback_marketing(product, description, audience, platform)
+
+def _marketing_variant(product, description, audience, platform, prompt):
+    """One platform of generate_marketing_campaigns; a failure falls back for that platform only."""
+    try:
+        key = cache_key('marketing', product, description, audience, platform)
+        if RESULT_CACHE_CREATIVE:
+            cached = cached_result('marketing', key)
+            if cached:
+                return cached
+        if SINGLE_FLIGHT_CREATIVE:
+            return inflight.do(key, _generate_marketing_campaign, key, product, description, audience, platform, prompt)
+        return _generate_marketing_campaign(key, product, description, audience, platform, prompt)
+    except Exception as e:
+        metrics.record_fallback('marketing', 'exception')
+        metrics.report_error(f"Marketing ({platform})", e)
+        return fallback_marketing(product, description, audience, platform)
+
+def generate_marketing_campaigns(product, description, audience, platforms):
+    """
+    The same campaign for several platforms, generated concurrently from prompts built together.
+    Yields (platform, campaign) in completion order; duplicate and blank platforms are dropped.
+    """
+    prompts = build_marketing_variant_prompts(product, description, audience, platforms)
+    executor = _shared_executor("marketing-multi", MULTI_PLATFORM_CONCURRENCY)
+    futures = {
+        executor.submit(_marketing_variant, product, description, audience, platform, prompt): platform
+        for platform, prompt in prompts.items()
+    }
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Client went away mid-stream: don't spend upstream calls on platforms not started yet
+        for future in futures:
+            future.cancel()
+
+def stream_marketing_campaign(product, description, audience, platform):
+    """Token-streaming variant of generate_marketing_campaign; yields (event, text) pairs."""
+    system_prompt, user_prompt = build_marketing_prompts(product, description, audience, platform)
+    key = cache_key('marketing', product, description, audience, platform) if RESULT_CACHE_CREATIVE else None
+    return stream_with_fallback(
+        system_prompt,
+        user_prompt,
+        lambda: fallback_marketing(product, description, audience, platform),
+        key,
+        'marketing',
+    )
+
+# ==========================================
+# SALES PITCH GENERATOR
+# ==========================================
+
+def generate_sales_pitch(product, persona, industry, size):
+    key = cache_key('sales', product, persona, industry, size)
+    if RESULT_CACHE_CREATIVE:
+        cached = cached_result('sales', key)
+        if cached:
+            return cached
+    if SINGLE_FLIGHT_CREATIVE:
+        return inflight.do(key, _generate_sales_pitch, key, product, persona, industry, size)
+    return _generate_sales_pitch(key, product, persona, industry, size)
+
+def _generate_sales_pitch(key, product, persona, industry, size):
+    prompt = build_sales_prompts(product, persona, industry, size)
+    scope, fields = sales_similarity(product, persona, industry, size)
+    reused, (system_prompt, user_prompt), mode = plan_generation('sales', prompt, scope, fields)
+    if reused:
+        return reused
+    
+    ai_response = call_groq_api(system_prompt, user_prompt, mode=mode, endpoint='sales')
+    if ai_response:
+        remember_generation(key, scope, fields, ai_response)
+        return ai_response
+        
+    # Fallback
+    return fallback_sales(product, persona, industry, size)
+
+def stream_sales_pitch(product, persona, industry, size):
+    """Token-streaming variant of generate_sales_pitch; yields (event, text) pairs."""
+    system_prompt, user_prompt = build_sales_prompts(product, persona, industry, size)
+    key = cache_key('sales', product, persona, industry, size) if RESULT_CACHE_CREATIVE else None
+    return stream_with_fallback(
+        system_prompt,
+        user_prompt,
+        lambda: fallback_sales(product, persona, industry, size),
+        key,
+        'sales',
+    )
+
+# ==========================================
+# LEAD SCORING
+# ==========================================
+
+def generate_lead_score(product, icp, value_prop, lead_data, output='markdown'):
+    """
+    Score one lead. output='markdown' returns the dashboard's markdown block;
+    output='json' returns the structured lead_result dict (see score_lead).
+    """
+    if output == 'json' or LEAD_SCORING_MODE == 'json':
+        result = score_lead(product, icp, value_prop, lead_data)
+        return result if output == 'json' else render_lead_result(result)
+
+    # Decision mode is meant to be stable, so repeat submissions are served from cache
+    key = cache_key('lead_scoring', product, icp, value_prop, lead_data)
+    cached = cached_result('lead_scoring', key)
+    if cached:
+        return render_cached_lead(cached)
+    # A double-click or a teammate scoring the same lead shares the in-flight call
+    return inflight.do(key, _generate_lead_score, key, product, icp, value_prop, lead_data)
+
+def _generate_lead_score(key, product, icp, value_prop, lead_data):
+    system_prompt, user_prompt = metrics.record_prompt('lead_scoring', build_lead_prompts(product, icp, value_prop, lead_data))
+    
+    # Generate deterministic seed for stable scoring
+    seed = generate_seed_from_input(product, icp, value_prop, lead_data)
+    
+    # Use decision mode for stable scores and recommendations
+    ai_response = call_groq_api(system_prompt, user_prompt, mode='decision', seed=seed, endpoint='lead_scoring')
+    if ai_response:
+        result_cache.set(key, ai_response)
+        return ai_response
+        
+    # Fallback with same seed for consistency
+    return fallback_lead_scoring(product, lead_data, seed)
+
+def score_lead(product, icp, value_prop, lead_data):
+    """Structured score for one lead (a lead_result dict): validated model JSON, else the fallback's."""
+    key = cache_key('lead_scoring', product, icp, value_prop, lead_data)
+    cached = cached_lead_result('lead_scoring', key)
+    if cached:
+        return cached
+    # Own single-flight key: markdown-mode callers of the same lead expect a string
+    return inflight.do(f"{key}:json", _score_lead, key, product, icp, value_prop, lead_data)
+
+def _score_lead(key, product, icp, value_prop, lead_data):
+    system_prompt, user_prompt = metrics.record_prompt('lead_scoring', build_lead_json_prompts(product, icp, value_prop, lead_data))
+    seed = generate_seed_from_input(product, icp, value_prop, lead_data)
+    ai_response = call_groq_api(
+        system_prompt,
+        user_prompt,
+        mode='decision',
+        seed=seed,
+        max_tokens=LEAD_JSON_MAX_TOKENS,
+        response_format={"type": "json_object"},
+        endpoint='lead_scoring',
+    )
+    result = parse_lead_response(ai_response, 'lead_scoring') if ai_response else None
+    if result:
+        result_cache.set(key, json.dumps(result))
+        return result
+    return fallback_lead_result(product, lead_data, seed)
+
+# Lead results share one cache key per lead: JSON mode stores the lead_result as JSON
+# text, markdown mode the model's markdown. Either mode can read the other's JSON.
+
+def cached_lead_result(endpoint, key):
+    """A cached lead_result dict, or None (markdown cached by markdown mode counts as a miss)."""
+    cached = cached_result(endpoint, key)
+    if cached and cached.startswith('{'):
+        return json.loads(cached)
+    return None
+
+def render_cached_lead(cached):
+    """Markdown for a cached lead score, whichever mode stored it."""
+    return render_lead_result(json.loads(cached)) if cached.startswith('{') else cached
+
+# ==========================================
+# BATCH LEAD SCORING
+# ==========================================
+
+def _get_batch_executor():
+    """Process-wide pool so concurrent batch requests share one concurrency bound."""
+    return _shared_executor("lead-batch", BATCH_CONCURRENCY)
+
+def _score_lead_safely(product, icp, value_prop, lead_data):
+    try:
+        return score_lead(product, icp, value_prop, lead_data)
+    except Exception as e:
+        metrics.record_fallback('lead_scoring', 'exception')
+        metrics.report_error("Batch lead", e)
+        return fallback_lead_result(product, lead_data)
+
+def score_leads_concurrently(product, icp, value_prop, leads):
+    """
+    Score many leads sharing one product/ICP/value prop.
+    Yields (index, lead_result dict) in completion order; a failing lead falls back on its own.
+    """
+    executor = _get_batch_executor()
+    futures = {
+        executor.submit(_score_lead_safely, product, icp, value_prop, lead_data): index
+        for index, lead_data in enumerate(leads)
+    }
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Client went away mid-stream: don't spend upstream calls on queued leads
+        for future in futures:
+            future.cancel()
+
+# --- Multi-lead packing ---
+# N leads share one prompt (ICP, value prop and rubric are sent once) and come
+# back as structured JSON that is rendered into the usual per-lead markdown.
+
+PACKED_TOKENS_PER_LEAD = 160
+
+def parse_lead_entry(entry):
+    """
+    Validate one structured lead result. Returns (score, category, color, reasons, conversion_prob, action)
+    or None if malformed. Category and color are always re-derived from the score thresholds; when the
+    model's own category disagrees with them, its action is replaced by the locked one as well.
+    """
+    if not isinstance(entry, dict):
+        return None
+    try:
+        score = int(round(float(entry.get("score"))))
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= score <= 100:
+        return None
+
+    reasons = [str(r).strip() for r in (entry.get("reasons") or []) if str(r).strip()]
+    if not reasons:
+        return None
+
+    category, color, locked_action = categorize_score(score)
+    try:
+        conversion_prob = int(round(float(entry.get("conversion_probability"))))
+    except (TypeError, ValueError):
+        conversion_prob = int(score * 0.85)
+    conversion_prob = min(max(conversion_prob, 0), 100)
+    action = str(entry.get("action") or "").strip() or locked_action
+    claimed = str(entry.get("category") or "").strip().lower()
+    if claimed and not category.lower().startswith(claimed.split()[0]):
+        action = locked_action
+    return score, category, color, reasons[:3], conversion_prob, action
+
+def parse_lead_response(ai_response, endpoint=None):
+    """lead_result dict from a single-lead JSON completion, or None (counted as a parse_error fallback)."""
+    try:
+        entry = json.loads(ai_response)
+        if isinstance(entry, dict) and isinstance(entry.get("leads"), list) and entry["leads"]:
+            entry = entry["leads"][0]  # the model copied the packed format
+        parsed = parse_lead_entry(entry)
+        if parsed is None:
+            raise ValueError(f"Invalid lead score object: {ai_response[:200]}")
+    except ValueError as e:
+        metrics.record_fallback(endpoint, 'parse_error')
+        metrics.report_error("Lead JSON parse", e)
+        return None
+    return lead_result(*parsed, source="ai")
+
+def score_lead_pack(product, icp, value_prop, leads):
+    """
+    Score a pack of leads in one call. Returns a list of lead_result dicts aligned with `leads`;
+    entries the model omitted or malformed are re-scored individually.
+    """
+    results = [None] * len(leads)
+    for index, lead_data in enumerate(leads):
+        results[index] = cached_lead_result('lead_scoring_batch', cache_key('lead_scoring', product, icp, value_prop, lead_data))
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    if len(pending) > 1:
+        system_prompt, user_prompt = metrics.record_prompt('lead_scoring_batch', build_packed_lead_prompts(
+            product, icp, value_prop, [leads[index] for index in pending]
+        ))
+        ai_response = call_groq_api(
+            system_prompt,
+            user_prompt,
+            mode='decision',
+            max_tokens=PACKED_TOKENS_PER_LEAD * len(pending) + 100,
+            response_format={"type": "json_object"},
+            endpoint='lead_scoring_batch',
+        )
+        entries = []
+        if ai_response:
+            try:
+                entries = json.loads(ai_response).get("leads") or []
+            except (ValueError, AttributeError) as e:
+                metrics.record_fallback('lead_scoring_batch', 'parse_error')
+                metrics.report_error("Packed lead parse", e)
+
+        for position, entry in enumerate(entries):
+            # Prefer the model's own lead number; fall back to list position
+            number = entry.get("lead") if isinstance(entry, dict) else None
+            slot = number - 1 if isinstance(number, int) and 0 < number <= len(pending) else position
+            if slot >= len(pending) or results[pending[slot]] is not None:
+                continue
+            parsed = parse_lead_entry(entry)
+            if parsed:
+                index = pending[slot]
+                results[index] = lead_result(*parsed, source="ai")
+                result_cache.set(cache_key('lead_scoring', product, icp, value_prop, leads[index]), json.dumps(results[index]))
+
+    # Anything still missing (malformed, omitted, or a single lead) goes through the normal path
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = _score_lead_safely(product, icp, value_prop, leads[index])
+    return results
+
+def _score_pack_safely(product, icp, value_prop, indexed_leads):
+    leads = [lead_data for _, lead_data in indexed_leads]
+    try:
+        results = score_lead_pack(product, icp, value_prop, leads)
+    except Exception as e:
+        metrics.record_fallback('lead_scoring_batch', 'exception')
+        metrics.report_error("Packed batch", e)
+        results = [fallback_lead_result(product, lead_data) for lead_data in leads]
+    return [(index, result) for (index, _), result in zip(indexed_leads, results)]
+
+def score_leads_packed(product, icp, value_prop, leads, pack_size=None):
+    """
+    Like score_leads_concurrently, but packs `pack_size` leads into each Groq call.
+    Packs run concurrently; yields (index, result) as each pack completes.
+    """
+    pack_size = max(int(pack_size or LEAD_PACK_SIZE), 1)
+    if pack_size == 1:
+        yield from score_leads_concurrently(product, icp, value_prop, leads)
+        return
+
+    indexed = list(enumerate(leads))
+    packs = [indexed[start:start + pack_size] for start in range(0, len(indexed), pack_size)]
+    executor = _get_batch_executor()
+    futures = [executor.submit(_score_pack_safely, product, icp, value_prop, pack) for pack in packs]
+    try:
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def lead_packing_report(product, icp, value_prop, leads, pack_size=None):
+    """Estimated prompt tokens and request count per lead: one call per lead vs packed."""
+    pack_size = max(int(pack_size or LEAD_PACK_SIZE), 1)
+    if not leads:
+        return {"leads": 0, "pack_size": pack_size}
+
+    single_tokens = 0
+    for lead_data in leads:
+        single_tokens += build_lead_prompts(product, icp, value_prop, lead_data).tokens
+
+    packed_tokens = 0
+    for start in range(0, len(leads), pack_size):
+        packed_tokens += build_packed_lead_prompts(product, icp, value_prop, leads[start:start + pack_size]).tokens
+
+    count = len(leads)
+    return {
+        "leads": count,
+        "pack_size": pack_size,
+        "requests_single": count,
+        "requests_packed": -(-count // pack_size),
+        "prompt_tokens_per_lead_single": round(single_tokens / count, 1),
+        "prompt_tokens_per_lead_packed": round(packed_tokens / count, 1),
+    }
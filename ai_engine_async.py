@@ -0,0 +1,276 @@
+import asyncio
+import json
+import time
+import httpx
+
+import ai_engine
+import groq_client
+import metrics
+from resilience import OPEN, AsyncSingleFlight
+from ai_engine import (
+    ADMISSION_PRIORITIES,
+    build_groq_request,
+    build_lead_json_prompts,
+    build_lead_prompts,
+    build_marketing_prompts,
+    build_sales_prompts,
+    LATENCY_BUDGETS,
+    MODEL_MAX_ATTEMPTS,
+    attempt_timeout,
+    cache_key,
+    cached_lead_result,
+    cached_result,
+    check_rate_limits,
+    fallback_lead_result,
+    fallback_lead_scoring,
+    fallback_marketing,
+    fallback_sales,
+    generate_seed_from_input,
+    groq_admission,
+    marketing_similarity,
+    model_breaker,
+    parse_lead_response,
+    plan_generation,
+    record_call,
+    remember_generation,
+    render_cached_lead,
+    render_lead_result,
+    reserved_tokens,
+    result_cache,
+    retry_after_failure,
+    route_call,
+    sales_similarity,
+    settle_failed_call,
+)
+
+# ==========================================
+# ASYNC ENGINE
+# ==========================================
+#
+# Non-blocking counterparts of call_groq_api and the generate_* functions, for
+# the ASGI entry point (asgi.py). Prompts, caching and fallbacks are shared with
+# the sync engine, which keeps working unchanged for scripts.
+
+_clients = {}
+
+# Coalesces identical in-flight requests on the event loop (same rules as ai_engine.inflight)
+inflight = AsyncSingleFlight()
+
+
+def get_client():
+    """One pooled httpx.AsyncClient per event loop (connections can't cross loops)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(groq_client.READ_TIMEOUT, connect=groq_client.CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=groq_client.POOL_MAXSIZE * 8,
+                max_keepalive_connections=groq_client.POOL_MAXSIZE,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=groq_client.MAX_RETRIES),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def warm_up_async(connections):
+    """Open this event loop's pooled connections to Groq before traffic arrives; returns how many answered."""
+    if not ai_engine.GROQ_API_KEY or connections <= 0:
+        return 0
+    client = get_client()
+    headers = {"Authorization": f"Bearer {ai_engine.GROQ_API_KEY}"}
+    results = await asyncio.gather(
+        *(client.get(ai_engine.GROQ_MODELS_URL, headers=headers) for _ in range(connections)),
+        return_exceptions=True,
+    )
+    return sum(1 for result in results if not isinstance(result, Exception))
+
+
+async def close_clients():
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
+
+async def call_groq_api_async(system_prompt, user_prompt, mode='creative', seed=None, max_tokens=None, response_format=None, endpoint=None):
+    """Async call_groq_api: same arguments, same None-on-failure contract, same breaker, budgets, admission and routing."""
+    if not ai_engine.GROQ_API_KEY:
+        metrics.record_fallback(endpoint, "no_key")
+        return None
+
+    route, max_tokens = route_call(endpoint, mode, max_tokens)
+    headers, payload = build_groq_request(system_prompt, user_prompt, mode, seed, max_tokens, response_format)
+    tokens = reserved_tokens(system_prompt, user_prompt, max_tokens)
+    budget = LATENCY_BUDGETS.get(endpoint)
+    first_started = time.perf_counter()
+
+    for attempt in range(MODEL_MAX_ATTEMPTS):
+        model = route.model_for(attempt)
+        breaker = model_breaker(model)
+        remaining = budget - (time.perf_counter() - first_started) if budget else None
+        error = None
+        if breaker.state == OPEN:
+            outcome = "breaker_open"
+        elif not await admit_async(endpoint, tokens, remaining):
+            metrics.record_fallback(endpoint, "shed")
+            return None
+        elif not breaker.allow():
+            # No call goes out, so the admission is handed back
+            groq_admission.release(tokens)
+            outcome = "breaker_open"
+        else:
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                # Past its share of the budget the request is cancelled outright
+                remaining = budget - (started - first_started) if budget else None
+                timeout = max(attempt_timeout(route, attempt, remaining), 0.001) if budget else None
+                content = await asyncio.wait_for(
+                    _post_completion(headers, dict(payload, model=model), endpoint, tokens), timeout=timeout
+                )
+                outcome = "ok"
+                return content
+            except asyncio.TimeoutError:
+                outcome, error = "timeout", f"{endpoint} exceeded its {budget}s latency budget"
+            except Exception as e:
+                outcome, error = metrics.classify_error(e), e
+                settle_failed_call(tokens, outcome)
+            finally:
+                record_call(endpoint, model, outcome, time.perf_counter() - started)
+        # A failed call moves on to the next model; a 429 is retried once after Retry-After
+        if retry_after_failure(route, attempt, outcome, endpoint):
+            continue
+        metrics.record_fallback(endpoint, outcome)
+        if error:
+            metrics.report_error("Groq API", error)
+        return None
+
+
+async def admit_async(endpoint, tokens, timeout=None):
+    """ai_engine.admit for coroutines."""
+    started = time.perf_counter()
+    admitted = await groq_admission.acquire_async(ADMISSION_PRIORITIES.get(endpoint, 1), tokens, timeout)
+    metrics.record_admission(endpoint, admitted, time.perf_counter() - started)
+    return admitted
+
+
+async def _post_completion(headers, payload, endpoint=None, tokens=0):
+    client = get_client()
+    # Transport retries cover connection errors; retry transient 5xx (RETRY_STATUSES) here
+    for attempt in range(groq_client.MAX_RETRIES + 1):
+        response = await client.post(ai_engine.GROQ_API_URL, headers=headers, json=payload)
+        if response.status_code not in groq_client.RETRY_STATUSES or attempt == groq_client.MAX_RETRIES:
+            break
+        await asyncio.sleep(groq_client.RETRY_BACKOFF * (2 ** attempt))
+    check_rate_limits(response, tokens)
+    response.raise_for_status()
+    data = response.json()
+    content = data['choices'][0]['message']['content']
+    if not content:
+        raise ValueError("Groq returned an empty completion")
+    usage = data.get('usage') or {}
+    metrics.record_usage(endpoint, usage)
+    groq_admission.settle(tokens, usage.get('total_tokens'))
+    return content
+
+
+async def generate_marketing_campaign_async(product, description, audience, platform):
+    key = cache_key('marketing', product, description, audience, platform)
+    if ai_engine.RESULT_CACHE_CREATIVE:
+        cached = cached_result('marketing', key)
+        if cached:
+            return cached
+    if ai_engine.SINGLE_FLIGHT_CREATIVE:
+        return await inflight.do(key, _generate_marketing_campaign_async, key, product, description, audience, platform)
+    return await _generate_marketing_campaign_async(key, product, description, audience, platform)
+
+
+async def _generate_marketing_campaign_async(key, product, description, audience, platform):
+    prompt = build_marketing_prompts(product, description, audience, platform)
+    scope, fields = marketing_similarity(product, description, audience, platform)
+    reused, (system_prompt, user_prompt), mode = plan_generation('marketing', prompt, scope, fields)
+    if reused:
+        return reused
+    ai_response = await call_groq_api_async(system_prompt, user_prompt, mode=mode, endpoint='marketing')
+    if ai_response:
+        remember_generation(key, scope, fields, ai_response)
+        return ai_response
+
+    return fallback_marketing(product, description, audience, platform)
+
+
+async def generate_sales_pitch_async(product, persona, industry, size):
+    key = cache_key('sales', product, persona, industry, size)
+    if ai_engine.RESULT_CACHE_CREATIVE:
+        cached = cached_result('sales', key)
+        if cached:
+            return cached
+    if ai_engine.SINGLE_FLIGHT_CREATIVE:
+        return await inflight.do(key, _generate_sales_pitch_async, key, product, persona, industry, size)
+    return await _generate_sales_pitch_async(key, product, persona, industry, size)
+
+
+async def _generate_sales_pitch_async(key, product, persona, industry, size):
+    prompt = build_sales_prompts(product, persona, industry, size)
+    scope, fields = sales_similarity(product, persona, industry, size)
+    reused, (system_prompt, user_prompt), mode = plan_generation('sales', prompt, scope, fields)
+    if reused:
+        return reused
+    ai_response = await call_groq_api_async(system_prompt, user_prompt, mode=mode, endpoint='sales')
+    if ai_response:
+        remember_generation(key, scope, fields, ai_response)
+        return ai_response
+
+    return fallback_sales(product, persona, industry, size)
+
+
+async def generate_lead_score_async(product, icp, value_prop, lead_data, output='markdown'):
+    if output == 'json' or ai_engine.LEAD_SCORING_MODE == 'json':
+        result = await score_lead_async(product, icp, value_prop, lead_data)
+        return result if output == 'json' else render_lead_result(result)
+
+    key = cache_key('lead_scoring', product, icp, value_prop, lead_data)
+    cached = cached_result('lead_scoring', key)
+    if cached:
+        return render_cached_lead(cached)
+    return await inflight.do(key, _generate_lead_score_async, key, product, icp, value_prop, lead_data)
+
+
+async def _generate_lead_score_async(key, product, icp, value_prop, lead_data):
+    system_prompt, user_prompt = metrics.record_prompt('lead_scoring', build_lead_prompts(product, icp, value_prop, lead_data))
+    seed = generate_seed_from_input(product, icp, value_prop, lead_data)
+    ai_response = await call_groq_api_async(system_prompt, user_prompt, mode='decision', seed=seed, endpoint='lead_scoring')
+    if ai_response:
+        result_cache.set(key, ai_response)
+        return ai_response
+
+    return fallback_lead_scoring(product, lead_data, seed)
+
+
+async def score_lead_async(product, icp, value_prop, lead_data):
+    """ai_engine.score_lead for coroutines."""
+    key = cache_key('lead_scoring', product, icp, value_prop, lead_data)
+    cached = cached_lead_result('lead_scoring', key)
+    if cached:
+        return cached
+    return await inflight.do(f"{key}:json", _score_lead_async, key, product, icp, value_prop, lead_data)
+
+
+async def _score_lead_async(key, product, icp, value_prop, lead_data):
+    system_prompt, user_prompt = metrics.record_prompt('lead_scoring', build_lead_json_prompts(product, icp, value_prop, lead_data))
+    seed = generate_seed_from_input(product, icp, value_prop, lead_data)
+    ai_response = await call_groq_api_async(
+        system_prompt,
+        user_prompt,
+        mode='decision',
+        seed=seed,
+        max_tokens=ai_engine.LEAD_JSON_MAX_TOKENS,
+        response_format={"type": "json_object"},
+        endpoint='lead_scoring',
+    )
+    result = parse_lead_response(ai_response, 'lead_scoring') if ai_response else None
+    if result:
+        result_cache.set(key, json.dumps(result))
+        return result
+    return fallback_lead_result(product, lead_data, seed)
@@ -1,85 +1,406 @@
-from flask import Flask, request, jsonify, send_from_directory
-import os
-import ai_engine
-from flask_cors import CORS
-
-app = Flask(__name__)
-CORS(app)
-
-@app.route('/')
-def landing():
-    return send_from_directory(os.getcwd(), 'index.html')
-
-@app.route('/dashboard')
-def dashboard():
-    return send_from_directory(os.getcwd(), 'dashboard.html')
-
-@app.route('/<path:path>')
-def serve_static(path):
-    return send_from_directory(os.getcwd(), path)
-
-# --- API Endpoints ---
-
-@app.route('/api/marketing', methods=['POST'])
-def marketing():
-    data = request.json
-    try:
-        result = ai_engine.generate_marketing_campaign(
-            data.get('product'),
-            data.get('description'),
-            data.get('audience'),
-            data.get('platform')
-        )
-        return jsonify({"result": result})
-    except Exception as e:
-        print(f"Error: {e}")
-        # Always return success to UI with fallback
-        return jsonify({"result": ai_engine.fallback_marketing(
-            data.get('product'),
-            data.get('description'),
-            data.get('audience'),
-            data.get('platform')
-        )})
-
-@app.route('/api/sales', methods=['POST'])
-def sales():
-    data = request.json
-    try:
-        result = ai_engine.generate_sales_pitch(
-            data.get('product'),
-            data.get('persona'),
-            data.get('industry'),
-            data.get('size')
-        )
-        return jsonify({"result": result})
-    except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"result": ai_engine.fallback_sales(
-            data.get('product'),
-            data.get('persona'),
-            data.get('industry'),
-            data.get('size')
-        )})
-
-@app.route('/api/lead-scoring', methods=['POST'])
-def lead_scoring():
-    data = request.json
-    try:
-        result = ai_engine.generate_lead_score(
-            data.get('product'),
-            data.get('icp'),
-            data.get('valueProp'),
-            data.get('leadData')
-        )
-        return jsonify({"result": result})
-    except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"result": ai_engine.fallback_lead_scoring(
-            data.get('product'),
-            data.get('leadData')
-        )})
-
-if __name__ == '__main__':
-    # Use PORT from environment or default to 5001
-    port = int(os.environ.get("PORT", 5001))
-    app.run(debug=True, host='0.0.0.0', port=port)
+from flask import Flask, Response, abort, g, request, jsonify
+import os
+import json
+import ai_engine
+import metrics
+import jobs
+import static_assets
+import warmup
+from recorder import recorder
+from flask_cors import CORS
+
+app = Flask(__name__)
+CORS(app)
+
+# --- Request timing: one JSON log line and latency sample per request ---
+
+@app.before_request
+def start_timing():
+    if request.path not in ('/metrics', '/healthz'):
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.trace = metrics.start_request(endpoint, request.method)
+
+@app.after_request
+def finish_timing(response):
+    trace = g.pop('trace', None)
+    if trace is None:
+        return response
+    # Inputs for the request recorder are read now, while the request is still available
+    inputs = request.get_json(silent=True) if recorder.wants(trace['endpoint']) else None
+    query = request.args.to_dict() if inputs is not None else None
+
+    def finish():
+        recorder.record(metrics.finish_request(trace, response.status_code), inputs, query)
+
+    if response.is_streamed and not response.direct_passthrough:
+        # SSE/NDJSON generators: time until the last byte is sent
+        response.call_on_close(finish)
+    else:
+        finish()
+    return response
+
+def static_response(path):
+    """Serve a fingerprinted, precompressed asset from memory (see static_assets.py)."""
+    served = static_assets.assets.respond(
+        path, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match')
+    )
+    if served is None:
+        abort(404)
+    status, headers, body = served
+    return Response(body, status=status, headers=headers)
+
+@app.route('/')
+def landing():
+    return static_response('/')
+
+@app.route('/dashboard')
+def dashboard():
+    return static_response('/dashboard')
+
+@app.route('/<path:path>')
+def serve_static(path):
+    return static_response(path)
+
+# --- API Endpoints ---
+
+def run_marketing(data):
+    try:
+        return ai_engine.generate_marketing_campaign(
+            data.get('product'),
+            data.get('description'),
+            data.get('audience'),
+            data.get('platform')
+        )
+    except Exception as e:
+        metrics.record_fallback('marketing', 'exception')
+        metrics.report_error("Marketing", e)
+        # Always return success to UI with fallback
+        return ai_engine.fallback_marketing(
+            data.get('product'),
+            data.get('description'),
+            data.get('audience'),
+            data.get('platform')
+        )
+
+def run_sales(data):
+    try:
+        return ai_engine.generate_sales_pitch(
+            data.get('product'),
+            data.get('persona'),
+            data.get('industry'),
+            data.get('size')
+        )
+    except Exception as e:
+        metrics.record_fallback('sales', 'exception')
+        metrics.report_error("Sales", e)
+        return ai_engine.fallback_sales(
+            data.get('product'),
+            data.get('persona'),
+            data.get('industry'),
+            data.get('size')
+        )
+
+@app.route('/api/marketing', methods=['POST'])
+def marketing():
+    return jsonify({"result": run_marketing(request.json)})
+
+@app.route('/api/sales', methods=['POST'])
+def sales():
+    return jsonify({"result": run_sales(request.json)})
+
+# Most platforms one multi-platform campaign request may ask for
+MULTI_PLATFORM_MAX = int(os.environ.get("MULTI_PLATFORM_MAX", 8))
+
+def parse_platforms(data):
+    """`platforms` as a list (or comma-separated string) of platform names; raises ValueError."""
+    platforms = data.get('platforms')
+    if isinstance(platforms, str):
+        platforms = platforms.split(',')
+    if not isinstance(platforms, list) or not any(str(platform).strip() for platform in platforms):
+        raise ValueError("'platforms' must be a non-empty list")
+    if len(platforms) > MULTI_PLATFORM_MAX:
+        raise ValueError(f"Too many platforms (max {MULTI_PLATFORM_MAX})")
+    return platforms
+
+def run_marketing_multi(data):
+    """{platform: campaign} for a multi-platform request (job handler)."""
+    return dict(ai_engine.generate_marketing_campaigns(
+        data.get('product'),
+        data.get('description'),
+        data.get('audience'),
+        parse_platforms(data)
+    ))
+
+@app.route('/api/marketing/multi', methods=['POST'])
+def marketing_multi():
+    data = request.json or {}
+    try:
+        platforms = parse_platforms(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        results = ai_engine.generate_marketing_campaigns(
+            data.get('product'),
+            data.get('description'),
+            data.get('audience'),
+            platforms
+        )
+        for platform, result in results:
+            yield json.dumps({"platform": platform, "result": result}) + "\n"
+
+    # NDJSON in completion order: each platform's campaign is sent as soon as it is ready
+    return Response(generate(), mimetype='application/x-ndjson')
+
+# --- Streaming (Server-Sent Events) ---
+
+def sse_response(events):
+    """Relay (event, text) pairs from ai_engine as Server-Sent Events."""
+    def generate():
+        for event, text in events:
+            yield f"event: {event}\ndata: {json.dumps(text)}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # stop nginx from buffering the stream
+    })
+
+@app.route('/api/marketing/stream', methods=['POST'])
+def marketing_stream():
+    data = request.json
+    return sse_response(ai_engine.stream_marketing_campaign(
+        data.get('product'),
+        data.get('description'),
+        data.get('audience'),
+        data.get('platform')
+    ))
+
+@app.route('/api/sales/stream', methods=['POST'])
+def sales_stream():
+    data = request.json
+    return sse_response(ai_engine.stream_sales_pitch(
+        data.get('product'),
+        data.get('persona'),
+        data.get('industry'),
+        data.get('size')
+    ))
+
+def run_lead_scoring(data, output='markdown'):
+    try:
+        return ai_engine.generate_lead_score(
+            data.get('product'),
+            data.get('icp'),
+            data.get('valueProp'),
+            data.get('leadData'),
+            output
+        )
+    except Exception as e:
+        metrics.record_fallback('lead_scoring', 'exception')
+        metrics.report_error("Lead scoring", e)
+        result = ai_engine.fallback_lead_result(data.get('product'), data.get('leadData'))
+        return result if output == 'json' else ai_engine.render_lead_result(result)
+
+@app.route('/api/lead-scoring', methods=['POST'])
+def lead_scoring():
+    data = request.json
+    # format=json returns the score as an object (score, category, reasons, ...) instead of markdown
+    output = data.get('format') or request.args.get('format') or 'markdown'
+    return jsonify({"result": run_lead_scoring(data, output)})
+
+# Largest lead list accepted by one batch request
+BATCH_MAX_LEADS = int(os.environ.get("BATCH_MAX_LEADS", 1000))
+# Most leads a batch request may pack into one Groq call (larger packSize values are clamped)
+BATCH_MAX_PACK_SIZE = int(os.environ.get("BATCH_MAX_PACK_SIZE", 25))
+
+def parse_pack_size(value):
+    """packSize as an int in 1..BATCH_MAX_PACK_SIZE, or None for the default; raises ValueError."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise ValueError("'packSize' must be a positive whole number")
+    pack_size = int(value)
+    if pack_size < 1:
+        raise ValueError("'packSize' must be a positive whole number")
+    return min(pack_size, BATCH_MAX_PACK_SIZE)
+
+def parse_batch_body():
+    """
+    Accepts either:
+    - JSON object: {"product", "icp", "valueProp", "packSize", "format", "leads": [...]}
+    - JSON array or JSONL body of leads, with shared fields in the query string
+    Each lead is a string or an object with "leadData" (and optional "id").
+    Raises ValueError for any other body.
+    """
+    shared = {
+        'product': request.args.get('product'),
+        'icp': request.args.get('icp'),
+        'valueProp': request.args.get('valueProp'),
+        'packSize': request.args.get('packSize'),
+        'format': request.args.get('format'),
+    }
+    raw = request.get_data(as_text=True).strip()
+    if not raw:
+        return shared, []
+
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        # JSONL: one lead per line
+        body = [parse_jsonl_line(number, line) for number, line in enumerate(raw.splitlines(), 1) if line.strip()]
+    else:
+        if isinstance(body, dict) and 'leads' in body:
+            for field in shared:
+                if body.get(field) is not None:
+                    shared[field] = body[field]
+            body = body['leads']
+            if not isinstance(body, list):
+                raise ValueError("'leads' must be a list")
+        elif isinstance(body, (dict, str)):
+            # A JSONL body of a single lead
+            body = [body]
+        elif not isinstance(body, list):
+            raise ValueError("expected a list of leads, an object with 'leads', or JSONL")
+
+    leads = []
+    for number, item in enumerate(body, 1):
+        if isinstance(item, dict):
+            leads.append((item.get('id'), item.get('leadData') or ''))
+        elif isinstance(item, str):
+            leads.append((None, item))
+        else:
+            raise ValueError(f"lead {number} must be a string or an object with 'leadData'")
+    shared['packSize'] = parse_pack_size(shared['packSize'])
+    return shared, leads
+
+def parse_jsonl_line(number, line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        raise ValueError(f"line {number} is not valid JSON") from None
+
+@app.route('/api/lead-scoring/batch', methods=['POST'])
+def lead_scoring_batch():
+    try:
+        shared, leads = parse_batch_body()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid batch body: {e}"}), 400
+    if len(leads) > BATCH_MAX_LEADS:
+        return jsonify({"error": f"Batch too large (max {BATCH_MAX_LEADS} leads)"}), 413
+
+    lead_texts = [lead_data for _, lead_data in leads]
+    with_report = request.args.get('report') == '1'
+
+    def generate():
+        results = ai_engine.score_leads_packed(
+            shared['product'],
+            shared['icp'],
+            shared['valueProp'],
+            lead_texts,
+            shared['packSize']
+        )
+        for index, result in results:
+            if shared['format'] != 'json':
+                result = ai_engine.render_lead_result(result)
+            line = {"index": index, "id": leads[index][0], "result": result}
+            yield json.dumps(line) + "\n"
+        if with_report:
+            # Prompt tokens per lead: one call per lead vs packed
+            report = ai_engine.lead_packing_report(
+                shared['product'], shared['icp'], shared['valueProp'], lead_texts, shared['packSize']
+            )
+            yield json.dumps({"report": report}) + "\n"
+
+    # NDJSON in completion order: the client sees each lead as soon as it is scored
+    return Response(generate(), mimetype='application/x-ndjson')
+
+# --- Background jobs: 202 + job id now, result by polling or SSE ---
+
+job_queue = jobs.JobQueue({
+    'marketing': run_marketing,
+    'marketing-multi': run_marketing_multi,
+    'sales': run_sales,
+    'lead-scoring': lambda data: run_lead_scoring(data, data.get('format') or 'markdown'),
+})
+
+# Longest a GET /api/jobs/<id>?wait= long-poll may hold the connection
+JOB_MAX_WAIT = 25
+
+@app.route('/api/jobs/<kind>', methods=['POST'])
+def submit_job(kind):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    try:
+        job = job_queue.submit(kind, data)
+    except KeyError:
+        return jsonify({"error": f"Unknown job kind '{kind}'", "kinds": sorted(job_queue.handlers)}), 404
+    except jobs.QueueFull as e:
+        return jsonify({"error": f"Too many queued jobs: {e}"}), 503, {'Retry-After': '5'}
+    url = f"/api/jobs/{job['id']}"
+    body = dict(jobs.public_view(job), poll=url, events=f"{url}/events")
+    return jsonify(body), 202, {'Location': url}
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    wait = min(request.args.get('wait', 0, type=float), JOB_MAX_WAIT)
+    job = job_queue.wait(job_id, wait) if wait > 0 else job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(jobs.public_view(job))
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """SSE: a 'status' event while the job is pending (every 15s as a keep-alive), then 'done' or 'failed'."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    def events():
+        current = job
+        while current is not None and current['status'] not in jobs.FINISHED:
+            yield 'status', jobs.public_view(current)
+            current = job_queue.wait(job_id, 15)
+        if current is None:
+            yield 'failed', {"error": "Unknown or expired job"}
+        else:
+            yield current['status'], jobs.public_view(current)
+
+    return sse_response(events())
+
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    return jsonify(dict(
+        ai_engine.engine_stats(),
+        static_assets=static_assets.assets.stats(),
+        jobs=job_queue.stats(),
+        recorder=recorder.stats(),
+    ))
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # 503 only while this worker is still warming up; 'cold' (no warm-up ran) still serves
+    state = warmup.readiness()
+    return jsonify(state), 503 if state['status'] == warmup.WARMING else 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+def create_app():
+    """
+    Production entry point (gunicorn.conf.py: app:create_app()). With preload_app this runs once
+    in the gunicorn master, so the fork-safe warm-up is shared by every worker; each worker then
+    opens its own Groq connections in post_worker_init before it accepts requests.
+    """
+    if warmup.WARMUP:
+        warmup.prepare(app)
+    return app
+
+if __name__ == '__main__':
+    # Development server only; production runs `gunicorn -c gunicorn.conf.py`
+    port = int(os.environ.get("PORT", 5001))
+    debug = os.environ.get("FLASK_DEBUG") == "1"
+    if not debug:
+        warmup.warm_up(app)
+    app.run(debug=debug, host='0.0.0.0', port=port)
@@ -0,0 +1,219 @@
+import asyncio
+import json
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+
+import ai_engine
+import ai_engine_async
+import jobs
+import metrics
+import static_assets
+import warmup
+from app import app as flask_app, job_queue
+from recorder import recorder
+
+# ==========================================
+# ASGI ENTRY POINT
+# ==========================================
+#
+# The three AI endpoints run on the async engine, so one process can hold
+# hundreds of in-flight Groq calls. Pages and static files are answered
+# straight from static_assets' in-memory manifest, without a WSGI thread hop.
+# Job event streams wait on asyncio.sleep rather than a thread. Everything
+# else (batch/streaming endpoints, job submission, CORS preflight) is served
+# by the Flask app.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5001 --workers 4
+#   APP_MODULE=asgi:application WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+
+wsgi_fallback = WsgiToAsgi(flask_app)
+
+
+async def marketing(data, query):
+    args = (data.get('product'), data.get('description'), data.get('audience'), data.get('platform'))
+    try:
+        return await ai_engine_async.generate_marketing_campaign_async(*args)
+    except Exception as e:
+        metrics.record_fallback('marketing', 'exception')
+        metrics.report_error("Marketing", e)
+        return ai_engine.fallback_marketing(*args)
+
+
+async def sales(data, query):
+    args = (data.get('product'), data.get('persona'), data.get('industry'), data.get('size'))
+    try:
+        return await ai_engine_async.generate_sales_pitch_async(*args)
+    except Exception as e:
+        metrics.record_fallback('sales', 'exception')
+        metrics.report_error("Sales", e)
+        return ai_engine.fallback_sales(*args)
+
+
+async def lead_scoring(data, query):
+    # format=json returns the score as an object; ?format= works too, as in app.py
+    output = data.get('format') or query.get('format') or 'markdown'
+    try:
+        return await ai_engine_async.generate_lead_score_async(
+            data.get('product'), data.get('icp'), data.get('valueProp'), data.get('leadData'), output
+        )
+    except Exception as e:
+        metrics.record_fallback('lead_scoring', 'exception')
+        metrics.report_error("Lead scoring", e)
+        result = ai_engine.fallback_lead_result(data.get('product'), data.get('leadData'))
+        return result if output == 'json' else ai_engine.render_lead_result(result)
+
+
+ROUTES = {
+    '/api/marketing': marketing,
+    '/api/sales': sales,
+    '/api/lead-scoring': lead_scoring,
+}
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def serve_static(scope, send):
+    """Answer a GET/HEAD for a static asset; False if `scope` is not one."""
+    headers = dict(scope.get('headers') or ())
+    served = static_assets.assets.respond(
+        scope['path'],
+        headers.get(b'accept-encoding', b'').decode('latin-1'),
+        headers.get(b'if-none-match', b'').decode('latin-1'),
+    )
+    if served is None:
+        return False
+
+    # Same endpoint labels as the Flask routes
+    endpoint = scope['path'] if scope['path'] in static_assets.PAGES else '/<path:path>'
+    trace = metrics.start_request(endpoint, scope['method'])
+    status, response_headers, body = served
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response_headers]
+            + [(b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body if scope['method'] == 'GET' else b''})
+    finally:
+        metrics.finish_request(trace, status)
+    return True
+
+
+# Job status is re-read this often while an event stream waits for it to finish
+JOB_EVENTS_POLL = 0.25
+JOB_EVENTS_KEEPALIVE = 15
+
+
+async def job_events(scope, send, job_id):
+    """SSE stream of one job, as GET /api/jobs/<id>/events in app.py, without holding a thread."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return await send_json(send, 404, {"error": "Unknown or expired job"})
+
+    trace = metrics.start_request('/api/jobs/<job_id>/events', 'GET')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+
+    async def event(name, payload, more=True):
+        body = f"event: {name}\ndata: {json.dumps(jobs.public_view(payload))}\n\n".encode('utf-8')
+        await send({'type': 'http.response.body', 'body': body, 'more_body': more})
+
+    try:
+        waited = JOB_EVENTS_KEEPALIVE
+        while job is not None and job['status'] not in jobs.FINISHED:
+            if waited >= JOB_EVENTS_KEEPALIVE:
+                await event('status', job)
+                waited = 0.0
+            await asyncio.sleep(JOB_EVENTS_POLL)
+            waited += JOB_EVENTS_POLL
+            job = job_queue.get(job_id)
+        if job is None:
+            await event('failed', {"error": "Unknown or expired job"}, more=False)
+        else:
+            await event(job['status'], job, more=False)
+    finally:
+        metrics.finish_request(trace, 200)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Warm up before the server accepts connections (a no-op if gunicorn's post_worker_init did)
+            if warmup.WARMUP:
+                await asyncio.get_running_loop().run_in_executor(None, warmup.warm_up, flask_app)
+                warmup.mark_async_warm(await ai_engine_async.warm_up_async(warmup.WARMUP_CONNECTIONS))
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await ai_engine_async.close_clients()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD') and await serve_static(scope, send):
+        return
+    path = scope.get('path', '')
+    if scope['type'] == 'http' and scope['method'] == 'GET' and path.startswith('/api/jobs/') and path.endswith('/events'):
+        return await job_events(scope, send, path[len('/api/jobs/'):-len('/events')])
+
+    handler = ROUTES.get(scope.get('path')) if scope['type'] == 'http' and scope['method'] == 'POST' else None
+    if handler is None:
+        return await wsgi_fallback(scope, receive, send)
+
+    # Each request runs in its own task, so the trace context is per request
+    trace = metrics.start_request(scope['path'], 'POST')
+    # First value per name, as request.args.to_dict() gives the Flask handlers
+    query = dict(reversed(parse_qsl(scope.get('query_string', b'').decode('latin-1'))))
+    status = 500
+    data = None
+    try:
+        try:
+            data = json.loads(await read_body(receive) or b'{}')
+        except ValueError:
+            status = 400
+            return await send_json(send, status, {"error": "Invalid JSON body"})
+        if not isinstance(data, dict):
+            status = 400
+            return await send_json(send, status, {"error": "Expected a JSON object"})
+
+        # Always return success to UI with fallback, as the Flask handlers do
+        result = await handler(data, query)
+        status = 200
+        await send_json(send, status, {"result": result})
+    finally:
+        recorder.record(metrics.finish_request(trace, status), data if isinstance(data, dict) else None, query)
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# ==========================================
+# COLD-START BENCHMARK
+# ==========================================
+#
+# Starts the server, waits for GET /healthz to answer 200, then sends bursts of
+# --burst concurrent requests. The first burst is what a freshly started worker
+# serves; the later ones are steady state. Compare runs with and without the
+# warm-up (WARMUP=0) against a stub that charges for new connections:
+#
+#   python benchmarks/stub_groq.py --port 8090 --latency 0.3 --latency-dist fixed --connect-latency 0.15
+#   export GROQ_API_KEY=stub GROQ_API_URL=http://127.0.0.1:8090/v1/chat/completions
+#   python benchmarks/coldstart.py --cmd "gunicorn -c gunicorn.conf.py" --env WEB_CONCURRENCY=1
+#   python benchmarks/coldstart.py --cmd "gunicorn -c gunicorn.conf.py" --env WEB_CONCURRENCY=1 --env WARMUP=0
+
+PAYLOAD = {
+    "product": "MarketMind",
+    "icp": "Mid-market B2B companies with 50-500 employees",
+    "valueProp": "Cut manual reporting time in half",
+    "leadData": "Head of operations at a 200 person logistics firm. We need pricing for a rollout this quarter.",
+}
+
+
+def wait_ready(client, url, process, timeout):
+    """Seconds until /healthz answers 200, or None if the server exited or timed out."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            return None
+        try:
+            if client.get(f"{url}/healthz").status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def burst(client, url, path, size, round_number):
+    """Latencies (ms) of `size` concurrent requests; each body is unique, so no cache answers."""
+    def send(number):
+        payload = dict(PAYLOAD, product=f"{PAYLOAD['product']} #{round_number}-{number}")
+        started = time.perf_counter()
+        client.post(f"{url}{path}", json=payload).raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        return list(executor.map(send, range(size)))
+
+
+def summarize(latencies):
+    return {"p50_ms": round(statistics.median(latencies), 1), "max_ms": round(max(latencies), 1)}
+
+
+def run(args):
+    env = dict(os.environ, **dict(pair.split("=", 1) for pair in args.env))
+    started = time.perf_counter()
+    process = subprocess.Popen(shlex.split(args.cmd), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(timeout=args.timeout, limits=httpx.Limits(max_connections=args.burst * 2)) as client:
+            ready = wait_ready(client, args.url, process, args.timeout)
+            if ready is None:
+                sys.exit("Server did not become ready (check the command and its environment)")
+            health = client.get(f"{args.url}/healthz").json()
+            first = burst(client, args.url, args.path, args.burst, 0)
+            first_response = time.perf_counter() - started
+            steady = [latency for number in range(1, args.rounds + 1)
+                      for latency in burst(client, args.url, args.path, args.burst, number)]
+    finally:
+        process.terminate()
+        process.wait(10)
+
+    return {
+        "command": args.cmd,
+        "env": args.env,
+        "ready_s": round(ready, 3),
+        "first_burst_done_s": round(first_response, 3),
+        "warm_up": {key: health.get(key) for key in ("status", "warmup_ms", "connections", "catalog")},
+        "first_burst": summarize(first),
+        "steady_state": summarize(steady),
+        "first_vs_steady_p50": round(statistics.median(first) / statistics.median(steady), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start-to-first-fast-response time.")
+    parser.add_argument("--cmd", default="gunicorn -c gunicorn.conf.py", help="Server command to start")
+    parser.add_argument("--env", action="append", default=[], help="Extra NAME=VALUE for the server (repeatable)")
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--path", default="/api/lead-scoring")
+    parser.add_argument("--burst", type=int, default=4, help="Concurrent requests per burst")
+    parser.add_argument("--rounds", type=int, default=5, help="Steady-state bursts after the first")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
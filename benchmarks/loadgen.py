@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+import httpx
+
+# ==========================================
+# LOAD GENERATOR
+# ==========================================
+#
+# Drives /api/marketing, /api/sales and /api/lead-scoring and reports latency
+# percentiles, throughput and fallback rate per endpoint.
+#
+#   Closed loop (N clients, each sends its next request when the last returns):
+#     python benchmarks/loadgen.py --concurrency 32 --duration 60
+#   Open loop (Poisson arrivals; latency counts from the scheduled send time,
+#   so a stalled server can't hide its queueing delay):
+#     python benchmarks/loadgen.py --rate 50 --duration 60
+#
+# A response counts as a fallback when it lacks --marker (the stub's tag). The
+# app's own /metrics fallback counters are diffed too, with their reasons.
+
+PRODUCTS = ("MarketMind", "PipelinePro", "Acme CRM", "DataBridge", "ShipFast")
+AUDIENCES = ("Gen Z gamers", "busy parents", "B2B SaaS founders", "fitness enthusiasts")
+PLATFORMS = ("Instagram", "LinkedIn", "TikTok", "YouTube")
+PERSONAS = ("VP of Sales", "CTO", "Head of Marketing", "Operations Manager")
+INDUSTRIES = ("Healthcare", "Fintech", "Logistics", "Retail")
+SIZES = ("SMB", "Mid-Market", "Enterprise")
+LEADS = (
+    "Hi, I'm the head of operations at a 200 person logistics firm. We need pricing for a rollout this quarter.",
+    "Just browsing, saw your ad. What does the product do?",
+    "Founder here. Our deadline is next month and we are looking for a vendor asap. Send a quote.",
+    "Director of IT at a hospital network, evaluating tools to solve our reporting problem.",
+    "Student researching CRM tools for a class project.",
+)
+
+ENDPOINTS = {
+    "marketing": "/api/marketing",
+    "sales": "/api/sales",
+    "lead-scoring": "/api/lead-scoring",
+}
+
+FALLBACK_LINE = re.compile(r'^marketmind_fallbacks_total\{endpoint="([^"]*)",reason="([^"]*)"\} ([0-9.e+]+)$', re.M)
+
+
+def build_payload(kind, rng, unique):
+    """Deterministic request bodies; `unique` appends a counter to defeat the result cache."""
+    suffix = f" #{rng.randrange(10 ** 9)}" if rng.random() < unique else ""
+    product = rng.choice(PRODUCTS) + suffix
+    if kind == "marketing":
+        return {
+            "product": product,
+            "description": "an AI assistant for campaign planning",
+            "audience": rng.choice(AUDIENCES),
+            "platform": rng.choice(PLATFORMS),
+        }
+    if kind == "sales":
+        return {
+            "product": product,
+            "persona": rng.choice(PERSONAS),
+            "industry": rng.choice(INDUSTRIES),
+            "size": rng.choice(SIZES),
+        }
+    return {
+        "product": product,
+        "icp": "Mid-market B2B companies with 50-500 employees",
+        "valueProp": "Cut manual reporting time in half",
+        "leadData": rng.choice(LEADS),
+    }
+
+
+def parse_mix(text):
+    """'marketing=1,sales=1,lead-scoring=2' -> ([kinds], [weights])."""
+    kinds, weights = [], []
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {kind}")
+        kinds.append(kind.strip())
+        weights.append(float(weight or 1))
+    return kinds, weights
+
+
+async def scrape_fallbacks(client):
+    """{(endpoint, reason): count} from the app's /metrics, or None if unavailable."""
+    try:
+        response = await client.get("/metrics")
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    return {(endpoint, reason): float(value) for endpoint, reason, value in FALLBACK_LINE.findall(response.text)}
+
+
+class Recorder:
+    def __init__(self, marker):
+        self.marker = marker
+        self.samples = {}  # kind -> list of (latency, ok, fallback)
+
+    def add(self, kind, latency, ok, fallback):
+        self.samples.setdefault(kind, []).append((latency, ok, fallback))
+
+
+async def send(client, kind, payload, recorder, scheduled):
+    try:
+        response = await client.post(ENDPOINTS[kind], json=payload)
+        ok = response.status_code == 200
+        fallback = ok and recorder.marker is not None and recorder.marker not in response.text
+    except httpx.HTTPError:
+        ok, fallback = False, False
+    recorder.add(kind, time.perf_counter() - scheduled, ok, fallback)
+
+
+async def closed_loop(client, args, kinds, weights, rng, recorder, deadline):
+    sent = 0
+
+    async def worker():
+        nonlocal sent
+        while time.perf_counter() < deadline and (not args.requests or sent < args.requests):
+            sent += 1
+            kind = rng.choices(kinds, weights)[0]
+            await send(client, kind, build_payload(kind, rng, args.unique), recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def open_loop(client, args, kinds, weights, rng, recorder, deadline):
+    tasks = []
+    next_send = time.perf_counter()
+    while next_send < deadline and (not args.requests or len(tasks) < args.requests):
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = rng.choices(kinds, weights)[0]
+        tasks.append(asyncio.create_task(send(client, kind, build_payload(kind, rng, args.unique), recorder, next_send)))
+        gap = rng.expovariate(args.rate) if args.arrival == "poisson" else 1 / args.rate
+        next_send += gap
+    await asyncio.gather(*tasks)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _, _ in samples)
+    total = len(samples)
+    ok = sum(1 for _, success, _ in samples if success)
+    fallbacks = sum(1 for _, _, fallback in samples if fallback)
+    return {
+        "requests": total,
+        "errors": total - ok,
+        "fallback_rate": round(fallbacks / ok, 4) if ok else 0.0,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 1),
+    }
+
+
+def print_report(report):
+    columns = ("requests", "errors", "fallback_rate", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    print(f"\n{'endpoint':<14}" + "".join(f"{column:>15}" for column in columns))
+    for name, row in report["endpoints"].items():
+        print(f"{name:<14}" + "".join(f"{row[column]:>15}" for column in columns))
+    if report.get("server_fallbacks"):
+        print("\nServer-side fallbacks (from /metrics):")
+        for key, count in sorted(report["server_fallbacks"].items()):
+            print(f"  {key}: {count:g}")
+
+
+async def run(args):
+    kinds, weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    recorder = Recorder(args.marker or None)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.concurrency or 100)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        before = await scrape_fallbacks(client)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        if args.rate:
+            await open_loop(client, args, kinds, weights, rng, recorder, deadline)
+        else:
+            await closed_loop(client, args, kinds, weights, rng, recorder, deadline)
+        elapsed = time.perf_counter() - started
+        after = await scrape_fallbacks(client)
+
+    all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "elapsed_s": round(elapsed, 2),
+        "endpoints": {kind: summarize(samples, elapsed) for kind, samples in sorted(recorder.samples.items())},
+    }
+    report["endpoints"]["all"] = summarize(all_samples, elapsed)
+    if before is not None and after is not None:
+        report["server_fallbacks"] = {
+            f"{endpoint}/{reason}": count - before.get((endpoint, reason), 0.0)
+            for (endpoint, reason), count in after.items()
+            if count - before.get((endpoint, reason), 0.0) > 0
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the MarketMind AI endpoints.")
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop clients (ignored with --rate)")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate in requests/second")
+    parser.add_argument("--arrival", choices=["poisson", "uniform"], default="poisson")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send for")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--mix", default="marketing=1,sales=1,lead-scoring=1")
+    parser.add_argument("--unique", type=float, default=0.0, help="Fraction of requests made unique to bypass caches")
+    parser.add_argument("--marker", default="[stub]", help="Text marking a model answer; '' disables marker checks")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
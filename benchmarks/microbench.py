@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_engine  # noqa: E402
+from fallback_engine import fallback_lead_scoring, fallback_marketing, fallback_sales  # noqa: E402
+from keyword_signals import LEAD_SIGNALS  # noqa: E402
+
+# ==========================================
+# MICROBENCHMARKS
+# ==========================================
+#
+# Per-call cost of the fallback generators and prompt construction, the code
+# that runs on every request whatever Groq does. Save a baseline and compare
+# against it before deploying; the run fails when anything regressed by more
+# than --tolerance.
+#
+#   python benchmarks/microbench.py --output baseline.json
+#   python benchmarks/microbench.py --compare baseline.json --tolerance 0.2
+
+LEAD = (
+    "Hi, I'm the head of operations at a 200 person logistics firm. We need pricing for a rollout "
+    "this quarter and our director wants a quote asap. "
+)
+LONG_LEAD = LEAD * 200  # a pasted email thread
+# A long thread without decision-maker or urgency keywords: every signal is scanned to the end
+QUIET_LEAD = (
+    "We are a mid-sized logistics company; we know the headline issues ahead of the new season "
+    "and will think it over with the team. "
+) * 600
+
+CASES = {
+    "fallback_marketing": lambda: fallback_marketing("MarketMind", "AI campaign planning", "B2B founders", "LinkedIn", seed=7),
+    "fallback_sales": lambda: fallback_sales("MarketMind", "VP of Sales", "Fintech", "Enterprise", seed=7),
+    "fallback_lead_scoring": lambda: fallback_lead_scoring("MarketMind", LEAD),
+    "fallback_lead_scoring_long": lambda: fallback_lead_scoring("MarketMind", LONG_LEAD),
+    "fallback_lead_scoring_quiet": lambda: fallback_lead_scoring("MarketMind", QUIET_LEAD),
+    "keyword_signals_long": lambda: LEAD_SIGNALS.match(LONG_LEAD),
+    "keyword_signals_quiet": lambda: LEAD_SIGNALS.match(QUIET_LEAD),
+    "build_marketing_prompts": lambda: ai_engine.build_marketing_prompts("MarketMind", "AI campaign planning", "B2B founders", "LinkedIn"),
+    "build_sales_prompts": lambda: ai_engine.build_sales_prompts("MarketMind", "VP of Sales", "Fintech", "Enterprise"),
+    "build_lead_prompts": lambda: ai_engine.build_lead_prompts("MarketMind", "Mid-market B2B", "Halve reporting time", LEAD),
+    "build_lead_prompts_long": lambda: ai_engine.build_lead_prompts("MarketMind", "Mid-market B2B", "Halve reporting time", LONG_LEAD),
+    "build_groq_request": lambda: ai_engine.build_groq_request("system prompt", "user prompt", "decision", 1234),
+    "cache_key": lambda: ai_engine.cache_key("lead_scoring", "MarketMind", "Mid-market B2B", "Halve reporting time", LEAD),
+}
+
+
+def measure(fn, repeat):
+    """Best-of-`repeat` nanoseconds per call."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for fallbacks and prompt building.")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results (ns/op) as JSON, e.g. a baseline")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --output run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'case':<30}{'ns/op':>14}{'ops/s':>14}{'vs baseline':>14}")
+    for name, fn in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        ns = measure(fn, args.repeat)
+        results[name] = round(ns, 1)
+        change = ""
+        if name in baseline:
+            ratio = ns / baseline[name] - 1
+            change = f"{ratio:+.1%}"
+            if ratio > args.tolerance:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:<30}{ns:>14,.0f}{1e9 / ns:>14,.0f}{change:>14}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if regressions:
+        print(f"\nRegressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==========================================
+# LOCAL GROQ STAND-IN
+# ==========================================
+#
+# Speaks enough of the OpenAI-compatible API (POST .../chat/completions, with
+# and without stream=true, and GET .../models) to benchmark the app without
+# touching Groq. Latency, error rate and stream pacing are configurable and
+# seeded, so runs are reproducible.
+#
+#   python benchmarks/stub_groq.py --port 8090 --latency 0.8 --latency-dist lognormal --error-rate 0.02
+#   GROQ_API_KEY=stub GROQ_API_URL=http://127.0.0.1:8090/v1/chat/completions python app.py
+#
+# Every completion starts with MARKER, so the load generator can tell model
+# answers from template fallbacks. With --rpm / --tpm the stub enforces
+# per-minute limits like Groq: x-ratelimit-* headers on every answer, and a 429
+# with Retry-After once a bucket is empty (run the app with
+# GROQ_REQUEST_LIMIT_WINDOW=60, since the stub's request limit is per minute).
+# --failing-models simulates an outage of specific models; --connect-latency
+# makes each new connection cost what a real TLS handshake to Groq would.
+
+MARKER = "[stub]"
+MODELS = ("llama-3.3-70b-versatile", "llama-3.1-8b-instant")
+
+
+class RateLimiter:
+    """Per-minute request and token buckets, reported the way Groq reports them."""
+
+    def __init__(self, rpm, tpm):
+        self.limits = {"requests": rpm, "tokens": tpm}
+        self.levels = {"requests": float(rpm), "tokens": float(tpm)}
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        for kind, limit in self.limits.items():
+            self.levels[kind] = min(limit, self.levels[kind] + (now - self._updated) * limit / 60.0)
+        self._updated = now
+
+    def take(self, tokens):
+        """Charge one request of `tokens` tokens. Returns (allowed, retry_after, headers)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            costs = {"requests": 1, "tokens": tokens}
+            short = {kind: costs[kind] - self.levels[kind] for kind, limit in self.limits.items()
+                     if limit and costs[kind] > self.levels[kind]}
+            if not short:
+                for kind, limit in self.limits.items():
+                    if limit:
+                        self.levels[kind] -= costs[kind]
+            headers = {}
+            for kind, limit in self.limits.items():
+                if limit:
+                    reset = (limit - self.levels[kind]) * 60.0 / limit
+                    headers[f"x-ratelimit-limit-{kind}"] = str(limit)
+                    headers[f"x-ratelimit-remaining-{kind}"] = str(max(int(self.levels[kind]), 0))
+                    headers[f"x-ratelimit-reset-{kind}"] = f"{reset:.2f}s"
+            retry_after = max((missing * 60.0 / self.limits[kind] for kind, missing in short.items()), default=0.0)
+            return not short, retry_after, headers
+
+
+class StubConfig:
+    def __init__(self, args):
+        self.latency = args.latency
+        self.latency_dist = args.latency_dist
+        self.sigma = args.sigma
+        self.error_rate = args.error_rate
+        self.error_statuses = [int(status) for status in args.error_status.split(",")]
+        self.timeout_rate = args.timeout_rate
+        self.completion_tokens = args.completion_tokens
+        self.chunk_delay = args.chunk_delay
+        self.connect_latency = args.connect_latency
+        self.failing_models = set(filter(None, args.failing_models.split(",")))
+        self.limiter = RateLimiter(args.rpm, args.tpm) if args.rpm or args.tpm else None
+        self.rate_limited = 0
+        self._rng = random.Random(args.seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Return (latency seconds, error status or None, hang) for one request."""
+        with self._lock:
+            if self.latency_dist == "fixed":
+                latency = self.latency
+            elif self.latency_dist == "exponential":
+                latency = self._rng.expovariate(1 / self.latency) if self.latency else 0.0
+            else:
+                # Lognormal with the given median: a realistic long right tail
+                latency = self.latency * math.exp(self._rng.gauss(0, self.sigma))
+            roll = self._rng.random()
+        if roll < self.timeout_rate:
+            return latency, None, True
+        if roll < self.timeout_rate + self.error_rate:
+            return latency, self._rng.choice(self.error_statuses), False
+        return latency, None, False
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def build_content(payload, completion_tokens):
+    """A completion shaped like what the engine expects for this request."""
+    user = next((m["content"] for m in payload.get("messages", []) if m.get("role") == "user"), "")
+    if (payload.get("response_format") or {}).get("type") == "json_object":
+        # Packed lead scoring: one entry per "Lead N:" block; a single lead is one bare object
+        leads = [
+            {
+                "lead": number,
+                "score": 40 + (number * 7) % 50,
+                "category": "Warm",
+                "reasons": [f"{MARKER} Matches the ICP", "Clear budget signal", "Active evaluation"],
+                "conversion_probability": 35 + (number * 5) % 40,
+                "action": "Send case study and follow up in 2 days.",
+            }
+            for number in [int(number) for number in re.findall(r"Lead (\d+):", user)] or [1]
+        ]
+        if "Lead 1:" not in user:
+            return json.dumps({key: value for key, value in leads[0].items() if key != "lead"})
+        return json.dumps({"leads": leads})
+    words = max(completion_tokens - 10, 1)
+    filler = " ".join("lorem" for _ in range(words))
+    return f"{MARKER} ### Stub completion\n\n{filler}\n"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+    limit_headers = {}
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # A new connection pays for DNS, TCP and TLS once; keep-alive requests don't
+        if self.config.connect_latency:
+            time.sleep(self.config.connect_latency)
+
+    def _send_json(self, status, body, headers=None):
+        headers = dict(self.limit_headers, **(headers or {}))
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _write_chunk(self, data):
+        # Chunked transfer encoding: keeps the connection reusable after a stream
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            return self._send_json(200, {"object": "list", "data": [{"id": model, "object": "model"} for model in MODELS]})
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        self.limit_headers = {}
+        if self.config.limiter:
+            prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in payload.get("messages", []))
+            allowed, retry_after, self.limit_headers = self.config.limiter.take(prompt_tokens + self.config.completion_tokens)
+            if not allowed:
+                self.config.rate_limited += 1
+                return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                                       {"Retry-After": f"{max(retry_after, 0.001):.3f}"})
+
+        latency, error_status, hang = self.config.draw()
+        if payload.get("model") in self.config.failing_models:
+            # An outage of one model: exercises the engine's model failover
+            error_status = 503
+        if hang:
+            # Never answers in time: exercises client timeouts and latency budgets
+            time.sleep(600)
+            return
+        time.sleep(latency)
+        if error_status:
+            headers = {"Retry-After": "1"} if error_status == 429 else None
+            return self._send_json(error_status, {"error": {"message": f"stub error {error_status}"}}, headers)
+
+        content = build_content(payload, min(self.config.completion_tokens, payload.get("max_tokens") or 10 ** 6))
+        usage = {
+            "prompt_tokens": sum(estimate_tokens(m.get("content", "")) for m in payload.get("messages", [])),
+            "completion_tokens": estimate_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = payload.get("model", MODELS[0])
+
+        if not payload.get("stream"):
+            return self._send_json(200, {
+                "id": "stub",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in self.limit_headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        pieces = re.findall(r"\S+\s*", content)
+        for index, piece in enumerate(pieces):
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            if index == len(pieces) - 1:
+                chunk["x_groq"] = {"usage": usage}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            if self.config.chunk_delay:
+                time.sleep(self.config.chunk_delay)
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible Groq stand-in for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.8, help="Median (lognormal), mean (exponential) or fixed latency in seconds")
+    parser.add_argument("--latency-dist", choices=["fixed", "lognormal", "exponential"], default="lognormal")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal shape; larger means a longer tail")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error status")
+    parser.add_argument("--error-status", default="500,503,429", help="Comma-separated statuses to pick errors from")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that never answer")
+    parser.add_argument("--completion-tokens", type=int, default=350)
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Seconds added to each new connection (simulated TLS handshake)")
+    parser.add_argument("--failing-models", default="", help="Comma-separated models that always answer 503")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens per minute before 429s (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    StubHandler.config = StubConfig(args)
+    server = StubServer((args.host, args.port), StubHandler)
+    print(f"Groq stub listening on http://{args.host}:{args.port}/v1/chat/completions "
+          f"({args.latency_dist} latency {args.latency}s, error rate {args.error_rate})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if StubHandler.config.limiter:
+            print(f"Answered {StubHandler.config.rate_limited} requests with 429")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import metrics
+
+# ==========================================
+# RESULT CACHE (in-process LRU + TTL)
+# ==========================================
+
+class ResultCache:
+    """
+    Bounded, thread-safe LRU cache with per-entry expiry.
+    - max_entries: least recently used entries are evicted past this size
+    - ttl: seconds an entry stays valid (0 disables expiry)
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.max_entries == 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# ==========================================
+# SHARED RESULT CACHE (SQLite, cross-worker)
+# ==========================================
+
+class SQLiteCache:
+    """
+    Host-wide cache shared by all gunicorn workers via one SQLite file in WAL mode.
+    Values are stored zlib-compressed, survive restarts, and the table is trimmed
+    back to max_entries (oldest first) as new results are written.
+    """
+
+    # Trim the table every N writes instead of counting rows on each insert
+    TRIM_EVERY = 64
+
+    def __init__(self, path, max_entries=20000, ttl=86400, compress_level=6):
+        self.path = path
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl = float(ttl)
+        self.compress_level = compress_level
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created_at)")
+        conn.commit()
+
+    def _connect(self):
+        # sqlite3 connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        pid = os.getpid()
+        if conn is None or getattr(self._local, "pid", None) != pid:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def get(self, key):
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            metrics.report_error("Cache read", e)
+            row = None
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        blob, expires_at = row
+        if expires_at and expires_at < time.time():
+            with self._lock:
+                self.expirations += 1
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return zlib.decompress(blob).decode("utf-8")
+
+    def set(self, key, value):
+        if self.max_entries == 0:
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl > 0 else 0
+        blob = zlib.compress(value.encode("utf-8"), self.compress_level)
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, blob, now, expires_at),
+            )
+            with self._lock:
+                self._writes += 1
+                trim = self._writes % self.TRIM_EVERY == 0
+            if trim:
+                self._trim(conn, now)
+        except sqlite3.Error as e:
+            metrics.report_error("Cache write", e)
+
+    def _trim(self, conn, now):
+        expired = conn.execute(
+            "DELETE FROM results WHERE expires_at > 0 AND expires_at < ?", (now,)
+        ).rowcount
+        count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        overflow = count - self.max_entries
+        evicted = 0
+        if overflow > 0:
+            evicted = conn.execute(
+                "DELETE FROM results WHERE key IN"
+                " (SELECT key FROM results ORDER BY created_at LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        with self._lock:
+            self.expirations += max(expired, 0)
+            self.evictions += max(evicted, 0)
+
+    def clear(self):
+        self._connect().execute("DELETE FROM results")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self):
+        try:
+            entries = len(self)
+        except sqlite3.Error:
+            entries = None
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def create_cache(backend="memory", **options):
+    """Build the configured cache backend ('memory' or 'sqlite')."""
+    if backend == "sqlite":
+        return SQLiteCache(
+            options.get("path") or ".cache/result_cache.sqlite3",
+            max_entries=options.get("max_entries", 20000),
+            ttl=options.get("ttl", 86400),
+        )
+    return ResultCache(options.get("max_entries", 2048), options.get("ttl", 3600))
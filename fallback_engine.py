@@ -0,0 +1,333 @@
+import hashlib
+import random
+import threading
+from itertools import permutations
+
+from keyword_signals import LEAD_SIGNALS
+
+# ==========================================
+# FALLBACK ENGINE
+# ==========================================
+#
+# Template-based outputs served when Groq is unavailable. Every call draws from
+# its own random.Random (seeded when the output must be deterministic), so
+# concurrent requests never disturb each other's sequence. Candidate tables are
+# built once at import as small f-string renderers over a dict of the request
+# fields (`v`), so only the entries actually picked get formatted. "Pick k
+# distinct items" tables are precomputed as every ordered k-permutation, turning
+# a shuffle or sample into a single rng.choice.
+
+_thread_rng = threading.local()
+
+
+def get_rng(seed=None):
+    """Seeded Random for deterministic output, otherwise this thread's own Random."""
+    if seed is not None:
+        return random.Random(seed)
+    rng = getattr(_thread_rng, "rng", None)
+    if rng is None:
+        rng = _thread_rng.rng = random.Random()
+    return rng
+
+
+def seed_thread_rng(seed):
+    """Pin this thread's Random, so unseeded fallbacks repeat exactly (replay.py)."""
+    _thread_rng.rng = random.Random(seed)
+
+
+def input_fingerprint(*args):
+    """Full MD5 hex digest of the input parameters (generate_seed_from_input uses its prefix)."""
+    input_string = '|'.join(str(arg) for arg in args)
+    return hashlib.md5(input_string.encode()).hexdigest()
+
+
+def generate_seed_from_input(*args):
+    """Generate deterministic seed from input parameters for consistent decisions."""
+    return int(input_fingerprint(*args)[:8], 16)
+
+
+# ==========================================
+# MARKETING CAMPAIGN TEMPLATES
+# ==========================================
+
+MARKETING_OBJECTIVES = (
+    lambda v: f"To dominate share of voice in the {v['audience']} segment on {v['platform']}.",
+    lambda v: f"To aggressively scale brand awareness for {v['product']} via high-impact visuals.",
+    lambda v: f"To establish {v['product']} as the undisputed category leader for {v['audience']}.",
+    lambda v: f"To drive rapid user acquisition and viral growth on {v['platform']}.",
+    lambda v: f"To build a loyal community of {v['audience']} advocates around {v['product']}.",
+)
+
+MARKETING_TAGLINES = (
+    lambda v: f"Redefining {v['description']} for the modern {v['audience']}.",
+    lambda v: f"{v['product']}: The {v['adjective']} choice for {v['audience']}.",
+    lambda v: f"Step into the future of {v['description']} with {v['product']}.",
+    lambda v: f"Don't just survive, thrive. {v['product']}.",
+    lambda v: f"{v['product']}: Because {v['audience']} deserve better.",
+)
+TAGLINE_ADJECTIVES = ('ultimate', 'premier', 'smart')
+
+MARKETING_STRATEGIES = (
+    (
+        lambda v: f"Leverage {v['platform']} Reels for viral organic reach.",
+        lambda v: f"Partner with 5-10 micro-influencers in the {v['audience']} niche.",
+        lambda v: "Implement a retargeting layer for high-intent visitors.",
+    ),
+    (
+        lambda v: f"Launch a user-generated content (UGC) challenge on {v['platform']}.",
+        lambda v: "Use carousel ads to breakdown complex features.",
+        lambda v: f"Host a live Q&A session tailored to {v['audience']} pain points.",
+    ),
+    (
+        lambda v: "Focus on 'Transformation' storytelling (Before vs After).",
+        lambda v: f"Use {v['platform']} Stories for limited-time offers.",
+        lambda v: "Create a community-led ambassador program.",
+    ),
+)
+
+CONTENT_IDEAS = (
+    "**Day in the Life:** A relatable vlog-style post featuring a typical user.",
+    "**Myth Buster:** Debunking common industry misconceptions.",
+    "**Feature Spotlight:** 30-second deep dive into a specific benefit.",
+    "**Unboxing Experience:** High-quality ASMR-style unsheathing of the product.",
+    "**Founder's Story:** Authentic video sharing the 'why' behind the brand.",
+    "**Customer Reaction:** Compilation of genuine user feedback.",
+    "**How-To Guide:** Step-by-step tutorial for maximizing value.",
+    "**Reaction Video:** Influencers reacting to the product for the first time.",
+)
+
+# Metric renderers draw their target value from the call's rng
+MARKETING_METRICS = (
+    lambda rng: f"CTR > {rng.uniform(1.5, 3.5):.1f}%",
+    lambda rng: f"ROAS > {rng.uniform(2.5, 5.0):.1f}x",
+    lambda rng: f"Engagement Rate > {rng.uniform(4.0, 9.0):.1f}%",
+    lambda rng: f"CPA < ${rng.randint(15, 45)}",
+    lambda rng: f"Brand Mention Lift > {rng.randint(10, 30)}%",
+)
+
+CONTENT_IDEA_PICKS = tuple(permutations(CONTENT_IDEAS, 5))
+
+AD_COPY_HOOKS = ('Stop settling.', 'Ready for an upgrade?', 'The wait is over.')
+
+
+def fallback_marketing(product, description, audience, platform, seed=None):
+    rng = get_rng(seed)
+    fields = {
+        "product": product,
+        "description": description,
+        "audience": audience,
+        "platform": platform,
+        "adjective": rng.choice(TAGLINE_ADJECTIVES),
+    }
+    ideas = rng.choice(CONTENT_IDEA_PICKS)
+    metrics = [rng.choice(MARKETING_METRICS)(rng) for _ in range(3)]
+
+    return f"""### 🚀 Marketing Campaign Strategy: {product}
+
+**Campaign Objective:**
+{rng.choice(MARKETING_OBJECTIVES)(fields)}
+
+**Core Marketing Message:**
+"{rng.choice(MARKETING_TAGLINES)(fields)}"
+
+**Strategy for {platform}:**
+- {rng.choice(MARKETING_STRATEGIES)[0](fields)}
+- {rng.choice(MARKETING_STRATEGIES)[1](fields)}
+- {rng.choice(MARKETING_STRATEGIES)[2](fields)}
+
+**Content Ideas:**
+- {ideas[0]}
+- {ideas[1]}
+- {ideas[2]}
+- {ideas[3]}
+- {ideas[4]}
+
+**Ad Copy Variations:**
+1. "{rng.choice(AD_COPY_HOOKS)} {product} is here to change the game for {audience}."
+2. "POV: You finally found a {description} that actually works. Meet {product}. #LinkInBio"
+3. "{audience} are switching to {product} for a reason. Experience the difference today."
+
+**Success Metrics:**
+- {metrics[0]}
+- {metrics[1]}
+- {metrics[2]}
+"""
+
+
+# ==========================================
+# SALES PITCH TEMPLATES
+# ==========================================
+
+SALES_OPENERS = (
+    lambda v: f"Hi [Name], I noticed {v['size']} companies in {v['industry']} often struggle with efficiency.",
+    lambda v: f"Hello [Name], are you tired of outdated tools slowing down your {v['industry']} teams?",
+    lambda v: f"Hi [Name], we've been helping {v['size']} {v['industry']} firms cut costs by 20%.",
+    lambda v: f"Hey [Name], quick question about your current {v['industry']} stack.",
+)
+
+SALES_VALUE_PROPS = (
+    lambda v: f"**Purpose-Built:** Unlike generic tools, {v['product']} is designed strictly for {v['industry']}.",
+    lambda v: f"**Rapid Deployment:** Get your {v['size']} team onboarded in days, not months.",
+    lambda v: f"**Cost Efficiency:** Replace 3 fragmented tools with one {v['product']}.",
+    lambda v: f"**Compliance Ready:** Meets all standard {v['industry']} regulatory requirements.",
+    lambda v: "**AI-Powered:** Automates the mundane tasks your team hates.",
+)
+
+SALES_DIFFERENTIATORS = (
+    "Superior UX/UI designed for non-technical users.",
+    "24/7 Dedicated Support for Enterprise accounts.",
+    "Proprietary algorithms that predict market shifts.",
+    "Seamless integration with your existing stack.",
+    "No-code customization engine.",
+)
+
+SALES_VALUE_PROP_PICKS = tuple(permutations(SALES_VALUE_PROPS, 3))
+SALES_DIFFERENTIATOR_PICKS = tuple(permutations(SALES_DIFFERENTIATORS, 3))
+
+SALES_CTAS = (
+    "Do you have 10 minutes this week for a quick walkthrough?",
+    "Would you be open to seeing a 5-minute personalized demo?",
+    "Can I send over a case study relevant to your sector?",
+    "Are you free Tuesday morning for a brief chat?",
+)
+
+
+def fallback_sales(product, persona, industry, size, seed=None):
+    rng = get_rng(seed)
+    fields = {"product": product, "persona": persona, "industry": industry, "size": size}
+    value_props = rng.choice(SALES_VALUE_PROP_PICKS)
+    differentiators = rng.choice(SALES_DIFFERENTIATOR_PICKS)
+
+    return f"""### 💼 B2B Sales Pitch for {persona}
+
+**30-Second Elevator Pitch:**
+"{rng.choice(SALES_OPENERS)(fields)} {product} solves this by streamlining operations and automating manual workflows. We essentially give your team hours back every week, allowing you to focus on high-value strategy rather than grunt work."
+
+**Value Proposition:**
+- {value_props[0](fields)}
+- {value_props[1](fields)}
+- {value_props[2](fields)}
+
+**Key Differentiators:**
+- {differentiators[0]}
+- {differentiators[1]}
+- {differentiators[2]}
+
+**Objection Handling:**
+- *"We don't have budget."* -> "Totally understand. Most of our partners realized that {product} actually **pays for itself** within 3 months by consolidating vendors."
+- *"Is it hard to switch?"* -> "Not at all. Our migration team handles the heavy lifting, ensuring zero downtime for your {size} org."
+
+**Recommended Next Step (CTA):**
+"{rng.choice(SALES_CTAS)}"
+"""
+
+
+# ==========================================
+# LEAD SCORING TEMPLATES
+# ==========================================
+
+# Score thresholds with LOCKED (category, color, action) - shared by fallback and parsed AI output
+LEAD_CATEGORIES = (
+    (75, "Hot 🔥", "#22c55e", "Call immediately (within 15 mins)."),
+    (50, "Warm", "#eab308", "Send case study and follow up in 2 days."),
+    (25, "Lukewarm", "#f59e0b", "Add to monthly newsletter and monitor engagement."),
+    (0, "Cold", "#3b82f6", "Send 'break-up' email to gauge interest."),
+)
+
+
+def categorize_score(score):
+    """Return the locked (category, color, action) for a 0-100 score."""
+    for threshold, category, color, action in LEAD_CATEGORIES:
+        if score >= threshold:
+            return category, color, action
+    return LEAD_CATEGORIES[-1][1:]
+
+
+def lead_result(score, category, color, reasons, conversion_prob, action, source):
+    """A lead score as a plain dict, the structured form the API returns with format=json."""
+    return {
+        "score": score,
+        "category": category,
+        "color": color,
+        "reasons": list(reasons),
+        "conversion_probability": conversion_prob,
+        "action": action,
+        "source": source,  # 'ai' or 'fallback'
+    }
+
+
+def render_lead_result(result):
+    """Render a lead_result dict as the dashboard's markdown block."""
+    return render_lead_analysis(
+        result["score"],
+        result["category"],
+        result["color"],
+        result["reasons"],
+        result["conversion_probability"],
+        result["action"],
+    )
+
+
+def render_lead_analysis(score, category, color, reasons, conversion_prob, action):
+    """Render a lead score as the dashboard's markdown block."""
+    reasoning = "\n".join([f"- {reason}" for reason in reasons])
+    return f"""### 📊 AI Lead Qualification Analysis
+
+**Lead Score:** **{score}/100**
+
+**Category:** <span style="color:{color}; font-weight:bold">{category}</span>
+
+**Reasoning:**
+{reasoning}
+
+**Estimated Conversion Probability:**
+**{conversion_prob}%** based on current signals.
+
+**Recommended Sales Action:**
+-> **{action}**
+"""
+
+
+def fallback_lead_scoring(product, lead_data, seed=None):
+    return render_lead_result(fallback_lead_result(product, lead_data, seed))
+
+
+def fallback_lead_result(product, lead_data, seed=None):
+    """The deterministic fallback score as a lead_result dict."""
+    # Generate deterministic base score from inputs
+    if seed is None:
+        seed = generate_seed_from_input(product, lead_data)
+    rng = random.Random(seed)
+
+    # Base score with narrow variance (±3)
+    score = rng.randint(47, 53)
+    reasons = []
+
+    # Keyword Logic with STABLE weights (deterministic), see lead_signals.json
+    for signal in LEAD_SIGNALS.match(lead_data):
+        score += signal["weight"]
+        reasons.append(signal["reason"])
+
+    # Small jitter for realism (±3 points)
+    score += rng.randint(-3, 3)
+    score = min(max(score, 10), 99)
+
+    # Determine Category with LOCKED recommendations
+    category, color, action = categorize_score(score)
+
+    # Stable conversion probability (based on score with minimal variance)
+    conversion_prob = int(score * 0.85)
+
+    return lead_result(
+        score,
+        category,
+        color,
+        [
+            reasons[0] if reasons else "Standard inquiry pattern.",
+            f"Matches core value proposition of {product}.",
+            reasons[1] if len(reasons) > 1 else "Context implies moderate commercial intent.",
+        ],
+        conversion_prob,
+        action,
+        "fallback",
+    )
@@ -0,0 +1,141 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ==========================================
+# SHARED HTTP CLIENT (Groq / OpenAI-compatible)
+# ==========================================
+#
+# One pooled, keep-alive requests.Session per process. Gunicorn forks workers
+# after import, so the session is created lazily and rebuilt whenever the PID
+# changes - sockets are never shared across processes.
+
+POOL_CONNECTIONS = int(os.getenv("GROQ_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("GROQ_POOL_MAXSIZE", "32"))
+CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("GROQ_READ_TIMEOUT", "12"))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("GROQ_RETRY_BACKOFF", "0.25"))
+
+# Transient upstream failures worth retrying (429 is handled by the caller). Not 504:
+# like a read timeout, the gateway gave up while Groq may still be generating (and billing)
+RETRY_STATUSES = (500, 502, 503)
+
+_lock = threading.Lock()
+_session = None
+_session_pid = None
+
+
+def _build_session():
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        # A read timeout means Groq may still be generating (and billing) the completion:
+        # don't send it again, let the router/breaker fail over instead
+        read=0,
+        status=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),  # connect errors and 500/502/503 answers are safe to replay
+        raise_on_status=False,
+        respect_retry_after_header=False,  # 429s go back to admission control, not a blind sleep
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+        pool_block=False,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use (or after a fork)."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def default_timeout():
+    """Separate (connect, read) timeouts instead of one flat value."""
+    return (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+def post(url, **kwargs):
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session().post(url, **kwargs)
+
+
+def get(url, **kwargs):
+    kwargs.setdefault("timeout", default_timeout())
+    return get_session().get(url, **kwargs)
+
+
+def warm(url, connections, headers=None, timeout=None):
+    """
+    Open up to `connections` keep-alive connections to `url`'s host ahead of the first real
+    call, with that many concurrent GETs. Returns the number that got an HTTP answer.
+    """
+    session = get_session()
+
+    def fetch():
+        response = session.get(url, headers=headers, timeout=timeout or default_timeout())
+        response.content  # read to the end, so the connection goes back to the pool
+        return response.status_code
+
+    connections = max(int(connections), 0)
+    if not connections:
+        return 0
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="groq-warm") as executor:
+        futures = [executor.submit(fetch) for _ in range(connections)]
+    return sum(1 for future in futures if future.exception() is None)
+
+
+def pool_stats():
+    """
+    Connection pool hit/miss counters for this process.
+    - requests: total requests sent through the pool
+    - misses: new connections opened (DNS + TCP + TLS handshake)
+    - hits: requests served on an already-open keep-alive connection
+    """
+    session = _session if _session_pid == os.getpid() else None
+    stats = {"requests": 0, "hits": 0, "misses": 0, "pools": 0}
+    if session is None:
+        return stats
+
+    # The same adapter is mounted for http:// and https:// - count it once
+    adapters = {id(a): a for a in session.adapters.values()}.values()
+    for adapter in adapters:
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["pools"] += 1
+            stats["requests"] += pool.num_requests
+            stats["misses"] += pool.num_connections
+    stats["hits"] = max(stats["requests"] - stats["misses"], 0)
+    return stats
+
+
+def close():
+    """Drop pooled connections (e.g. on worker shutdown)."""
+    global _session, _session_pid
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
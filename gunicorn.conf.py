@@ -0,0 +1,60 @@
+import glob
+import multiprocessing
+import os
+import tempfile
+
+# ==========================================
+# GUNICORN CONFIG (production entry point)
+# ==========================================
+#
+#   gunicorn -c gunicorn.conf.py
+#
+# - preload_app: the app is imported once in the master (.env, route tables,
+#   prompt templates, static assets, fork-safe warm-up) and forked into the
+#   workers copy-on-write; per-process resources (HTTP pools, SQLite
+#   connections, job threads) are already created lazily per PID
+# - post_worker_init: each worker fetches the model catalog and opens its
+#   Groq connections before it accepts a request (see warmup.py)
+# - on_starting: the shared metrics directory (PROMETHEUS_MULTIPROC_DIR,
+#   default <tmp>/marketmind-metrics) is created, or emptied of the previous
+#   run's samples, so /metrics aggregates this run's workers only
+# - child_exit: an exited worker's gauges leave the shared metrics directory
+#
+# For the async engine:
+#   APP_MODULE=asgi:application WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5001')}")
+wsgi_app = os.getenv("APP_MODULE", "app:create_app()")
+worker_class = os.getenv("WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 9))))
+# Threads per gthread worker: each one holds a request for the whole Groq call
+threads = int(os.getenv("WORKER_THREADS", "16"))
+preload_app = os.getenv("PRELOAD_APP", "1") == "1"
+# Batch scoring and streamed generations legitimately run for tens of seconds
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+# Each request already writes a JSON log line (metrics.py)
+accesslog = None
+
+# Set before the app (and metrics.py, which reads it at import) is loaded
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "marketmind-metrics"))
+
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+        os.remove(path)
+
+
+def post_worker_init(worker):
+    import warmup
+
+    warmup.warm_up()
+
+
+def child_exit(server, worker):
+    import metrics
+
+    metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,283 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+import metrics
+
+# ==========================================
+# BACKGROUND JOBS
+# ==========================================
+#
+# Long generations run off the request path: submit() stores a queued job and
+# returns its id at once, a bounded pool of worker threads runs the handler,
+# and clients poll GET /api/jobs/<id> or follow its SSE event stream. Results
+# are kept for JOB_RESULT_TTL seconds after they finish.
+# The job store is in-memory (per worker) or a shared SQLite file, so with
+# several gunicorn workers a job submitted to one can be polled from any.
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", ".cache/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "256"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class QueueFull(Exception):
+    """Raised by submit() when JOB_QUEUE_SIZE jobs are already waiting."""
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by another user
+    return True
+
+
+# ==========================================
+# JOB STORES
+# ==========================================
+
+class MemoryJobStore:
+    """Jobs of this process only, dropped JOB_RESULT_TTL seconds after they finish."""
+
+    def __init__(self, ttl=JOB_RESULT_TTL):
+        self.ttl = float(ttl)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        now = time.time()
+        with self._lock:
+            self._jobs[job["id"]] = (dict(job), now + self.ttl)
+            expired = [job_id for job_id, (_, expires_at) in self._jobs.items() if expires_at < now]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        if entry is None or entry[1] < time.time():
+            return None
+        return dict(entry[0])
+
+    def stats(self):
+        with self._lock:
+            jobs = [job for job, _ in self._jobs.values()]
+        counts = {}
+        for job in jobs:
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {"backend": "memory", "jobs": counts}
+
+
+class SQLiteJobStore:
+    """
+    Host-wide job table shared by all gunicorn workers (one SQLite file, WAL mode).
+    A job whose owning process has exited before finishing it reads as failed.
+    """
+
+    # Delete expired jobs every N writes
+    PURGE_EVERY = 64
+
+    def __init__(self, path, ttl=JOB_RESULT_TTL):
+        self.path = path
+        self.ttl = float(ttl)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " job TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at)")
+
+    def _connect(self):
+        # sqlite3 connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        pid = os.getpid()
+        if conn is None or getattr(self._local, "pid", None) != pid:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=True)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def put(self, job):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, job, expires_at) VALUES (?, ?, ?, ?)",
+            (job["id"], job["status"], json.dumps(job), now + self.ttl),
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_EVERY == 0
+        if purge:
+            conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,))
+
+    def get(self, job_id):
+        row = self._connect().execute(
+            "SELECT job, expires_at FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        job = json.loads(row[0])
+        if job["status"] not in FINISHED and not _pid_alive(job["pid"]):
+            job.update(status=FAILED, error="Worker process exited before the job finished")
+        return job
+
+    def stats(self):
+        try:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE expires_at >= ? GROUP BY status", (time.time(),)
+            ).fetchall()
+        except sqlite3.Error:
+            rows = []
+        return {"backend": "sqlite", "path": self.path, "jobs": dict(rows)}
+
+
+def create_job_store(backend=JOB_BACKEND, path=JOB_STORE_PATH, ttl=JOB_RESULT_TTL):
+    """Build the configured job store ('memory' or 'sqlite')."""
+    if backend == "sqlite":
+        return SQLiteJobStore(path, ttl)
+    return MemoryJobStore(ttl)
+
+
+# ==========================================
+# WORKER POOL
+# ==========================================
+
+class JobQueue:
+    """
+    Bounded queue plus worker threads for `handlers` ({kind: fn(data) -> JSON-able result}).
+    Threads start on first submit and are rebuilt after a fork, like groq_client's session.
+    """
+
+    def __init__(self, handlers, store=None, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE):
+        self.handlers = handlers
+        self.store = store or create_job_store()
+        self.workers = max(int(workers), 1)
+        self.queue_size = max(int(queue_size), 1)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._done = {}  # job id -> Event, for jobs run by this process
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._queue = queue.Queue(self.queue_size)
+            self._done = {}
+            for number in range(self.workers):
+                threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True).start()
+            self._pid = pid
+
+    def submit(self, kind, data):
+        """Queue a job; returns its record. Raises KeyError for an unknown kind, QueueFull when full."""
+        if kind not in self.handlers:
+            raise KeyError(kind)
+        self._ensure_workers()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": QUEUED,
+            "pid": os.getpid(),
+            "created_at": round(time.time(), 3),
+        }
+        self._done[job["id"]] = threading.Event()
+        self.store.put(job)
+        try:
+            self._queue.put_nowait((job, data))
+        except queue.Full:
+            self._done.pop(job["id"], None)
+            self.store.put(dict(job, status=FAILED, error="Job queue full"))
+            self.rejected += 1
+            metrics.record_job(kind, "rejected")
+            raise QueueFull(f"{self.queue_size} jobs already queued")
+        return job
+
+    def _work(self):
+        while True:
+            job, data = self._queue.get()
+            try:
+                self._run(job, data)
+            finally:
+                event = self._done.pop(job["id"], None)
+                if event is not None:
+                    event.set()
+
+    def _run(self, job, data):
+        started = time.time()
+        job.update(status=RUNNING, started_at=round(started, 3))
+        self.store.put(job)
+
+        # Each job gets its own trace, so its Groq timing lands in a log line like a request's
+        trace = metrics.start_request(f"job:{job['kind']}", "JOB")
+        metrics.annotate(job_id=job["id"], queued_ms=round((started - job["created_at"]) * 1000, 1))
+        status = 200
+        try:
+            job.update(status=DONE, result=self.handlers[job["kind"]](data))
+        except Exception as e:
+            status = 500
+            metrics.report_error(f"Job {job['kind']}", e)
+            job.update(status=FAILED, error=str(e))
+        finally:
+            metrics.finish_request(trace, status)
+        job["finished_at"] = round(time.time(), 3)
+        self.store.put(job)
+        metrics.record_job(job["kind"], job["status"], started - job["created_at"], job["finished_at"] - started)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait(self, job_id, timeout, poll_interval=0.25):
+        """Block until the job finishes or `timeout` passes; returns its latest record (None if unknown)."""
+        event = self._done.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+            return self.store.get(job_id)
+        # Run by another worker process (shared store): poll it
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINISHED or time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._pid == os.getpid() else 0,
+            "queue_size": self.queue_size,
+            "rejected": self.rejected,
+            "store": self.store.stats(),
+        }
+
+
+def public_view(job):
+    """The job record as returned by the API (without the owning pid)."""
+    return {key: value for key, value in job.items() if key != "pid"}
@@ -0,0 +1,121 @@
+import json
+import os
+import re
+
+# ==========================================
+# KEYWORD SIGNAL ENGINE
+# ==========================================
+#
+# Scores lead text against a data-driven table of signals (lead_signals.json).
+# One pass splits the text into its distinct words; every word is then looked
+# up in a keyword -> signal map (and, for prefix keywords, its leading slices
+# in a prefix -> signal map), so the cost depends on the text and not on how
+# many signals or keywords the table has. Matching whole words gives the word
+# boundaries ("know" does not hit "now", "headline" does not hit "head").
+# Keywords of several words are confirmed with a regex only when all of their
+# words occur in the text. The scan stops once every signal has been seen.
+
+DEFAULT_SIGNALS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lead_signals.json")
+SIGNALS_PATH = os.getenv("LEAD_SIGNALS_PATH", DEFAULT_SIGNALS_PATH)
+
+_WORD = re.compile(r"\w+")
+_PART = re.compile(r"\w+|\W+")
+
+
+def _words(text):
+    """The distinct words (runs of \\w) of lowercase `text`."""
+    words = set()
+    # str.split does the bulk of the work in C; only tokens with punctuation go through the regex
+    for token in set(text.split()):
+        if token.isalnum():
+            words.add(token)
+        else:
+            words.update(_WORD.findall(token))
+    return words
+
+
+def _phrase_regex(keyword, prefix):
+    """Regex finding a keyword of several words; any whitespace run matches a space in it."""
+    parts = [
+        re.escape(part) if _WORD.match(part) else r"\s+".join(map(re.escape, part.split(" ")))
+        for part in _PART.findall(keyword)
+    ]
+    if _WORD.match(keyword):
+        # The start-of-word check follows the first word, so the regex starts with a literal
+        # and re skips ahead with a fast substring search
+        parts[0] += r"(?<!\w" + parts[0] + ")"
+    pattern = "".join(parts)
+    return re.compile(pattern if prefix else pattern + r"\b")
+
+
+class KeywordSignals:
+    """
+    Compiled signal table. `signals` is a list of dicts with name, weight, reason and
+    keywords; a keyword ending in '*' is a prefix (matches 'need', 'needs', 'needed').
+    """
+
+    def __init__(self, signals):
+        self.signals = tuple(signals)
+        self._exact = {}
+        self._prefix = {}
+        self._phrases = {}  # first word -> [(other words, regex, signal index)] for keywords of several words
+        for index, signal in enumerate(self.signals):
+            for keyword in signal["keywords"]:
+                keyword = " ".join(keyword.lower().split())
+                prefix = keyword.endswith("*")
+                keyword = keyword.rstrip("*")
+                words = _WORD.findall(keyword)
+                if words == [keyword]:
+                    (self._prefix if prefix else self._exact)[keyword] = index
+                elif words:
+                    self._phrases.setdefault(words[0], []).append((words[1:-1], _phrase_regex(keyword, prefix), index))
+        self._prefix_lengths = sorted({len(keyword) for keyword in self._prefix})
+
+    def match_indexes(self, text):
+        """Indexes (into self.signals) of every signal present in `text`, in table order."""
+        if not text:
+            return []
+        text = text.lower()
+        words = _words(text)
+        found = set()
+        wanted = len(self.signals)
+        for word in words:
+            index = self._exact.get(word)
+            if index is not None:
+                found.add(index)
+            for length in self._prefix_lengths:
+                if length > len(word):
+                    break
+                index = self._prefix.get(word[:length])
+                if index is not None:
+                    found.add(index)
+            if len(found) == wanted:
+                return sorted(found)
+        for first in words & self._phrases.keys():
+            for middle, regex, index in self._phrases[first]:
+                # The last word of a prefix phrase may be longer in the text; the regex decides
+                if index not in found and all(word in words for word in middle) and regex.search(text):
+                    found.add(index)
+        return sorted(found)
+
+    def match_many(self, texts):
+        """Hits for a batch of texts as parallel (text positions, signal indexes) lists."""
+        rows, hits = [], []
+        for row, text in enumerate(texts):
+            found = self.match_indexes(text)
+            rows.extend([row] * len(found))
+            hits.extend(found)
+        return rows, hits
+
+    def match(self, text):
+        """The signal dicts present in `text`, in table order."""
+        return [self.signals[index] for index in self.match_indexes(text)]
+
+
+def load_signals(path=SIGNALS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return KeywordSignals(json.load(f)["signals"])
+
+
+# Loaded once at import; shared by every fallback call
+LEAD_SIGNALS = load_signals()
@@ -1,25 +1,16 @@
-
-import os
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
-
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-url = "https://api.groq.com/openai/v1/models"
-headers = {
-    "Authorization": f"Bearer {GROQ_API_KEY}",
-    "Content-Type": "application/json"
-}
-
-try:
-    response = requests.get(url, headers=headers)
-    print(f"Status Code: {response.status_code}")
-    if response.status_code == 200:
-        models = response.json()['data']
-        for model in models:
-            print(f"- {model['id']}")
-    else:
-        print("Error response:", response.text)
-except Exception as e:
-    print(f"Exception: {e}")
+import ai_engine
+
+# Prints Groq's model catalog (the list the model router routes against) and,
+# for each route, which of its models the catalog offers.
+
+try:
+    models = ai_engine.model_router.catalog.refresh()
+    for model in models:
+        print(f"- {model['id']}")
+    available = {model['id'] for model in models}
+    print("\nRoutes:")
+    for name, route in ai_engine.model_router.routes.items():
+        listed = ", ".join(m if m in available else f"{m} (not in catalog)" for m in route["models"])
+        print(f"- {name}: {listed}; max_tokens {route.get('max_tokens') or 'per call'}")
+except Exception as e:
+    print(f"Exception: {e}")
@@ -0,0 +1,303 @@
+import contextvars
+import json
+import os
+import time
+
+import httpx
+import requests
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# ==========================================
+# METRICS & REQUEST TRACING
+# ==========================================
+#
+# Prometheus metrics for /metrics plus one structured JSON log line per request.
+# With several gunicorn workers, PROMETHEUS_MULTIPROC_DIR names a directory
+# they share (gunicorn.conf.py sets it up): every worker writes its samples
+# there and /metrics aggregates them, whichever worker answers the scrape.
+#
+# While a request is handled, a trace dict lives in a context variable; the
+# engine adds Groq timings, token usage, cache and fallback details to it, and
+# they end up in the request's log line.
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+REQUEST_LOG = os.getenv("REQUEST_LOG", "1") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 6, 9, 12, 20, 30)
+
+REQUEST_LATENCY = Histogram(
+    "marketmind_request_duration_seconds",
+    "HTTP request latency (streamed responses: until the last byte)",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "marketmind_requests_in_flight",
+    "Requests currently being handled",
+    ["endpoint"],
+    multiprocess_mode="livesum",
+)
+GROQ_CALLS = Counter(
+    "marketmind_groq_calls_total",
+    "Groq completion calls by outcome (ok, timeout, http_error, parse_error, connection_error, ...)",
+    ["endpoint", "outcome"],
+)
+GROQ_LATENCY = Histogram(
+    "marketmind_groq_call_duration_seconds",
+    "Groq completion call latency",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+GROQ_TOKENS = Counter(
+    "marketmind_groq_tokens_total",
+    "Tokens reported in Groq's usage field",
+    ["endpoint", "kind"],
+)
+FALLBACKS = Counter(
+    "marketmind_fallbacks_total",
+    "Template fallbacks served, by reason (no_key, breaker_open, shed, rate_limited, timeout, http_error, ...)",
+    ["endpoint", "reason"],
+)
+ADMISSION_WAIT = Histogram(
+    "marketmind_admission_wait_seconds",
+    "Time spent queued for Groq admission",
+    ["endpoint", "result"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_CALLS = Counter(
+    "marketmind_model_calls_total",
+    "Groq completion calls per model, by outcome",
+    ["model", "outcome"],
+)
+MODEL_LATENCY = Histogram(
+    "marketmind_model_call_duration_seconds",
+    "Groq completion call latency per model",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+MODEL_ROUTES = Counter(
+    "marketmind_model_routes_total",
+    "Routing decisions: the model tried first and why (primary, unavailable, unhealthy, slow)",
+    ["endpoint", "model", "reason"],
+)
+MODEL_FAILOVERS = Counter(
+    "marketmind_model_failovers_total",
+    "Calls retried on the next model in their route, by the first model's failure",
+    ["endpoint", "from_model", "to_model", "reason"],
+)
+PROMPT_TOKENS = Histogram(
+    "marketmind_prompt_tokens",
+    "Estimated prompt tokens sent per Groq call (prompt_builder), after fitting to the input budget",
+    ["endpoint"],
+    buckets=(100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000),
+)
+PROMPT_TRIMS = Counter(
+    "marketmind_prompt_trims_total",
+    "Prompts whose input field was trimmed to fit the endpoint's token budget",
+    ["endpoint", "field"],
+)
+JOBS = Counter(
+    "marketmind_jobs_total",
+    "Background jobs by final status (done, failed, rejected)",
+    ["kind", "status"],
+)
+JOB_DURATION = Histogram(
+    "marketmind_job_duration_seconds",
+    "Background job time spent queued and running",
+    ["kind", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "marketmind_cache_lookups_total",
+    "Result cache lookups",
+    ["endpoint", "result"],
+)
+SIMILAR_LOOKUPS = Counter(
+    "marketmind_similar_lookups_total",
+    "Near-duplicate index lookups (reuse, edit or miss)",
+    ["endpoint", "outcome"],
+)
+
+_trace = contextvars.ContextVar("marketmind_trace", default=None)
+
+
+def classify_error(error):
+    """Map a failed Groq call's exception to a fallback reason label."""
+    reason = getattr(error, "fallback_reason", None)
+    if reason:
+        return reason
+    if isinstance(error, (TimeoutError, requests.Timeout, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        return "http_error"
+    if isinstance(error, (ValueError, KeyError, IndexError, TypeError)):
+        return "parse_error"
+    if isinstance(error, (requests.ConnectionError, httpx.TransportError)):
+        return "connection_error"
+    return "error"
+
+
+# ==========================================
+# REQUEST TRACE
+# ==========================================
+
+def start_request(endpoint, method):
+    """Open the trace for the current request and count it as in flight."""
+    trace = {"endpoint": endpoint, "method": method, "started": time.perf_counter()}
+    _trace.set(trace)
+    REQUESTS_IN_FLIGHT.labels(endpoint).inc()
+    return trace
+
+
+def finish_request(trace, status):
+    """Close a trace from start_request: observe its latency and write its log line. Returns the trace."""
+    _trace.set(None)
+    duration = time.perf_counter() - trace.pop("started")
+    REQUESTS_IN_FLIGHT.labels(trace["endpoint"]).dec()
+    REQUEST_LATENCY.labels(trace["endpoint"], trace["method"], str(status)).observe(duration)
+    trace.update(ts=round(time.time(), 3), pid=os.getpid(), status=status, duration_ms=round(duration * 1000, 1))
+    if "groq_ms" in trace:
+        trace["groq_ms"] = round(trace["groq_ms"], 1)
+    if REQUEST_LOG:
+        print(json.dumps(trace, default=str), flush=True)
+    return trace
+
+
+def annotate(**fields):
+    """Add fields to the current request's trace (no-op outside a request)."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.update(fields)
+    return trace
+
+
+def log_event(event, **fields):
+    """Write one structured JSON log line for something that isn't a request (tagged with pid and ts)."""
+    line = {"event": event, **fields, "pid": os.getpid(), "ts": round(time.time(), 3)}
+    print(json.dumps(line, default=str), flush=True)
+
+
+def report_error(source, error):
+    """Attach an error to the request's log line; outside a request, log it as an 'error' event."""
+    if annotate(error=f"{source}: {error}") is None:
+        log_event("error", source=source, error=str(error))
+
+
+# ==========================================
+# ENGINE EVENTS
+# ==========================================
+
+def record_groq_call(endpoint, outcome, seconds, model=None):
+    endpoint = endpoint or "other"
+    GROQ_CALLS.labels(endpoint, outcome).inc()
+    GROQ_LATENCY.labels(endpoint).observe(seconds)
+    if model:
+        MODEL_CALLS.labels(model, outcome).inc()
+        MODEL_LATENCY.labels(model).observe(seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace["groq_calls"] = trace.get("groq_calls", 0) + 1
+        trace["groq_ms"] = trace.get("groq_ms", 0.0) + seconds * 1000
+        trace["groq_outcome"] = outcome
+        if model:
+            trace["model"] = model
+
+
+def record_usage(endpoint, usage):
+    """Count prompt/completion tokens from a Groq `usage` object."""
+    if not usage:
+        return
+    endpoint = endpoint or "other"
+    trace = _trace.get()
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = usage.get(kind)
+        if tokens:
+            GROQ_TOKENS.labels(endpoint, kind[:-len("_tokens")]).inc(tokens)
+            if trace is not None:
+                trace[kind] = trace.get(kind, 0) + tokens
+
+
+def record_prompt(endpoint, prompt):
+    """Count a built Prompt's estimated tokens and trimmed fields; returns the prompt."""
+    endpoint = endpoint or "other"
+    PROMPT_TOKENS.labels(endpoint).observe(prompt.tokens)
+    for field in prompt.trimmed:
+        PROMPT_TRIMS.labels(endpoint, field).inc()
+    trace = _trace.get()
+    if trace is not None:
+        trace["prompt_tokens_est"] = trace.get("prompt_tokens_est", 0) + prompt.tokens
+        if prompt.trimmed:
+            trace["trimmed"] = ",".join(prompt.trimmed)
+    return prompt
+
+
+def record_route(endpoint, route):
+    MODEL_ROUTES.labels(endpoint or "other", route.models[0], route.reason).inc()
+    if route.reason != "primary":
+        annotate(route=route.reason)
+
+
+def record_failover(endpoint, from_model, to_model, reason):
+    MODEL_FAILOVERS.labels(endpoint or "other", from_model, to_model, reason).inc()
+    trace = _trace.get()
+    if trace is not None:
+        trace.setdefault("failovers", []).append(f"{from_model}->{to_model} ({reason})")
+
+
+def record_fallback(endpoint, reason):
+    FALLBACKS.labels(endpoint or "other", reason).inc()
+    annotate(fallback=reason)
+
+
+def record_admission(endpoint, admitted, seconds):
+    ADMISSION_WAIT.labels(endpoint or "other", "admitted" if admitted else "shed").observe(seconds)
+    if seconds >= 0.001:
+        trace = _trace.get()
+        if trace is not None:
+            trace["queue_ms"] = round(trace.get("queue_ms", 0.0) + seconds * 1000, 1)
+
+
+def record_cache(endpoint, hit):
+    CACHE_LOOKUPS.labels(endpoint, "hit" if hit else "miss").inc()
+    annotate(cache="hit" if hit else "miss")
+
+
+def record_similar(endpoint, outcome, similarity=None):
+    SIMILAR_LOOKUPS.labels(endpoint, outcome).inc()
+    if similarity is None:
+        annotate(similar=outcome)
+    else:
+        annotate(similar=outcome, similarity=similarity)
+
+
+def record_job(kind, status, queued_seconds=None, run_seconds=None):
+    JOBS.labels(kind, status).inc()
+    if queued_seconds is not None:
+        JOB_DURATION.labels(kind, "queued").observe(max(queued_seconds, 0.0))
+    if run_seconds is not None:
+        JOB_DURATION.labels(kind, "running").observe(run_seconds)
+
+
+def mark_process_dead(pid):
+    """Drop an exited worker's live gauges from the shared metrics directory (gunicorn child_exit)."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+def render():
+    """Return (body, content_type) for /metrics, aggregated over all workers in multiprocess mode."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
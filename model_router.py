@@ -0,0 +1,243 @@
+import json
+import threading
+import time
+from collections import deque
+
+import groq_client
+
+# ==========================================
+# MODEL ROUTING
+# ==========================================
+#
+# Picks the Groq model and max_tokens for each call from a route table keyed by
+# endpoint (and optionally mode), then orders the route's candidate models by
+# how they have behaved lately:
+# - models missing from Groq's model catalog are skipped
+# - models with a high recent error rate, or slower on average than the
+#   route's `slow_after` seconds, move behind the healthy ones
+# call_groq_api tries the candidates in that order, so a failing model fails
+# over to the next one before any template fallback is served.
+
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+# Route lookup order: "endpoint:mode", "endpoint", "default".
+# max_tokens None keeps the caller's value (packed scoring sizes its own).
+DEFAULT_ROUTES = {
+    "marketing": {"models": [LARGE_MODEL, SMALL_MODEL], "max_tokens": 1200, "slow_after": 6.0},
+    "sales": {"models": [LARGE_MODEL, SMALL_MODEL], "max_tokens": 1200, "slow_after": 6.0},
+    # Revising an earlier draft for near-identical inputs (SIMILAR_REUSE=edit) is a small model's job
+    "marketing:edit": {"models": [SMALL_MODEL, LARGE_MODEL], "max_tokens": 1200, "slow_after": 4.0},
+    "sales:edit": {"models": [SMALL_MODEL, LARGE_MODEL], "max_tokens": 1200, "slow_after": 4.0},
+    # A score, a category and three bullet points: the small model is plenty, and several times faster.
+    # 300 tokens covers the markdown block of LEAD_SCORING_MODE=markdown (JSON mode sizes its own).
+    "lead_scoring": {"models": [SMALL_MODEL, LARGE_MODEL], "max_tokens": 300, "slow_after": 3.0},
+    # Packed JSON for many leads at once needs the large model's instruction following
+    "lead_scoring_batch": {"models": [LARGE_MODEL, SMALL_MODEL], "max_tokens": None, "slow_after": 12.0},
+    "default": {"models": [LARGE_MODEL, SMALL_MODEL], "max_tokens": 1200, "slow_after": 8.0},
+}
+
+
+def load_routes(overrides=None):
+    """DEFAULT_ROUTES with `overrides` (a dict, or its JSON text) merged in per route."""
+    if isinstance(overrides, str):
+        overrides = json.loads(overrides) if overrides.strip() else {}
+    routes = {name: dict(route) for name, route in DEFAULT_ROUTES.items()}
+    for name, route in (overrides or {}).items():
+        routes[name] = dict(routes.get(name, routes["default"]), **route)
+    for name, route in routes.items():
+        if not route.get("models"):
+            raise ValueError(f"Model route '{name}' has no models")
+    return routes
+
+
+def fetch_models(url, api_key):
+    """GET the OpenAI-compatible model list; returns the `data` entries."""
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    response = groq_client.get(url, headers=headers)
+    response.raise_for_status()
+    return response.json()['data']
+
+
+class ModelCatalog:
+    """
+    Cached model list. Refreshes happen in a background thread once the cache is older
+    than `ttl`, so no request waits on them; until the first one lands every model counts
+    as available.
+    """
+
+    def __init__(self, url, api_key, ttl=3600.0, retry_after=60.0):
+        self.url = url
+        self.api_key = api_key
+        self.ttl = float(ttl)
+        self.retry_after = float(retry_after)
+        self._lock = threading.Lock()
+        self._models = None
+        self._fetched_at = 0.0
+        self._next_refresh = 0.0
+        self._refreshing = False
+        self.last_error = None
+
+    def refresh(self):
+        """Fetch the catalog now (blocking); returns the model entries."""
+        try:
+            models = fetch_models(self.url, self.api_key)
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+                self._next_refresh = time.monotonic() + self.retry_after
+            raise
+        with self._lock:
+            self._models = models
+            self._fetched_at = time.monotonic()
+            self._next_refresh = self._fetched_at + self.ttl
+            self.last_error = None
+        return models
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass  # kept in last_error; the stale list (or none) stays in use
+        finally:
+            self._refreshing = False
+
+    def available(self):
+        """Set of model ids, or None while unknown. Starts a background refresh when stale."""
+        if self.api_key and time.monotonic() >= self._next_refresh and not self._refreshing:
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_quietly, name="model-catalog", daemon=True).start()
+        models = self._models
+        return None if models is None else {model['id'] for model in models}
+
+    def snapshot(self):
+        models = self._models
+        return {
+            "models": None if models is None else sorted(model['id'] for model in models),
+            "age_s": round(time.monotonic() - self._fetched_at, 1) if models is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+class ModelHealth:
+    """Rolling window of one model's calls: error rate and mean latency of its recent calls."""
+
+    def __init__(self, window=120.0):
+        self.window = float(window)
+        self._calls = deque()  # (timestamp, latency, failed)
+
+    def record(self, latency, failed, now):
+        self._calls.append((now, latency, failed))
+        self._trim(now)
+
+    def _trim(self, now):
+        horizon = now - self.window
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def stats(self, now):
+        self._trim(now)
+        calls = len(self._calls)
+        if not calls:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, _, failed in self._calls if failed)
+        latency = sum(latency for _, latency, _ in self._calls) / calls
+        return calls, failures / calls, latency
+
+
+class Route:
+    """One routing decision: models to try in order, the token budget, and why the first was picked."""
+
+    __slots__ = ("name", "models", "max_tokens", "reason")
+
+    def __init__(self, name, models, max_tokens, reason):
+        self.name = name
+        self.models = models
+        self.max_tokens = max_tokens
+        self.reason = reason
+
+    def model_for(self, attempt):
+        """Model for the given attempt; past the end of the list, the last one is retried."""
+        return self.models[min(attempt, len(self.models) - 1)]
+
+
+class ModelRouter:
+    """Route table plus per-model health; route() is called per request, record() per call."""
+
+    def __init__(self, routes, catalog=None, window=120.0, min_calls=5, error_rate=0.3):
+        self.routes = routes
+        self.catalog = catalog
+        self.min_calls = int(min_calls)
+        self.error_rate = float(error_rate)
+        self._window = float(window)
+        self._lock = threading.Lock()
+        self._health = {}
+
+    def _route_config(self, endpoint, mode):
+        for name in (f"{endpoint}:{mode}", endpoint, "default"):
+            if name in self.routes:
+                return name, self.routes[name]
+
+    def route(self, endpoint, mode='creative'):
+        name, config = self._route_config(endpoint, mode)
+        configured = config["models"]
+        available = self.catalog.available() if self.catalog else None
+        candidates = [model for model in configured if available is None or model in available]
+        if not candidates:
+            # The catalog lists none of them (renamed models?): let Groq give the verdict
+            candidates = list(configured)
+
+        slow_after = config.get("slow_after")
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for position, model in enumerate(candidates):
+                health = self._health.get(model)
+                calls, error_rate, latency = health.stats(now) if health else (0, 0.0, 0.0)
+                judged = calls >= self.min_calls
+                unhealthy = judged and error_rate >= self.error_rate
+                slow = judged and bool(slow_after) and latency > slow_after
+                ranked.append((unhealthy, slow, position, model))
+        ranked.sort()
+
+        unhealthy, slow, _, first = ranked[0]
+        if first == configured[0]:
+            reason = "primary"
+        elif configured[0] not in candidates:
+            reason = "unavailable"
+        else:
+            # The primary was passed over; say why
+            primary = next(entry for entry in ranked if entry[3] == configured[0])
+            reason = "unhealthy" if primary[0] else "slow"
+        return Route(name, tuple(entry[3] for entry in ranked), config.get("max_tokens"), reason)
+
+    def record(self, model, failed, latency):
+        """Report a finished call to `model`."""
+        now = time.monotonic()
+        with self._lock:
+            health = self._health.get(model)
+            if health is None:
+                health = self._health[model] = ModelHealth(self._window)
+            health.record(latency, failed, now)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for model, health in self._health.items():
+                calls, error_rate, latency = health.stats(now)
+                models[model] = {
+                    "window_calls": calls,
+                    "error_rate": round(error_rate, 3),
+                    "mean_latency_ms": round(latency * 1000, 1),
+                }
+        return {
+            "catalog": self.catalog.snapshot() if self.catalog else None,
+            "models": models,
+            "routes": self.routes,
+        }
@@ -0,0 +1,238 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import random
+import tempfile
+import time
+from collections import deque
+from multiprocessing import Pool
+
+import numpy as np
+
+from fallback_engine import LEAD_CATEGORIES, generate_seed_from_input
+from keyword_signals import LEAD_SIGNALS
+
+# ==========================================
+# OFFLINE LEAD SCORER
+# ==========================================
+#
+# Pre-ranks large CRM exports with the deterministic fallback scoring logic,
+# without rendering any markdown. The input is streamed in chunks to a pool of
+# worker processes; each chunk is scored as NumPy arrays and written back as a
+# sorted run, and the runs are merged into the ranked output (and top-K file)
+# at the end, so memory stays flat whatever the file size.
+#
+#   python offline_scorer.py leads.csv --product "Acme CRM" --top-k 500
+#
+# Scores match fallback_lead_scoring exactly: each row draws its base score and
+# jitter from its own random.Random(seed), in the same order. The seed is the
+# row's "seed" column if present, otherwise it is derived from (product,
+# leadData) like fallback_lead_scoring, or from (product, icp, valueProp,
+# leadData) like the API when --icp / --value-prop are given.
+
+CHUNK_SIZE = int(os.getenv("OFFLINE_CHUNK_SIZE", "10000"))
+
+SIGNAL_WEIGHTS = np.array([signal["weight"] for signal in LEAD_SIGNALS.signals], dtype=np.int64)
+SIGNAL_NAMES = [signal["name"] for signal in LEAD_SIGNALS.signals]
+CATEGORY_THRESHOLDS = np.array([threshold for threshold, *_ in LEAD_CATEGORIES], dtype=np.int64)
+CATEGORY_NAMES = [category for _, category, *_ in LEAD_CATEGORIES]
+
+OUTPUT_FIELDS = ["rank", "id", "row", "score", "category", "conversion_probability", "signals"]
+
+
+# ==========================================
+# INPUT
+# ==========================================
+
+def read_rows(path, fmt):
+    """Yield each input record as a dict, one at a time."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_chunks(rows, args):
+    """Group records into (row, id, seed, seed_args, lead_data) chunks of args.chunk_size."""
+    api_seed = args.icp is not None or args.value_prop is not None
+    chunk = []
+    for number, row in enumerate(rows):
+        lead_data = row.get(args.text_column) or ''
+        product = row.get('product') or args.product
+        if api_seed:
+            seed_args = (product, row.get('icp') or args.icp, row.get('valueProp') or args.value_prop, lead_data)
+        else:
+            seed_args = (product, lead_data)
+        seed = row.get('seed')
+        row_id = row.get('id')
+        chunk.append((
+            number,
+            number if row_id in (None, '') else row_id,
+            None if seed in (None, '') else int(seed),
+            seed_args,
+            lead_data,
+        ))
+        if len(chunk) >= args.chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==========================================
+# SCORING
+# ==========================================
+
+def score_chunk(chunk):
+    """
+    Score a chunk the way fallback_lead_scoring does, as arrays.
+    Returns (rows, ids, scores, categories, conversion, hits).
+    """
+    size = len(chunk)
+    base = np.empty(size, dtype=np.int64)
+    jitter = np.empty(size, dtype=np.int64)
+    hits = np.zeros((size, len(SIGNAL_WEIGHTS)), dtype=bool)
+
+    # Per-row RNG draws must stay sequential to match fallback_lead_scoring
+    for i, (_, _, seed, seed_args, _) in enumerate(chunk):
+        rng = random.Random(generate_seed_from_input(*seed_args) if seed is None else seed)
+        base[i] = rng.randint(47, 53)
+        jitter[i] = rng.randint(-3, 3)
+
+    # One regex pass over the whole chunk; each signal counts once per row
+    hit_rows, hit_signals = LEAD_SIGNALS.match_many([entry[4] for entry in chunk])
+    hits[hit_rows, hit_signals] = True
+
+    scores = np.clip(base + hits @ SIGNAL_WEIGHTS + jitter, 10, 99)
+    # Index of the first threshold the score reaches (thresholds are descending)
+    categories = (scores[:, None] < CATEGORY_THRESHOLDS).sum(axis=1)
+    conversion = (scores * 0.85).astype(np.int64)
+
+    rows = np.array([entry[0] for entry in chunk], dtype=np.int64)
+    ids = [entry[1] for entry in chunk]
+    return rows, ids, scores, categories, conversion, hits
+
+
+def score_run(chunk, path):
+    """Score a chunk and write it as a run sorted by score (desc), then input row. Returns category counts."""
+    rows, ids, scores, categories, conversion, hits = score_chunk(chunk)
+    order = np.lexsort((rows, -scores))
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        for i in order:
+            signals = ";".join(SIGNAL_NAMES[j] for j in np.flatnonzero(hits[i]))
+            writer.writerow([scores[i], rows[i], ids[i], CATEGORY_NAMES[categories[i]], conversion[i], signals])
+    return np.bincount(categories, minlength=len(CATEGORY_NAMES))
+
+
+def score_file(args, run_dir):
+    """Score every chunk (in worker processes) and return (run paths, rows, category counts)."""
+    chunks = iter_chunks(read_rows(args.input, args.format), args)
+    runs = []
+    counts = np.zeros(len(CATEGORY_NAMES), dtype=np.int64)
+
+    def next_run():
+        path = os.path.join(run_dir, f"run-{len(runs):05d}.csv")
+        runs.append(path)
+        return path
+
+    if args.workers <= 1:
+        for chunk in chunks:
+            counts += score_run(chunk, next_run())
+        return runs, int(counts.sum()), counts
+
+    with Pool(args.workers) as pool:
+        # Bounded window of submitted chunks keeps memory flat (Pool.imap would read ahead)
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(score_run, (chunk, next_run())))
+            if len(pending) >= args.workers * 2:
+                counts += pending.popleft().get()
+        while pending:
+            counts += pending.popleft().get()
+    return runs, int(counts.sum()), counts
+
+
+# ==========================================
+# OUTPUT
+# ==========================================
+
+def open_writer(path):
+    """Return (file, write(record)) for a .csv or .jsonl output path."""
+    f = open(path, 'w', newline='', encoding='utf-8')
+    if path.endswith(('.jsonl', '.ndjson')):
+        return f, lambda record: f.write(json.dumps(record) + "\n")
+    writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+    writer.writeheader()
+    return f, writer.writerow
+
+
+def merge_runs(runs, output, top_output, top_k):
+    """Stream-merge the sorted runs into the ranked output and the top-K file."""
+    files = [open(path, newline='', encoding='utf-8') for path in runs]
+    out_file, write = open_writer(output)
+    top_file, write_top = open_writer(top_output)
+    try:
+        merged = heapq.merge(
+            *(csv.reader(f) for f in files),
+            key=lambda entry: (-int(entry[0]), int(entry[1])),
+        )
+        for rank, (score, row, row_id, category, conversion, signals) in enumerate(merged, 1):
+            record = {
+                "rank": rank,
+                "id": row_id,
+                "row": int(row),
+                "score": int(score),
+                "category": category,
+                "conversion_probability": int(conversion),
+                "signals": signals,
+            }
+            write(record)
+            if rank <= top_k:
+                write_top(record)
+    finally:
+        for f in files + [out_file, top_file]:
+            f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a CSV/JSONL lead export with the deterministic fallback scorer.")
+    parser.add_argument('input', help="CSV or JSONL file with a leadData column (and optional id, product, icp, valueProp, seed)")
+    parser.add_argument('-o', '--output', help="Ranked output (.csv or .jsonl, default <input>.ranked.csv)")
+    parser.add_argument('--top-output', help="Top-K output (default <input>.top<K>.csv)")
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--product', help="Product for rows without a product column")
+    parser.add_argument('--icp', help="ICP for rows without an icp column (switches to the API's seed)")
+    parser.add_argument('--value-prop', help="Value proposition for rows without a valueProp column")
+    parser.add_argument('--text-column', default='leadData')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from the extension)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tmp-dir', help="Directory for the sorted runs (default: system temp)")
+    args = parser.parse_args(argv)
+
+    stem = os.path.splitext(args.input)[0]
+    args.format = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    args.output = args.output or f"{stem}.ranked.csv"
+    args.top_output = args.top_output or f"{stem}.top{args.top_k}.csv"
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="lead-runs-", dir=args.tmp_dir) as run_dir:
+        runs, total, counts = score_file(args, run_dir)
+        merge_runs(runs, args.output, args.top_output, args.top_k)
+    elapsed = time.perf_counter() - started
+
+    print(f"Scored {total} leads in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} leads/s)")
+    for name, count in zip(CATEGORY_NAMES, counts):
+        print(f"  {name}: {int(count)}")
+    print(f"Ranked output: {args.output}")
+    print(f"Top {args.top_k}: {args.top_output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,564 @@
+import os
+import re
+import string
+import textwrap
+
+from keyword_signals import LEAD_SIGNALS
+
+# ==========================================
+# PROMPT BUILDER
+# ==========================================
+#
+# Every prompt template, compiled once at import: indentation is stripped and
+# the text is split into literal pieces and {field} slots, so rendering is a
+# join. User input is fitted to a per-endpoint token budget first:
+# - repeated sentences (quoted email replies, text pasted twice) are dropped
+# - oversized lead data keeps its highest-signal sentences (buying signals,
+#   numbers, ICP terms); other fields keep their leading sentences
+# - a long value is written out once per prompt; later mentions refer back
+#   to it ("the ICP above") instead of repeating it
+# A prompt therefore never exceeds its template plus the budget (see
+# prompt_ceilings), however much text is pasted in.
+
+# Estimated tokens of user input per prompt (packed lead prompts: shared fields, plus PACKED_LEAD_BUDGET per lead)
+INPUT_BUDGETS = {
+    'marketing': int(os.getenv("PROMPT_BUDGET_MARKETING", "600")),
+    'sales': int(os.getenv("PROMPT_BUDGET_SALES", "400")),
+    'lead_scoring': int(os.getenv("PROMPT_BUDGET_LEAD_SCORING", "1000")),
+    'lead_scoring_batch': int(os.getenv("PROMPT_BUDGET_LEAD_SCORING", "1000")) // 2,
+}
+PACKED_LEAD_BUDGET = int(os.getenv("PROMPT_BUDGET_PACKED_LEAD", "300"))
+
+# Values up to this many characters are repeated verbatim; longer ones are referred back to
+SHORT_FIELD_CHARS = 60
+
+FIELD_LABELS = {
+    'product': "product",
+    'description': "description",
+    'audience': "target audience",
+    'platform': "platform",
+    'persona': "persona",
+    'industry': "industry",
+    'size': "company size",
+    'icp': "ICP",
+    'value_prop': "value proposition",
+    'lead_data': "lead data",
+}
+
+ELLIPSIS = " … "
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+# ==========================================
+# TEMPLATES
+# ==========================================
+
+def _dedent(text):
+    """Strip the source indentation (and trailing spaces) from a template written inside Python code."""
+    first, _, rest = text.strip("\n").partition("\n")
+    lines = [first.strip()] + textwrap.dedent(rest).split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip() + "\n"
+
+
+class Prompt(tuple):
+    """(system_prompt, user_prompt) with the estimated token count and the fields trimmed to fit."""
+
+    def __new__(cls, system_prompt, user_prompt, trimmed=()):
+        prompt = super().__new__(cls, (system_prompt, user_prompt))
+        prompt.trimmed = tuple(trimmed)
+        prompt.tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        return prompt
+
+
+class PromptTemplate:
+    """
+    A template compiled once into literal text and field slots; rendering interleaves the two
+    with a single join. Every mention of a field after its first (in this template or, via
+    `seen`, an earlier one) becomes a {field_ref} slot, filled with the value itself when short
+    and a reference back to it when long.
+    """
+
+    def __init__(self, text, seen):
+        self.literals = []
+        self.slots = []
+        self.fields = []
+        self.repeated = set()
+        pending = ""
+        for literal, field, _, _ in string.Formatter().parse(_dedent(text)):
+            pending += literal  # escaped braces split the literal text
+            if field is None:
+                continue
+            self.literals.append(pending)
+            pending = ""
+            self.fields.append(field)
+            if field in seen:
+                self.repeated.add(field)
+                self.slots.append(field + "_ref")
+            else:
+                seen.add(field)
+                self.slots.append(field)
+        self.literals.append(pending)
+        self.static_tokens = estimate_tokens("".join(self.literals))
+
+    def render(self, values):
+        parts = [None] * (len(self.literals) + len(self.slots))
+        parts[0::2] = self.literals
+        parts[1::2] = [values[slot] for slot in self.slots]
+        return "".join(parts)
+
+
+class PromptPair:
+    """System and user templates rendered together, so a long value is written out only once across both."""
+
+    def __init__(self, system, user):
+        seen = set()
+        self.system = PromptTemplate(system, seen)
+        self.user = PromptTemplate(user, seen)
+        self.repeated = self.system.repeated | self.user.repeated
+
+    def render(self, values, trimmed=()):
+        values = dict(values)
+        for field in self.repeated:
+            value = values[field]
+            values[field + "_ref"] = value if len(value) <= SHORT_FIELD_CHARS else f"the {FIELD_LABELS.get(field, field)} above"
+        return Prompt(self.system.render(values), self.user.render(values), trimmed)
+
+    def ceiling(self, budget):
+        """Upper bound on the estimated prompt tokens when the input fits `budget`."""
+        fields = self.system.fields + self.user.fields
+        repeats = len(fields) - len(set(fields))
+        return self.system.static_tokens + self.user.static_tokens + budget + repeats * estimate_tokens("x" * SHORT_FIELD_CHARS)
+
+
+MARKETING_PROMPTS = PromptPair(
+    system="""You are a world-class Marketing Strategist. 
+    Generate a high-impact, data-driven marketing campaign strategy.
+    
+    CRITICAL CONSTRAINTS:
+    - The campaign MUST be designed EXCLUSIVELY for {platform}
+    - All tactics, content ideas, and ad copy MUST be platform-specific to {platform}
+    - Target audience is STRICTLY: {audience}
+    - DO NOT reference any other platform or generalize
+    - DO NOT override or ignore the specified platform
+    
+    Output Format (Markdown):
+    ### 🚀 Marketing Campaign Strategy: [Product Name]
+    
+    **Campaign Objective:**
+    [concise objective]
+    
+    **Core Marketing Message:**
+    "[compelling tagline]"
+    
+    **Strategy for {platform}:**
+    - [Specific tactic 1 for {platform}]
+    - [Specific tactic 2 for {platform}]
+    - [Specific tactic 3 for {platform}]
+    
+    **Content Ideas:**
+    - **[Idea 1]:** [Brief description]
+    - **[Idea 2]:** [Brief description]
+    - **[Idea 3]:** [Brief description]
+    - **[Idea 4]:** [Brief description]
+    - **[Idea 5]:** [Brief description]
+    
+    **Ad Copy Variations:**
+    1. "[Variation 1]"
+    2. "[Variation 2]"
+    3. "[Variation 3]"
+    
+    **Success Metrics:**
+    - [Metric 1]
+    - [Metric 2]
+    - [Metric 3]
+    """,
+    user="""
+    Product: {product}
+    Description: {description}
+    Target Audience: {audience}
+    Platform: {platform}
+    
+    REMINDER: All strategies must be tailored to {platform} ONLY.
+    """,
+)
+
+SALES_PROMPTS = PromptPair(
+    system="""You are an expert B2B Sales Consultant.
+    Write a persuasive sales pitch tailored to the specific persona and industry.
+    
+    CRITICAL CONSTRAINTS:
+    - Company size is STRICTLY: {size}
+    - Industry is STRICTLY: {industry}
+    - Persona is STRICTLY: {persona}
+    - DO NOT generalize or reference other company sizes (e.g., if {size} is 'Enterprise', do NOT mention SMB or Mid-Market)
+    - All value propositions and differentiators MUST be relevant to {size} companies in {industry}
+    - Tailor objection handling to {size} budget and decision-making processes
+    
+    Output Format (Markdown):
+    ### 💼 B2B Sales Pitch for {persona}
+    
+    **30-Second Elevator Pitch:**
+    "[Script]"
+    
+    **Value Proposition:**
+    - **[Point 1]:** [Detail]
+    - **[Point 2]:** [Detail]
+    - **[Point 3]:** [Detail]
+    
+    **Key Differentiators:**
+    - [Diff 1]
+    - [Diff 2]
+    - [Diff 3]
+    
+    **Objection Handling:**
+    - *"[Common Objection]"* -> "[Response]"
+    - *"[Common Objection]"* -> "[Response]"
+    
+    **Recommended Next Step (CTA):**
+    "[Closing question/action]"
+    """,
+    user="""
+    Product: {product}
+    Persona: {persona}
+    Industry: {industry}
+    Company Size: {size}
+    
+    REMINDER: This pitch is for a {size} company in {industry}. Do not deviate from these constraints.
+    """,
+)
+
+LEAD_PROMPTS = PromptPair(
+    system="""You are a Lead Qualification Expert.
+    Analyze the raw lead data against the ICP and Value Prop.
+    
+    CRITICAL CONSTRAINTS:
+    - Ideal Customer Profile (ICP): {icp}
+    - Value Proposition: {value_prop}
+    - Score the lead based STRICTLY on alignment with the ICP
+    - DO NOT make assumptions beyond what is provided in the lead data
+    - Ensure reasoning directly references the ICP and value proposition
+    - Provide a STABLE score (avoid wild fluctuations)
+    - Lock recommendations to score categories:
+      * 75-100 = Hot → Immediate action (call, demo)
+      * 50-74 = Warm → Priority follow-up (case study, nurture)
+      * 25-49 = Lukewarm → Passive nurture (newsletter, monitor)
+      * 0-24 = Cold → Deprioritize (break-up email)
+    
+    Output Format (Markdown):
+    ### 📊 AI Lead Qualification Analysis
+    
+    **Lead Score:** **[0-100]/100**
+    
+    **Category:** <span style="color:[Green/Orange/Red]; font-weight:bold">[Hot/Warm/Lukewarm/Cold]</span>
+    
+    **Reasoning:**
+    - [Reason 1]
+    - [Reason 2]
+    - [Reason 3]
+    
+    **Estimated Conversion Probability:**
+    **[XX]%** based on intent signals.
+    
+    **Recommended Sales Action:**
+    [Specific action matching the category]
+    """,
+    user="""
+    Product: {product}
+    ICP: {icp}
+    Value Proposition: {value_prop}
+    Raw Lead Data: {lead_data}
+    
+    REMINDER: Evaluate this lead strictly against the ICP: {icp}
+    """,
+)
+
+# LEAD_SCORING_MODE=json: a compact JSON object, rendered server-side
+LEAD_JSON_PROMPTS = PromptPair(
+    system="""You are a Lead Qualification Expert.
+    Analyze the raw lead data against the ICP and Value Prop.
+    
+    CRITICAL CONSTRAINTS:
+    - Ideal Customer Profile (ICP): {icp}
+    - Value Proposition: {value_prop}
+    - Score the lead based STRICTLY on alignment with the ICP
+    - DO NOT make assumptions beyond what is provided in the lead data
+    - Provide a STABLE score (avoid wild fluctuations)
+    - Lock the category to the score: 75-100 Hot, 50-74 Warm, 25-49 Lukewarm, 0-24 Cold
+    
+    Output Format (JSON only):
+    {{"score": <0-100>, "category": "Hot|Warm|Lukewarm|Cold", "reasons": ["<reason 1>", "<reason 2>", "<reason 3>"], "conversion_probability": <0-100>, "action": "<specific action matching the category>"}}
+    """,
+    user="""
+    Product: {product}
+    Raw Lead Data: {lead_data}
+    
+    REMINDER: Evaluate this lead strictly against the ICP: {icp}
+    """,
+)
+
+# N leads share one prompt (ICP, value prop and rubric are sent once)
+PACKED_LEAD_PROMPTS = PromptPair(
+    system="""You are a Lead Qualification Expert.
+    Analyze EACH lead below independently against the ICP and Value Prop.
+    
+    CRITICAL CONSTRAINTS:
+    - Ideal Customer Profile (ICP): {icp}
+    - Value Proposition: {value_prop}
+    - Score every lead based STRICTLY on alignment with the ICP
+    - DO NOT make assumptions beyond what is provided in that lead's data
+    - DO NOT let one lead influence another lead's score
+    - Provide STABLE scores (avoid wild fluctuations)
+    - Lock recommendations to score categories:
+      * 75-100 = Hot → Immediate action (call, demo)
+      * 50-74 = Warm → Priority follow-up (case study, nurture)
+      * 25-49 = Lukewarm → Passive nurture (newsletter, monitor)
+      * 0-24 = Cold → Deprioritize (break-up email)
+    
+    Output Format (JSON only, one entry per lead, same order):
+    {{"leads": [{{"lead": <lead number>, "score": <0-100>, "category": "Hot|Warm|Lukewarm|Cold", "reasons": ["<reason 1>", "<reason 2>", "<reason 3>"], "conversion_probability": <0-100>, "action": "<specific action matching the category>"}}]}}
+    """,
+    user="""
+    Product: {product}
+    
+    {leads}
+    
+    REMINDER: Return exactly {count} entries, each evaluated strictly against the ICP: {icp}
+    """,
+)
+
+# Revises an earlier generation for near-identical inputs (SIMILAR_REUSE=edit in ai_engine)
+EDIT_PROMPTS = PromptPair(
+    system="""{system}
+    
+    REVISION MODE:
+    - You are given an existing draft written for a very similar request
+    - Revise it so it fits the new request exactly; keep what still applies
+    - Keep the same output format and section headings
+    - Output only the revised draft
+    """,
+    user="""
+    New request:
+    {request}
+    
+    Existing draft:
+    {previous}
+    """,
+)
+
+
+# ==========================================
+# INPUT FITTING
+# ==========================================
+
+_WORD = re.compile(r"[a-z0-9$%]+")
+_STOPWORDS = frozenset("""
+    about also and are but can for from has have into more most not our than that the their them they
+    this those very was were what when which while will with within without your
+""".split())
+
+
+def split_sentences(text):
+    """Sentences (and lines) of `text`, quote markers stripped, repeats dropped."""
+    # str.replace + splitlines: several times faster than a regex split on long pasted threads
+    lines = text.replace(". ", ".\n").replace("! ", "!\n").replace("? ", "?\n").splitlines()
+    sentences, seen = [], set()
+    for sentence in lines:
+        sentence = sentence.lstrip("> \t").rstrip()
+        key = " ".join(sentence.lower().rstrip(".!?").split())
+        if key and key not in seen:
+            seen.add(key)
+            sentences.append(sentence)
+    return sentences
+
+
+def _cut(text, max_tokens):
+    """Hard cut at a word boundary to roughly `max_tokens`."""
+    limit = max(max_tokens * 4 - len(ELLIPSIS), 0)
+    if len(text) <= limit + len(ELLIPSIS):
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip() + ELLIPSIS.rstrip()
+
+
+def keep_leading(text, max_tokens):
+    """Deduplicated leading sentences of `text` that fit `max_tokens`."""
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                return _cut(sentence, max_tokens)
+            return " ".join(kept) + ELLIPSIS.rstrip()
+        kept.append(sentence)
+        used += cost
+    return " ".join(kept)
+
+
+def _terms(text):
+    return {word for word in _WORD.findall((text or "").lower()) if len(word) > 3 and word not in _STOPWORDS}
+
+
+def keep_high_signal(text, max_tokens, context=""):
+    """
+    The sentences of lead `text` most worth the model's attention, in their original order,
+    within `max_tokens`. A sentence scores for each buying signal it contains (lead_signals.json,
+    by weight), for numbers (headcount, budget, dates) and for words shared with `context` (ICP,
+    value prop); the opening sentence, usually who is writing, gets a small bonus.
+    """
+    sentences = split_sentences(text)
+    context_terms = _terms(context)
+    rows, hits = LEAD_SIGNALS.match_many(sentences)
+    signal_weight = [0] * len(sentences)
+    for row, index in set(zip(rows, hits)):
+        signal_weight[row] += abs(LEAD_SIGNALS.signals[index]["weight"])
+
+    ranked = []
+    for position, sentence in enumerate(sentences):
+        score = signal_weight[position]
+        score += 5 if any(char.isdigit() for char in sentence) else 0
+        score += 3 * len(_terms(sentence) & context_terms)
+        score += 4 if position == 0 else 0
+        ranked.append((-score, position))
+    ranked.sort()
+
+    chosen, used = [], 0
+    for _, position in ranked:
+        cost = estimate_tokens(sentences[position]) + 1
+        if used + cost <= max_tokens:
+            chosen.append(position)
+            used += cost
+    if not chosen:
+        return _cut(sentences[ranked[0][1]], max_tokens) if sentences else ""
+
+    # Original order; an ellipsis marks each gap
+    chosen.sort()
+    parts = []
+    for previous, position in zip([-1] + chosen, chosen):
+        if position != previous + 1:
+            parts.append("…")
+        parts.append(sentences[position])
+    if chosen[-1] != len(sentences) - 1:
+        parts.append("…")
+    return " ".join(parts)
+
+
+def fit_fields(values, budget, trimmers=None):
+    """
+    Fit user input to `budget` estimated tokens. Small fields stay intact; the largest ones
+    share what is left equally and are trimmed to it (trimmers[name], default keep_leading).
+    Returns (fitted values, names of trimmed fields).
+    """
+    values = {name: "" if value is None else str(value) for name, value in values.items()}
+    sizes = {name: estimate_tokens(value) for name, value in values.items()}
+    if sum(sizes.values()) <= budget:
+        return values, ()
+
+    trimmed = []
+    remaining = budget
+    ordered = sorted(sizes, key=sizes.get)
+    for count, name in enumerate(ordered):
+        share = remaining // (len(ordered) - count)
+        if sizes[name] <= share:
+            remaining -= sizes[name]
+            continue
+        trim = (trimmers or {}).get(name, keep_leading)
+        values[name] = trim(values[name], share)
+        trimmed.append(name)
+        remaining -= estimate_tokens(values[name])
+    return values, tuple(trimmed)
+
+
+# ==========================================
+# BUILDERS
+# ==========================================
+
+def build_marketing_prompts(product, description, audience, platform):
+    values, trimmed = fit_fields(
+        {'product': product, 'description': description, 'audience': audience, 'platform': platform},
+        INPUT_BUDGETS['marketing'],
+    )
+    return MARKETING_PROMPTS.render(values, trimmed)
+
+
+def build_marketing_variant_prompts(product, description, audience, platforms):
+    """
+    {platform: Prompt} for one campaign on several platforms. The shared fields are fitted
+    once, leaving room for the longest platform name, and only the platform differs per render.
+    """
+    platforms = [platform for platform in dict.fromkeys(str(platform).strip() for platform in platforms) if platform]
+    if not platforms:
+        return {}
+    reserve = max(estimate_tokens(platform) for platform in platforms)
+    values, trimmed = fit_fields(
+        {'product': product, 'description': description, 'audience': audience},
+        max(INPUT_BUDGETS['marketing'] - reserve, 0),
+    )
+    return {platform: MARKETING_PROMPTS.render(dict(values, platform=platform), trimmed) for platform in platforms}
+
+
+def build_sales_prompts(product, persona, industry, size):
+    values, trimmed = fit_fields(
+        {'product': product, 'persona': persona, 'industry': industry, 'size': size},
+        INPUT_BUDGETS['sales'],
+    )
+    return SALES_PROMPTS.render(values, trimmed)
+
+
+def _fit_lead_fields(product, icp, value_prop, lead_data, budget):
+    context = f"{icp} {value_prop}"
+    return fit_fields(
+        {'product': product, 'icp': icp, 'value_prop': value_prop, 'lead_data': lead_data},
+        budget,
+        {'lead_data': lambda text, max_tokens: keep_high_signal(text, max_tokens, context)},
+    )
+
+
+def build_lead_prompts(product, icp, value_prop, lead_data):
+    values, trimmed = _fit_lead_fields(product, icp, value_prop, lead_data, INPUT_BUDGETS['lead_scoring'])
+    return LEAD_PROMPTS.render(values, trimmed)
+
+
+def build_lead_json_prompts(product, icp, value_prop, lead_data):
+    values, trimmed = _fit_lead_fields(product, icp, value_prop, lead_data, INPUT_BUDGETS['lead_scoring'])
+    return LEAD_JSON_PROMPTS.render(values, trimmed)
+
+
+def build_packed_lead_prompts(product, icp, value_prop, leads):
+    values, trimmed = fit_fields(
+        {'product': product, 'icp': icp, 'value_prop': value_prop},
+        INPUT_BUDGETS['lead_scoring_batch'],
+    )
+    context = f"{values['icp']} {values['value_prop']}"
+    fitted = []
+    for lead_data in leads:
+        lead_data = "" if lead_data is None else str(lead_data)
+        if estimate_tokens(lead_data) > PACKED_LEAD_BUDGET:
+            lead_data = keep_high_signal(lead_data, PACKED_LEAD_BUDGET, context)
+            trimmed += ('lead_data',) if 'lead_data' not in trimmed else ()
+        fitted.append(lead_data)
+    values['leads'] = "\n\n".join(f"Lead {number}:\n{lead_data}" for number, lead_data in enumerate(fitted, 1))
+    values['count'] = str(len(leads))
+    return PACKED_LEAD_PROMPTS.render(values, trimmed)
+
+
+def build_edit_prompts(prompt, previous):
+    """Turn a built (system, user) prompt into a request to revise `previous`, an earlier output."""
+    system_prompt, user_prompt = prompt
+    values = {'system': system_prompt.rstrip(), 'request': user_prompt.strip(), 'previous': previous.strip()}
+    return EDIT_PROMPTS.render(values, prompt.trimmed)
+
+
+def prompt_ceilings():
+    """Most estimated prompt tokens each endpoint can send (before the tone line), per the budgets."""
+    return {
+        'marketing': MARKETING_PROMPTS.ceiling(INPUT_BUDGETS['marketing']),
+        'sales': SALES_PROMPTS.ceiling(INPUT_BUDGETS['sales']),
+        'lead_scoring': max(
+            LEAD_PROMPTS.ceiling(INPUT_BUDGETS['lead_scoring']),
+            LEAD_JSON_PROMPTS.ceiling(INPUT_BUDGETS['lead_scoring']),
+        ),
+        'lead_scoring_batch_per_lead': PACKED_LEAD_BUDGET + estimate_tokens("Lead 100:\n\n\n"),
+    }
@@ -0,0 +1,146 @@
+import atexit
+import json
+import os
+import queue
+import threading
+
+import metrics
+
+# ==========================================
+# REQUEST RECORDER
+# ==========================================
+#
+# Appends one compact JSON line per AI request - the request's trace (endpoint,
+# status, duration, Groq time, model, tokens, cache and fallback details, see
+# metrics.py) plus its inputs - for replay.py to feed back through ai_engine.
+# The request path only puts the finished trace on a bounded queue; a writer
+# thread serializes and appends in batches, and when the queue is full the
+# entry is dropped (and counted) rather than waited for.
+# Each worker process writes its own file, RECORD_DIR/requests-<pid>.jsonl,
+# rotated to .1, .2, ... once it passes RECORD_MAX_BYTES.
+
+RECORD_REQUESTS = os.getenv("RECORD_REQUESTS", "0") == "1"
+RECORD_DIR = os.getenv("RECORD_DIR", "recordings")
+RECORD_MAX_BYTES = int(os.getenv("RECORD_MAX_BYTES", str(64 * 1024 * 1024)))
+RECORD_BACKUPS = int(os.getenv("RECORD_BACKUPS", "5"))
+RECORD_QUEUE_SIZE = int(os.getenv("RECORD_QUEUE_SIZE", "10000"))
+
+# Endpoints replay.py knows how to replay
+RECORDED_ENDPOINTS = frozenset({
+    '/api/marketing',
+    '/api/marketing/multi',
+    '/api/marketing/stream',
+    '/api/sales',
+    '/api/sales/stream',
+    '/api/lead-scoring',
+})
+
+# Lines written per write() call at most
+_BATCH = 512
+
+
+class RequestRecorder:
+    """Non-blocking JSONL recorder; the writer thread starts on first use and is rebuilt after a fork."""
+
+    def __init__(self, directory=RECORD_DIR, enabled=RECORD_REQUESTS, max_bytes=RECORD_MAX_BYTES,
+                 backups=RECORD_BACKUPS, queue_size=RECORD_QUEUE_SIZE):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_bytes = max(int(max_bytes), 1)
+        self.backups = max(int(backups), 0)
+        self.queue_size = max(int(queue_size), 1)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self.recorded = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def wants(self, endpoint):
+        return self.enabled and endpoint in RECORDED_ENDPOINTS
+
+    def record(self, trace, inputs, query=None):
+        """Queue a finished request (metrics.finish_request's trace) for writing; never blocks."""
+        if not self.wants(trace.get("endpoint")):
+            return
+        self._ensure_writer()
+        entry = dict(trace, inputs=inputs)
+        if query:
+            entry["query"] = query
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def path(self):
+        return os.path.join(self.directory, f"requests-{os.getpid()}.jsonl")
+
+    def _ensure_writer(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._queue = queue.Queue(self.queue_size)
+            threading.Thread(target=self._write_loop, name="request-recorder", daemon=True).start()
+            atexit.register(self.flush)
+            self._pid = pid
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < _BATCH:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        data = "".join(json.dumps(entry, separators=(",", ":"), default=str) + "\n" for entry in batch)
+        path = self.path()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(data)
+                size = f.tell()
+            self.recorded += len(batch)
+            if size >= self.max_bytes:
+                self._rotate(path)
+        except OSError as e:
+            self.errors += 1
+            metrics.report_error("Request recorder", e)
+
+    def _rotate(self, path):
+        """requests-<pid>.jsonl -> .1 -> .2 ...; the oldest beyond RECORD_BACKUPS is dropped."""
+        if not self.backups:
+            os.remove(path)
+            return
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{number}"):
+                os.replace(f"{path}.{number}", f"{path}.{number + 1}")
+        os.replace(path, f"{path}.1")
+
+    def flush(self, timeout=5.0):
+        """Wait (up to `timeout` seconds) for queued entries to be written; at exit."""
+        if self._pid != os.getpid():
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        done.wait(timeout)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "path": self.path() if self.enabled else None,
+            "queued": self._queue.qsize() if self._pid == os.getpid() else 0,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+recorder = RequestRecorder()
@@ -0,0 +1,248 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# REQUEST REPLAY
+# ==========================================
+#
+# Feeds requests recorded by recorder.py (RECORD_REQUESTS=1) back through
+# ai_engine and writes one result line per request: latency, fallback reason,
+# Groq time and a hash of the output. Two result files - two builds, or one
+# build before and after a change - are then compared per endpoint.
+#
+#   python replay.py run 'recordings/*.jsonl*' --against stub --speed 10 -o before.jsonl
+#   python replay.py run 'recordings/*.jsonl*' --against stub --speed 10 -o after.jsonl
+#   python replay.py compare before.jsonl after.jsonl --tolerance 0.2
+#
+# --against stub points the engine at benchmarks/stub_groq.py (--stub-url);
+# --against fallback runs without a Groq key, so every answer is a template
+# fallback. Requests are sent at their recorded spacing divided by --speed
+# (0: as fast as --concurrency allows). Each replayed request pins its
+# thread's fallback Random to the request's position, so fallback outputs
+# repeat exactly from run to run (except multi-platform requests, whose
+# platforms run on the engine's own threads).
+
+DEFAULT_STUB_URL = "http://127.0.0.1:8090/v1/chat/completions"
+# Result fields copied from the replayed request's trace
+TRACE_FIELDS = ("fallback", "groq_ms", "groq_calls", "model", "cache", "similar", "error")
+
+
+# ==========================================
+# RECORDINGS
+# ==========================================
+
+def read_recordings(patterns, limit=None):
+    """Recorded entries from every file matching `patterns`, oldest first."""
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    if not paths:
+        sys.exit(f"No recordings match {' '.join(patterns)}")
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            entries.extend(json.loads(line) for line in f if line.strip())
+    entries.sort(key=lambda entry: entry.get("ts", 0))
+    return entries[:limit] if limit else entries
+
+
+def replayers(engine):
+    """Endpoint -> fn(inputs, query) running the request through ai_engine; returns its output."""
+    def final_text(events):
+        return next((text for event, text in events if event == "done"), "")
+
+    def lead_scoring(d, query):
+        output = d.get('format') or query.get('format') or 'markdown'
+        return engine.generate_lead_score(d.get('product'), d.get('icp'), d.get('valueProp'), d.get('leadData'), output)
+
+    return {
+        '/api/marketing': lambda d, query: engine.generate_marketing_campaign(
+            d.get('product'), d.get('description'), d.get('audience'), d.get('platform')),
+        '/api/marketing/multi': lambda d, query: dict(engine.generate_marketing_campaigns(
+            d.get('product'), d.get('description'), d.get('audience'), d.get('platforms') or [])),
+        '/api/marketing/stream': lambda d, query: final_text(engine.stream_marketing_campaign(
+            d.get('product'), d.get('description'), d.get('audience'), d.get('platform'))),
+        '/api/sales': lambda d, query: engine.generate_sales_pitch(
+            d.get('product'), d.get('persona'), d.get('industry'), d.get('size')),
+        '/api/sales/stream': lambda d, query: final_text(engine.stream_sales_pitch(
+            d.get('product'), d.get('persona'), d.get('industry'), d.get('size'))),
+        '/api/lead-scoring': lead_scoring,
+    }
+
+
+def output_digest(output):
+    text = output if isinstance(output, str) else json.dumps(output, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], len(text)
+
+
+# ==========================================
+# RUN
+# ==========================================
+
+def configure(args):
+    """Point the engine at the stub or at nothing, before ai_engine is imported."""
+    os.environ.setdefault("REQUEST_LOG", "0")
+    os.environ["RECORD_REQUESTS"] = "0"
+    if args.against == "stub":
+        os.environ["GROQ_API_URL"] = args.stub_url
+        os.environ["GROQ_API_KEY"] = os.environ.get("GROQ_API_KEY") or "stub"
+    else:
+        # Empty rather than unset, so load_dotenv can't fill in a real key from .env
+        os.environ["GROQ_API_KEY"] = ""
+
+
+def replay_one(number, entry, handlers, engine, metrics, fallback_engine):
+    result = {"i": number, "endpoint": entry["endpoint"], "recorded_ms": entry.get("duration_ms")}
+    fallback_engine.seed_thread_rng(number)
+    trace = metrics.start_request(entry["endpoint"], "REPLAY")
+    status = 200
+    try:
+        output = handlers[entry["endpoint"]](entry.get("inputs") or {}, entry.get("query") or {})
+        result["output_sha"], result["output_chars"] = output_digest(output)
+    except Exception as e:
+        status = 500
+        metrics.report_error("Replay", e)
+    finally:
+        trace = metrics.finish_request(trace, status)
+    result["duration_ms"] = trace["duration_ms"]
+    result.update({field: trace[field] for field in TRACE_FIELDS if field in trace})
+    return result
+
+
+def run(args):
+    configure(args)
+    import ai_engine
+    import fallback_engine
+    import metrics
+
+    handlers = replayers(ai_engine)
+    entries = read_recordings(args.recordings, args.limit)
+    replayable = [entry for entry in entries if entry.get("endpoint") in handlers]
+    print(f"Replaying {len(replayable)} of {len(entries)} recorded requests against {args.against}"
+          f" ({'as fast as possible' if not args.speed else f'{args.speed:g}x speed'})")
+
+    results = [None] * len(replayable)
+    lock = threading.Lock()
+
+    def task(number, entry):
+        result = replay_one(number, entry, handlers, ai_engine, metrics, fallback_engine)
+        with lock:
+            results[number] = result
+
+    started = time.perf_counter()
+    first_ts = replayable[0].get("ts", 0) if replayable else 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for number, entry in enumerate(replayable):
+            if args.speed:
+                # Keep the recorded spacing between requests, compressed by --speed
+                delay = (entry.get("ts", first_ts) - first_ts) / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            executor.submit(task, number, entry)
+    elapsed = time.perf_counter() - started
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, separators=(",", ":")) + "\n")
+    print(f"Done in {elapsed:.2f}s; results written to {args.output}\n")
+    print_summary(results)
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+
+    def pick(q):
+        return round(values[min(int(q * len(values)), len(values) - 1)], 1)
+
+    return {"p50": round(statistics.median(values), 1), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def by_endpoint(results):
+    grouped = {}
+    for result in results:
+        grouped.setdefault(result["endpoint"], []).append(result)
+    return grouped
+
+
+def print_summary(results):
+    print(f"{'endpoint':<24}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rec p50':>10}{'fallback':>10}")
+    for endpoint, group in sorted(by_endpoint(results).items()):
+        replayed = percentiles([result["duration_ms"] for result in group])
+        recorded = percentiles([result["recorded_ms"] for result in group if result.get("recorded_ms") is not None])
+        fallbacks = sum(1 for result in group if result.get("fallback")) / len(group)
+        print(f"{endpoint:<24}{len(group):>6}{replayed['p50']:>10}{replayed['p95']:>10}{replayed['p99']:>10}"
+              f"{recorded.get('p50', '-'):>10}{fallbacks:>10.1%}")
+
+
+# ==========================================
+# COMPARE
+# ==========================================
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(args):
+    before, after = read_results(args.before), read_results(args.after)
+    if [result["endpoint"] for result in before] != [result["endpoint"] for result in after]:
+        sys.exit("The result files replay different recordings")
+
+    regressed = []
+    print(f"{'endpoint':<24}{'':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'fallback':>10}{'same output':>13}")
+    grouped_after = by_endpoint(after)
+    for endpoint, group in sorted(by_endpoint(before).items()):
+        other = grouped_after[endpoint]
+        stats = [percentiles([result["duration_ms"] for result in results]) for results in (group, other)]
+        for label, results, stat in (("A", group, stats[0]), ("B", other, stats[1])):
+            fallbacks = sum(1 for result in results if result.get("fallback")) / len(results)
+            print(f"{endpoint if label == 'A' else '':<24}{label:>5}{stat['p50']:>10}{stat['p95']:>10}{stat['p99']:>10}{fallbacks:>10.1%}")
+        changes = {key: (stats[1][key] - stats[0][key]) / stats[0][key] if stats[0][key] else 0.0 for key in ("p50", "p95")}
+        same = sum(1 for a, b in zip(group, other) if a.get("output_sha") == b.get("output_sha"))
+        print(f"{'':<24}{'B/A':>5}{changes['p50']:>+10.1%}{changes['p95']:>+10.1%}{'':>20}{same:>9}/{len(group)}")
+        if any(change > args.tolerance for change in changes.values()):
+            regressed.append(endpoint)
+
+    differing = [a["i"] for a, b in zip(before, after) if a.get("output_sha") != b.get("output_sha")]
+    if differing:
+        print(f"\n{len(differing)} outputs differ, e.g. requests {differing[:10]}")
+    if regressed:
+        print(f"\nSlower by more than {args.tolerance:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded requests through ai_engine and compare runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Replay recordings and write per-request results")
+    run_parser.add_argument("recordings", nargs="+", help="Recording files or glob patterns (quote them)")
+    run_parser.add_argument("-o", "--output", default="replay.results.jsonl")
+    run_parser.add_argument("--against", choices=["stub", "fallback"], default="stub")
+    run_parser.add_argument("--stub-url", default=DEFAULT_STUB_URL, help="Chat completions URL of the stub")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="Pacing: 1 = recorded spacing, 10 = ten times faster, 0 = no pacing")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="Max requests in flight")
+    run_parser.add_argument("--limit", type=int, help="Replay only the first N recorded requests")
+
+    compare_parser = commands.add_parser("compare", help="Diff latency and outputs of two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2, help="Exit 1 if p50 or p95 grew by more than this share")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# ==========================================
+# CIRCUIT BREAKER
+# ==========================================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Trips when the recent error rate (slow calls count as errors) crosses a threshold.
+    - closed: calls go through; outcomes are tracked over a rolling time window
+    - open: calls are refused for `cooldown` seconds so callers serve fallbacks immediately
+    - half_open: up to `probe_calls` trial calls; all succeed -> closed, any fails -> open
+    """
+
+    def __init__(self, name="groq", window=30.0, min_calls=10, error_rate=0.5,
+                 slow_call_seconds=8.0, cooldown=15.0, probe_calls=2, history=50):
+        self.name = name
+        self.window = float(window)
+        self.min_calls = int(min_calls)
+        self.error_rate = float(error_rate)
+        self.slow_call_seconds = float(slow_call_seconds)
+        self.cooldown = float(cooldown)
+        self.probe_calls = int(probe_calls)
+
+        self._lock = threading.Lock()
+        self._calls = deque()  # (timestamp, failed)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_passed = 0
+        self.transitions = deque(maxlen=history)
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def allow(self):
+        """True if a call may go upstream now; False means serve the fallback."""
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_half_open(now)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_started < self.probe_calls:
+                self._probes_started += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success, latency=0.0):
+        """Report the outcome of a call that allow() let through."""
+        now = time.monotonic()
+        failed = (not success) or latency > self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._transition(OPEN, now, "probe failed")
+                else:
+                    self._probes_passed += 1
+                    if self._probes_passed >= self.probe_calls:
+                        self._transition(CLOSED, now, "probes succeeded")
+                return
+
+            self._calls.append((now, failed))
+            self._trim(now)
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, f in self._calls if f)
+                rate = failures / len(self._calls)
+                if rate >= self.error_rate:
+                    self._transition(OPEN, now, f"error rate {rate:.0%} over {len(self._calls)} calls")
+
+    def _trim(self, now):
+        horizon = now - self.window
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def _maybe_half_open(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._transition(HALF_OPEN, now, "cooldown elapsed")
+
+    def _transition(self, state, now, reason):
+        previous = self._state
+        self._state = state
+        if state == OPEN:
+            self._opened_at = now
+        if state in (OPEN, HALF_OPEN):
+            self._probes_started = 0
+            self._probes_passed = 0
+        if state == CLOSED:
+            self._calls.clear()
+        self.transitions.append({
+            "at": time.time(),
+            "from": previous,
+            "to": state,
+            "reason": reason,
+        })
+        metrics.log_event("breaker_transition", breaker=self.name, previous=previous, state=state, reason=reason)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_half_open(now)
+            self._trim(now)
+            failures = sum(1 for _, f in self._calls if f)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": len(self._calls),
+                "window_failures": failures,
+                "rejected": self.rejected,
+                "transitions": list(self.transitions),
+            }
+
+
+# ==========================================
+# SINGLE-FLIGHT REQUEST COALESCING
+# ==========================================
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls across threads: the first caller for a key
+    runs the function, callers arriving while it is in flight wait and share its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop (used by the async engine)."""
+
+    def __init__(self):
+        self._flights = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(flight)
+
+        self.leaders += 1
+        flight = asyncio.ensure_future(fn(*args, **kwargs))
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        return await asyncio.shield(flight)
+
+    def _forget(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self):
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
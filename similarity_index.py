@@ -0,0 +1,198 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# ==========================================
+# NEAR-DUPLICATE INDEX (MinHash + LSH)
+# ==========================================
+#
+# Finds an earlier request whose inputs are nearly the same as a new one
+# ("B2B SaaS founders" vs "SaaS founders (B2B)", an edited description, other
+# casing), so its generation can be reused instead of paying for a new one.
+# - inputs are normalized to bags of words (lowercase, punctuation and plural
+#   s dropped); every field carries equal weight, so a changed audience counts
+#   as much as a rewritten description
+# - a MinHash signature (num_perm 32-bit minima) estimates Jaccard similarity
+# - LSH splits the signature into bands; only entries sharing a band bucket
+#   are compared, so a lookup touches a handful of entries however many the
+#   index holds
+# Requests only match within the same scope (endpoint, product, platform or
+# company size). The index is an LRU bounded to max_entries; adding the same
+# inputs again refreshes their entry instead of taking another slot.
+
+_WORD = re.compile(r"\w+")
+_SHIFT = np.uint64(32)
+
+
+def normalize_words(text):
+    """'SaaS founders (B2B)' -> ['saas', 'founder', 'b2b']."""
+    words = []
+    for word in _WORD.findall(str(text or "").lower()):
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def normalize_scope(*values):
+    """Exact-match part of a key: word order, casing and punctuation ignored."""
+    return tuple(" ".join(sorted(set(normalize_words(value)))) for value in values)
+
+
+def shingles(fields):
+    """
+    Feature set of `fields` ({name: text}). A field's words are repeated (as distinct
+    features) up to the longest field's word count, so each field has the same weight.
+    """
+    words = {name: sorted(set(normalize_words(text))) for name, text in fields.items()}
+    longest = max((len(field_words) for field_words in words.values()), default=0)
+    features = []
+    for name, field_words in words.items():
+        if not field_words:
+            features.append(f"{name}:")
+            continue
+        copies = -(-longest // len(field_words))
+        for word in field_words:
+            features.extend(f"{name}:{word}#{copy}" for copy in range(copies))
+    return features
+
+
+class Match:
+    __slots__ = ("similarity", "value")
+
+    def __init__(self, similarity, value):
+        self.similarity = similarity
+        self.value = value
+
+
+class SimilarityIndex:
+    """
+    Thread-safe MinHash LSH index of (scope, fields) -> value.
+    - num_perm: signature length; bands * rows must equal it. With 64 = 16 x 4, pairs at
+      0.8 similarity share a bucket 99.9% of the time, pairs at 0.3 about 12%
+    - max_entries: least recently used entries are evicted past this size. Signatures live
+      in one preallocated array (num_perm * 4 bytes per entry); with the bucket table an
+      entry costs about 2 KB in all (100k entries: ~200 MB per worker)
+    """
+
+    def __init__(self, max_entries=50000, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max(int(max_entries), 0)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        # Multiply-shift hash family: ((a * x + b) mod 2^64) >> 32, a odd; fixed seed so signatures are stable
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._signatures = np.zeros((self.max_entries, num_perm), dtype=np.uint32)
+        self._entries = OrderedDict()  # slot -> (scope, value), least recently used first
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._buckets = {}  # bucket key -> slot, or a set of slots
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def signature(self, fields):
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) for feature in shingles(fields)), dtype=np.uint64
+        )
+        values = (np.multiply.outer(hashes, self._a) + self._b) >> _SHIFT
+        return values.min(axis=0).astype(np.uint32)
+
+    def _bucket_keys(self, scope, signature):
+        data = signature.tobytes()
+        width = self.rows * 4
+        return [hash((scope, band, data[band * width:(band + 1) * width])) for band in range(self.bands)]
+
+    def lookup(self, scope, fields, min_similarity):
+        """Best Match at or above `min_similarity` within `scope`, or None."""
+        signature = self.signature(fields)
+        keys = self._bucket_keys(scope, signature)
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                if isinstance(bucket, set):
+                    candidates.update(bucket)
+                else:
+                    candidates.add(bucket)
+            # A bucket hash can collide across scopes
+            slots = [slot for slot in candidates if self._entries[slot][0] == scope]
+            if not slots:
+                return None
+            similarities = np.count_nonzero(self._signatures[slots] == signature, axis=1) / self.num_perm
+            best = int(np.argmax(similarities))
+            if similarities[best] < min_similarity:
+                return None
+            slot = slots[best]
+            self.hits += 1
+            self._entries.move_to_end(slot)
+            return Match(round(float(similarities[best]), 3), self._entries[slot][1])
+
+    def add(self, scope, fields, value):
+        if self.max_entries == 0:
+            return
+        signature = self.signature(fields)
+        keys = self._bucket_keys(scope, signature)
+        with self._lock:
+            # Same inputs again (e.g. after their cached generation expired): refresh that entry
+            # rather than filling a second slot. An identical signature shares every bucket.
+            bucket = self._buckets.get(keys[0])
+            if bucket is None:
+                bucket = ()
+            elif not isinstance(bucket, set):
+                bucket = (bucket,)
+            for slot in bucket:
+                if self._entries[slot][0] == scope and np.array_equal(self._signatures[slot], signature):
+                    self._entries[slot] = (scope, value)
+                    self._entries.move_to_end(slot)
+                    return
+            if not self._free:
+                self._evict()
+            slot = self._free.pop()
+            self._signatures[slot] = signature
+            self._entries[slot] = (scope, value)
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    self._buckets[key] = slot
+                elif isinstance(bucket, set):
+                    bucket.add(slot)
+                else:
+                    self._buckets[key] = {bucket, slot}
+
+    def _evict(self):
+        slot, (scope, _) = self._entries.popitem(last=False)
+        for key in self._bucket_keys(scope, self._signatures[slot]):
+            bucket = self._buckets.get(key)
+            if isinstance(bucket, set):
+                bucket.discard(slot)
+                if len(bucket) == 1:
+                    self._buckets[key] = bucket.pop()
+            elif bucket == slot:
+                del self._buckets[key]
+        self._free.append(slot)
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "buckets": len(self._buckets),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
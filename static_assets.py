@@ -0,0 +1,248 @@
+import glob
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# ==========================================
+# STATIC ASSETS (fingerprinted, precompressed, in memory)
+# ==========================================
+#
+# At import every front-end file under STATIC_ROOT is read once and held in
+# memory:
+# - CSS/JS get a content-hashed name (style.3f2a9c1b7d.css) and are served
+#   with a year-long immutable Cache-Control, so browsers never re-request them
+# - HTML pages are rewritten to reference those names and are served with
+#   no-cache, so a deploy is picked up on the next page view via a cheap 304
+# - compressible files are gzipped (and brotli-compressed when the brotli
+#   package is installed) ahead of time, never per request
+# Every response carries a strong ETag per encoding; If-None-Match gets a 304.
+# Only the files matched by STATIC_FILES (glob patterns relative to
+# STATIC_ROOT) with a STATIC_EXTENSIONS suffix are served - nothing else under
+# the app directory (source, data files, .env, a venv or node_modules) is read.
+
+STATIC_ROOT = os.getenv("STATIC_ROOT", os.path.dirname(os.path.abspath(__file__)))
+# The front-end files, as comma-separated glob patterns relative to STATIC_ROOT
+STATIC_FILES = [
+    pattern.strip()
+    for pattern in os.getenv("STATIC_FILES", "index.html,landing.html,dashboard.html,login.html,app.js,*.css").split(",")
+    if pattern.strip()
+]
+# Re-read the files when one changes on disk (front-end development)
+STATIC_RELOAD = os.getenv("STATIC_RELOAD", "0") == "1"
+
+STATIC_EXTENSIONS = {
+    ".html", ".css", ".js", ".svg",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2",
+}
+COMPRESSIBLE = {".html", ".css", ".js", ".svg"}
+# Below this size compression saves less than its headers cost
+COMPRESS_MIN_BYTES = 256
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Pages served at extension-less routes
+PAGES = {
+    "/": "index.html",
+    "/dashboard": "dashboard.html",
+}
+
+_REFERENCE = re.compile(r"""(\b(?:href|src)=["'])([^"'?#:]+)(["'])""")
+
+
+class Asset:
+    """One file's bytes per content encoding, with its ETags and headers."""
+
+    __slots__ = ("path", "source", "mtime_ns", "digest", "content_type", "bodies", "etags")
+
+    def __init__(self, path, source, mtime_ns, content_type, body):
+        self.path = path
+        self.source = source
+        self.mtime_ns = mtime_ns
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.bodies = {"identity": body}
+        if os.path.splitext(path)[1] in COMPRESSIBLE and len(body) >= COMPRESS_MIN_BYTES:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.bodies["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.bodies["br"] = compressed
+        self.etags = {
+            encoding: f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def fingerprinted(self):
+        """'css/style.css' -> 'css/style.<hash>.css'."""
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}.{self.digest[:10]}{ext}"
+
+
+def _content_type(path):
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def _scan(root, patterns):
+    """(relative path, source) of the servable files matching `patterns` under `root`."""
+    seen = set()
+    for pattern in patterns:
+        for source in sorted(glob.glob(os.path.join(glob.escape(root), pattern))):
+            path = os.path.relpath(source, root).replace(os.sep, "/")
+            if path in seen or path.startswith("../") or not os.path.isfile(source):
+                continue
+            if os.path.splitext(path)[1] in STATIC_EXTENSIONS:
+                seen.add(path)
+                yield path, source
+
+
+def parse_accept_encoding(header):
+    """Encodings the client accepts (q > 0), e.g. {'br', 'gzip'}."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == etag:
+            return True
+    return False
+
+
+class StaticAssets:
+    """
+    In-memory manifest of the front-end files. respond() is framework-agnostic:
+    it returns (status, headers, body) for Flask and the ASGI entry point alike.
+    """
+
+    def __init__(self, root=STATIC_ROOT, patterns=STATIC_FILES, reload=STATIC_RELOAD):
+        self.root = root
+        self.patterns = patterns
+        self.reload = reload
+        self.load()
+
+    def load(self):
+        files = {}
+        for path, source in _scan(self.root, self.patterns):
+            with open(source, "rb") as f:
+                body = f.read()
+            files[path] = (source, os.stat(source).st_mtime_ns, body)
+
+        # Hash the referenced assets first, then rewrite the pages that point at them
+        assets, versioned = {}, {}
+        for path, (source, mtime_ns, body) in files.items():
+            if not path.endswith(".html"):
+                asset = assets[path] = Asset(path, source, mtime_ns, _content_type(path), body)
+                versioned[asset.fingerprinted()] = asset
+        for path, (source, mtime_ns, body) in files.items():
+            if path.endswith(".html"):
+                body = self._rewrite(path, body, assets)
+                assets[path] = Asset(path, source, mtime_ns, _content_type(path), body)
+
+        # One assignment, so a concurrent request sees either the old manifest or the new one
+        self._manifest = (assets, versioned)
+        return self
+
+    @staticmethod
+    def _rewrite(page, body, assets):
+        """Point the page's href/src references at the fingerprinted names."""
+        base = os.path.dirname(page)
+
+        def replace(match):
+            reference = match.group(2)
+            target = os.path.normpath(os.path.join(base, reference)).replace(os.sep, "/").lstrip("/")
+            asset = assets.get(target)
+            if asset is None:
+                return match.group(0)
+            prefix = reference.rpartition("/")[0]
+            fingerprinted = os.path.basename(asset.fingerprinted())
+            return match.group(1) + (f"{prefix}/{fingerprinted}" if prefix else fingerprinted) + match.group(3)
+
+        return _REFERENCE.sub(replace, body.decode("utf-8")).encode("utf-8")
+
+    def _find(self, path):
+        assets, versioned = self._manifest
+        path = PAGES.get(path, path).lstrip("/")
+        asset = versioned.get(path)
+        if asset is not None:
+            return asset, IMMUTABLE
+        asset = assets.get(path)
+        return (asset, REVALIDATE) if asset is not None else (None, None)
+
+    def _changed(self):
+        for asset in self._manifest[0].values():
+            try:
+                if os.stat(asset.source).st_mtime_ns != asset.mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def respond(self, path, accept_encoding=None, if_none_match=None):
+        """(status, headers, body) for `path`, or None if it is not a static asset."""
+        if self.reload and self._changed():
+            self.load()
+        asset, cache_control = self._find(path)
+        if asset is None:
+            return None
+
+        accepted = parse_accept_encoding(accept_encoding)
+        encoding = next((name for name in ("br", "gzip") if name in asset.bodies and name in accepted), "identity")
+        etag = asset.etags[encoding]
+        headers = [
+            ("ETag", etag),
+            ("Cache-Control", cache_control),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if _etag_matches(if_none_match, etag):
+            return 304, headers, b""
+
+        body = asset.bodies[encoding]
+        headers.append(("Content-Type", asset.content_type))
+        if encoding != "identity":
+            headers.append(("Content-Encoding", encoding))
+        return 200, headers, body
+
+    def stats(self):
+        assets, versioned = self._manifest
+        assets = list(assets.values())
+        return {
+            "files": len(assets),
+            "versioned": len(versioned),
+            "bytes": sum(len(asset.bodies["identity"]) for asset in assets),
+            "gzip_bytes": sum(len(asset.bodies.get("gzip", asset.bodies["identity"])) for asset in assets),
+            "br_bytes": sum(len(asset.bodies.get("br", asset.bodies.get("gzip", asset.bodies["identity"]))) for asset in assets)
+            if brotli is not None else None,
+        }
+
+
+# Loaded once at import; with gunicorn --preload the workers share it copy-on-write
+assets = StaticAssets()
@@ -0,0 +1,61 @@
+import pytest
+
+from keyword_signals import LEAD_SIGNALS, KeywordSignals
+
+
+def names(text, signals=LEAD_SIGNALS):
+    return [signal["name"] for signal in signals.match(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", []),
+    ("I know the team", []),                       # 'now' inside 'know'
+    ("The headline and the way ahead", []),        # 'head' inside longer words
+    ("Head of growth", ["decision_maker"]),
+    ("HEAD, of growth", ["decision_maker"]),
+    ("now_is_fine", []),                           # underscores are word characters
+    ("(now)", ["timeline_urgency"]),
+    ("We need it", ["pain_point"]),
+    ("Our needs changed", ["pain_point"]),         # 'need*' is a prefix keyword
+    ("Needed yesterday", ["pain_point"]),
+    ("kneed", []),                                 # a prefix keyword still starts at a word boundary
+    ("pricey", []),                                # 'price' is an exact keyword
+    ("Pricing, please", ["financial_intent"]),
+    ("budgeting season", ["financial_intent"]),
+    ("looking for a tool", ["pain_point"]),
+    ("looking \n\t for a tool", ["pain_point"]),   # any whitespace run inside a phrase
+    ("lookingfor", []),
+    ("looking-for", []),
+    ("Cofounder, deadline Friday, quote?", ["financial_intent", "timeline_urgency", "decision_maker"]),
+])
+def test_lead_signals(text, expected):
+    assert names(text) == expected
+
+
+def test_signals_come_back_in_table_order():
+    text = "VP here. Need a quote, urgently."
+    assert LEAD_SIGNALS.match_indexes(text) == [0, 1, 2, 3]
+    assert names(text) == [signal["name"] for signal in LEAD_SIGNALS.signals]
+
+
+def test_custom_table_phrases_and_punctuation():
+    signals = KeywordSignals([
+        {"name": "exec", "weight": 5, "reason": "", "keywords": ["c-level", "vice president*"]},
+        {"name": "intent", "weight": 5, "reason": "", "keywords": ["Book A Demo"]},
+    ])
+    assert names("Talked to a C-Level buyer", signals) == ["exec"]
+    assert names("our vice  presidents", signals) == ["exec"]
+    assert names("c level", signals) == []
+    assert names("Please book   a demo!", signals) == ["intent"]
+    assert names("ebook a demo", signals) == []
+    assert names("book a demonstration", signals) == []
+
+
+def test_match_many_counts_each_signal_once_per_text():
+    rows, hits = LEAD_SIGNALS.match_many(["need need need", "", "asap, need a quote"])
+    assert list(zip(rows, hits)) == [(0, 2), (2, 0), (2, 1), (2, 2)]
+
+
+def test_long_text_is_scanned_to_the_end():
+    text = "nothing to see here " * 5000 + "call me asap"
+    assert names(text) == ["timeline_urgency"]
@@ -0,0 +1,176 @@
+import json
+
+import pytest
+
+import ai_engine
+from cache import create_cache
+from fallback_engine import (
+    categorize_score,
+    fallback_lead_result,
+    fallback_lead_scoring,
+    generate_seed_from_input,
+    render_lead_result,
+)
+
+PRODUCT, ICP, VALUE_PROP = "Acme CRM", "Mid-market SaaS", "Close deals faster"
+LEAD = "VP of sales here, we need a quote this week."
+
+VALID = {
+    "score": 82,
+    "category": "Hot",
+    "reasons": ["Decision maker.", "Asked for pricing.", "Tight timeline."],
+    "conversion_probability": 70,
+    "action": "Call them today.",
+}
+
+
+def entry(**fields):
+    return {**VALID, **fields}
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    """Replace the Groq call with a canned response and give each test an empty cache."""
+    calls = []
+
+    def respond(response):
+        def call_groq_api(system_prompt, user_prompt, **kwargs):
+            calls.append(kwargs)
+            return response
+        monkeypatch.setattr(ai_engine, "call_groq_api", call_groq_api)
+        return calls
+
+    monkeypatch.setattr(ai_engine, "result_cache", create_cache())
+    return respond
+
+
+# ==========================================
+# VALIDATION
+# ==========================================
+
+def test_valid_entry():
+    category, color, _ = categorize_score(82)
+    assert ai_engine.parse_lead_entry(VALID) == (
+        82, category, color, VALID["reasons"], 70, "Call them today.",
+    )
+
+
+@pytest.mark.parametrize("bad", [
+    None,
+    "82",
+    [VALID],
+    entry(score=None),
+    entry(score="high"),
+    entry(score=-1),
+    entry(score=101),
+    entry(reasons=[]),
+    entry(reasons=["", "  "]),
+    entry(reasons=None),
+])
+def test_malformed_entry_is_rejected(bad):
+    assert ai_engine.parse_lead_entry(bad) is None
+
+
+def test_category_and_color_come_from_the_score():
+    score, category, color, *_ = ai_engine.parse_lead_entry(entry(score="30.4", category="Lukewarm"))
+    assert score == 30
+    assert (category, color) == categorize_score(30)[:2]
+
+
+def test_mismatched_category_gets_the_locked_action():
+    parsed = ai_engine.parse_lead_entry(entry(score=20, category="Hot"))
+    assert parsed[1] == "Cold"
+    assert parsed[5] == categorize_score(20)[2]
+
+
+def test_missing_action_gets_the_locked_action():
+    assert ai_engine.parse_lead_entry(entry(action=" "))[5] == categorize_score(82)[2]
+
+
+@pytest.mark.parametrize("conversion, expected", [
+    (150, 100),
+    (-5, 0),
+    ("64.6", 65),
+    (None, int(82 * 0.85)),
+    ("likely", int(82 * 0.85)),
+])
+def test_conversion_probability(conversion, expected):
+    assert ai_engine.parse_lead_entry(entry(conversion_probability=conversion))[4] == expected
+
+
+def test_reasons_are_stripped_and_capped():
+    reasons = ai_engine.parse_lead_entry(entry(reasons=[" a ", "", "b", "c", "d"]))[3]
+    assert reasons == ["a", "b", "c"]
+
+
+def test_parse_lead_response():
+    result = ai_engine.parse_lead_response(json.dumps(VALID))
+    assert result["score"] == 82
+    assert result["source"] == "ai"
+
+
+def test_parse_lead_response_accepts_the_packed_format():
+    assert ai_engine.parse_lead_response(json.dumps({"leads": [VALID]})) == ai_engine.parse_lead_response(json.dumps(VALID))
+
+
+@pytest.mark.parametrize("response", [
+    "Score: 82",
+    "```json\n{}\n```",
+    json.dumps(entry(score=500)),
+    json.dumps({"leads": []}),
+])
+def test_parse_lead_response_rejects_invalid_json(response):
+    assert ai_engine.parse_lead_response(response) is None
+
+
+# ==========================================
+# SCORING
+# ==========================================
+
+def test_score_lead_uses_valid_json(groq):
+    calls = groq(json.dumps(VALID))
+    result = ai_engine.score_lead(PRODUCT, ICP, VALUE_PROP, LEAD)
+    assert result == ai_engine.parse_lead_response(json.dumps(VALID))
+    assert calls[0]["response_format"] == {"type": "json_object"}
+    assert calls[0]["seed"] == generate_seed_from_input(PRODUCT, ICP, VALUE_PROP, LEAD)
+
+    # Served from cache the second time
+    assert ai_engine.score_lead(PRODUCT, ICP, VALUE_PROP, LEAD) == result
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("response", [None, "", "not json", json.dumps(entry(reasons=[]))])
+def test_score_lead_falls_back_with_the_api_seed(groq, response):
+    groq(response)
+    seed = generate_seed_from_input(PRODUCT, ICP, VALUE_PROP, LEAD)
+    assert ai_engine.score_lead(PRODUCT, ICP, VALUE_PROP, LEAD) == fallback_lead_result(PRODUCT, LEAD, seed)
+
+
+@pytest.mark.parametrize("response", [json.dumps(VALID), "not json"])
+def test_json_mode_renders_markdown(groq, monkeypatch, response):
+    monkeypatch.setattr(ai_engine, "LEAD_SCORING_MODE", "json")
+    groq(response)
+    result = ai_engine.generate_lead_score(PRODUCT, ICP, VALUE_PROP, LEAD, output='json')
+    markdown = ai_engine.generate_lead_score(PRODUCT, ICP, VALUE_PROP, LEAD)
+    assert markdown == render_lead_result(result)
+
+
+def test_markdown_mode_returns_the_model_text(groq, monkeypatch):
+    monkeypatch.setattr(ai_engine, "LEAD_SCORING_MODE", "markdown")
+    calls = groq("### Lead Score: 82/100")
+    assert ai_engine.generate_lead_score(PRODUCT, ICP, VALUE_PROP, LEAD) == "### Lead Score: 82/100"
+    assert "response_format" not in calls[0]
+
+
+def test_markdown_mode_falls_back_to_fallback_lead_scoring(groq, monkeypatch):
+    monkeypatch.setattr(ai_engine, "LEAD_SCORING_MODE", "markdown")
+    groq(None)
+    seed = generate_seed_from_input(PRODUCT, ICP, VALUE_PROP, LEAD)
+    assert ai_engine.generate_lead_score(PRODUCT, ICP, VALUE_PROP, LEAD) == fallback_lead_scoring(PRODUCT, LEAD, seed)
+
+
+def test_markdown_mode_renders_a_json_cached_result(groq, monkeypatch):
+    groq(json.dumps(VALID))
+    result = ai_engine.score_lead(PRODUCT, ICP, VALUE_PROP, LEAD)
+    monkeypatch.setattr(ai_engine, "LEAD_SCORING_MODE", "markdown")
+    assert ai_engine.generate_lead_score(PRODUCT, ICP, VALUE_PROP, LEAD) == render_lead_result(result)
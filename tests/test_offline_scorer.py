@@ -0,0 +1,93 @@
+import csv
+
+import pytest
+
+import offline_scorer
+from fallback_engine import fallback_lead_result, generate_seed_from_input
+from offline_scorer import CATEGORY_NAMES, SIGNAL_NAMES, score_chunk
+
+LEADS = [
+    "",
+    "Just browsing.",
+    "What does it cost? We have budget approved.",
+    "This is urgent, we need a quote asap.",
+    "I'm the VP of operations and we are looking for a partner to solve a problem.",
+    "Founder here: budget is set, deadline is Friday, need it now.",
+    "Our director asked me to get a price.",
+    "Head of sales. Urgent problem, what is the cost?",
+    "I know the headline is ahead of schedule.",
+    "CEO. Pricing? Timeline is tight, we need it immediately.",
+]
+
+PRODUCT = "Acme CRM"
+
+
+def assert_matches_fallback(chunk, expected):
+    rows, ids, scores, categories, conversion, hits = score_chunk(chunk)
+    assert list(rows) == [entry[0] for entry in chunk]
+    assert ids == [entry[1] for entry in chunk]
+    for i, result in enumerate(expected):
+        assert scores[i] == result["score"]
+        assert CATEGORY_NAMES[categories[i]] == result["category"]
+        assert conversion[i] == result["conversion_probability"]
+
+
+def test_derived_seed_matches_fallback_lead_result():
+    chunk = [(i, f"lead-{i}", None, (PRODUCT, lead), lead) for i, lead in enumerate(LEADS)]
+    assert_matches_fallback(chunk, [fallback_lead_result(PRODUCT, lead) for lead in LEADS])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 42, 123456789])
+def test_explicit_seed_matches_fallback_lead_result(seed):
+    chunk = [(i, i, seed, (PRODUCT, lead), lead) for i, lead in enumerate(LEADS)]
+    assert_matches_fallback(chunk, [fallback_lead_result(PRODUCT, lead, seed) for lead in LEADS])
+
+
+def test_api_seed_matches_fallback_lead_result():
+    icp, value_prop = "Mid-market SaaS", "Close deals faster"
+    chunk = [(i, i, None, (PRODUCT, icp, value_prop, lead), lead) for i, lead in enumerate(LEADS)]
+    expected = [
+        fallback_lead_result(PRODUCT, lead, generate_seed_from_input(PRODUCT, icp, value_prop, lead))
+        for lead in LEADS
+    ]
+    assert_matches_fallback(chunk, expected)
+
+
+def test_hits_are_the_matched_signals():
+    chunk = [(i, i, None, (PRODUCT, lead), lead) for i, lead in enumerate(LEADS)]
+    hits = score_chunk(chunk)[5]
+    for i, lead in enumerate(LEADS):
+        matched = [SIGNAL_NAMES[j] for j in range(len(SIGNAL_NAMES)) if hits[i, j]]
+        assert matched == [signal["name"] for signal in offline_scorer.LEAD_SIGNALS.match(lead)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_main_ranks_like_fallback_lead_result(tmp_path, workers):
+    source = tmp_path / "leads.csv"
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "leadData"])
+        writer.writeheader()
+        for i, lead in enumerate(LEADS):
+            writer.writerow({"id": f"lead-{i}", "leadData": lead})
+    output = tmp_path / "ranked.csv"
+    top_output = tmp_path / "top.csv"
+
+    offline_scorer.main([
+        str(source), "--product", PRODUCT, "-o", str(output), "--top-output", str(top_output),
+        "--top-k", "3", "--chunk-size", "4", "--workers", str(workers),
+    ])
+
+    expected = sorted(
+        ((fallback_lead_result(PRODUCT, lead), i) for i, lead in enumerate(LEADS)),
+        key=lambda pair: (-pair[0]["score"], pair[1]),
+    )
+    with open(output, newline='', encoding='utf-8') as f:
+        ranked = list(csv.DictReader(f))
+    assert [record["id"] for record in ranked] == [f"lead-{i}" for _, i in expected]
+    for record, (result, i) in zip(ranked, expected):
+        assert int(record["row"]) == i
+        assert int(record["score"]) == result["score"]
+        assert record["category"] == result["category"]
+        assert int(record["conversion_probability"]) == result["conversion_probability"]
+    with open(top_output, newline='', encoding='utf-8') as f:
+        assert list(csv.DictReader(f)) == ranked[:3]
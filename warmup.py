@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+
+import ai_engine
+import groq_client
+import metrics
+from fallback_engine import fallback_lead_result, fallback_marketing, fallback_sales
+from prompt_builder import (
+    build_lead_json_prompts,
+    build_lead_prompts,
+    build_marketing_prompts,
+    build_marketing_variant_prompts,
+    build_packed_lead_prompts,
+    build_sales_prompts,
+)
+
+# ==========================================
+# WARM-UP & READINESS
+# ==========================================
+#
+# Cold workers pay for their first requests: the TLS handshake to Groq, the
+# model catalog fetch, the first pass through the prompt and fallback code.
+# Warm-up moves that work before the worker accepts traffic:
+# - prepare() exercises the CPU-only paths (prompt fitting, fallbacks, the
+#   similarity index, Flask's URL map). It is fork-safe, so create_app() runs
+#   it once in the gunicorn master and the workers inherit the result
+# - warm_up() also fetches the model catalog and opens WARMUP_CONNECTIONS
+#   pooled keep-alive connections to Groq, per worker (sockets can't cross a
+#   fork); gunicorn.conf.py calls it from post_worker_init, asgi.py from its
+#   lifespan startup
+# readiness() reports the result for GET /healthz.
+
+WARMUP = os.getenv("WARMUP", "1") == "1"
+# Keep-alive connections each worker opens to Groq before taking traffic
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+
+_SAMPLE_TEXT = (
+    "Hi, I'm the head of operations at a 200 person logistics firm. "
+    "We need pricing for a rollout this quarter and our budget is approved. "
+) * 40
+
+_lock = threading.Lock()
+_prepared = False
+_state = {"pid": None, "status": COLD}
+
+
+def prepare(app=None):
+    """CPU-only warm-up, safe to run before fork; runs once per process tree."""
+    global _prepared
+    if _prepared:
+        return
+    started = time.perf_counter()
+    # Long inputs take the trimming paths as well as the plain ones
+    build_marketing_prompts("MarketMind", _SAMPLE_TEXT, "B2B SaaS founders", "LinkedIn")
+    build_marketing_variant_prompts("MarketMind", "AI campaign planning", "B2B SaaS founders", ["LinkedIn", "X"])
+    build_sales_prompts("MarketMind", "VP of Sales", "Logistics", "Enterprise")
+    build_lead_prompts("MarketMind", "Logistics firms", "Faster rollouts", _SAMPLE_TEXT)
+    build_lead_json_prompts("MarketMind", "Logistics firms", "Faster rollouts", _SAMPLE_TEXT)
+    build_packed_lead_prompts("MarketMind", "Logistics firms", "Faster rollouts", [_SAMPLE_TEXT, "Just browsing"])
+    fallback_marketing("MarketMind", "AI campaign planning", "B2B SaaS founders", "LinkedIn")
+    fallback_sales("MarketMind", "VP of Sales", "Logistics", "Enterprise")
+    fallback_lead_result("MarketMind", _SAMPLE_TEXT)
+    ai_engine.similar_index.signature({'description': "AI campaign planning", 'audience': "B2B SaaS founders"})
+    if app is not None:
+        app.url_map.update()  # compile the route matcher now, not on the first request
+    _prepared = True
+    _log(event="prepare", duration_ms=round((time.perf_counter() - started) * 1000, 1))
+
+
+def warm_connections():
+    """Fetch the model catalog and open pooled connections to Groq; returns the step results."""
+    result = {"catalog": None, "connections": 0}
+    if not ai_engine.GROQ_API_KEY:
+        result["catalog"] = "skipped: no GROQ_API_KEY"
+        return result
+    try:
+        # Also opens the first connection; the catalog is then fresh for MODEL_CATALOG_TTL
+        result["catalog"] = len(ai_engine.model_router.catalog.refresh())
+    except Exception as e:
+        result["catalog"] = f"error: {e}"
+    headers = {"Authorization": f"Bearer {ai_engine.GROQ_API_KEY}"}
+    result["connections"] = groq_client.warm(ai_engine.GROQ_MODELS_URL, WARMUP_CONNECTIONS, headers)
+    return result
+
+
+def warm_up(app=None):
+    """Full warm-up for this process (a no-op with WARMUP=0); blocks until done."""
+    if not WARMUP:
+        return readiness()
+    pid = os.getpid()
+    with _lock:
+        if _state["pid"] == pid:
+            return readiness()
+        _state.clear()
+        _state.update(pid=pid, status=WARMING)
+    started = time.perf_counter()
+    prepare(app)
+    _state.update(warm_connections())
+    _state.update(status=READY, warmup_ms=round((time.perf_counter() - started) * 1000, 1))
+    _log(event="warm_up", **_state)
+    return readiness()
+
+
+def mark_async_warm(connections):
+    """Record the ASGI event loop's pre-opened connections (asgi.py lifespan startup)."""
+    _state["async_connections"] = connections
+
+
+def readiness():
+    """This worker's warm-up state for /healthz: 'cold' (never warmed), 'warming' or 'ready'."""
+    state = dict(_state) if _state["pid"] == os.getpid() else {"status": COLD}
+    state["pid"] = os.getpid()
+    state["http_pool"] = groq_client.pool_stats()
+    return state
+
+
+def _log(event, **fields):
+    if metrics.REQUEST_LOG:
+        metrics.log_event(event, **fields)